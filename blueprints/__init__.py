@@ -0,0 +1,98 @@
+"""
+Blueprint-urile aplicatiei.
+
+public / auth / dashboard / checkout sunt importate la pornire.
+reports, qobuz, exports si images sunt folosite rar, asa ca modulele lor (si `requests`)
+se importa abia la primul request catre una din rutele lor (LazyView).
+"""
+from flask import Blueprint
+from werkzeug.utils import import_string
+
+
+class LazyView:
+    """View care importa functia reala la primul apel (pattern-ul Flask "lazy loading")."""
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit(".", 1)
+        self.import_name = import_name
+        self._view = None
+
+    @property
+    def view(self):
+        if self._view is None:
+            self._view = import_string(self.import_name)
+        return self._view
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def lazy_blueprint(name, module, rules):
+    """Creeaza un blueprint ale carui rute sunt rezolvate din `module` abia la cerere."""
+    bp = Blueprint(name, __name__)
+    for rule, endpoint, methods in rules:
+        bp.add_url_rule(
+            rule,
+            endpoint=endpoint,
+            view_func=LazyView(f"{module}.{endpoint}"),
+            methods=methods,
+        )
+    return bp
+
+
+reports_bp = lazy_blueprint(
+    "reports",
+    "blueprints.reports",
+    [
+        ("/api/dashboard/stats", "get_dashboard_stats", ["GET"]),
+        ("/api/dashboard/top-products", "get_top_products", ["GET"]),
+        ("/api/dashboard/orders-by-date", "get_orders_by_date", ["GET"]),
+        ("/api/dashboard/db-pool", "get_db_pool_stats", ["GET"]),
+        ("/api/dashboard/rate-limits", "get_rate_limit_stats", ["GET"]),
+    ],
+)
+
+qobuz_bp = lazy_blueprint(
+    "qobuz",
+    "blueprints.qobuz",
+    [
+        ("/api/qobuz/search", "qobuz_search", ["GET"]),
+        ("/api/qobuz/preview/<int:track_id>", "qobuz_preview", ["GET"]),
+        ("/api/qobuz/previews", "qobuz_previews", ["GET"]),
+        ("/api/qobuz/album/<album_id>", "qobuz_album", ["GET"]),
+    ],
+)
+
+exports_bp = lazy_blueprint(
+    "exports",
+    "blueprints.exports",
+    [
+        ("/dashboard/process-orders/export.<any(csv, jsonl):fmt>", "export_orders", ["GET"]),
+        ("/dashboard/inventory/export.<any(csv, jsonl):fmt>", "export_inventory", ["GET"]),
+        ("/dashboard/users/export.<any(csv, jsonl):fmt>", "export_users", ["GET"]),
+    ],
+)
+
+images_bp = lazy_blueprint(
+    "images",
+    "blueprints.images",
+    [
+        ("/img/<int:product_id>/<digest>/<int:width>.<ext>", "product_image", ["GET"]),
+    ],
+)
+
+
+def register_blueprints(app):
+    from blueprints.public import public_bp
+    from blueprints.auth import auth_bp
+    from blueprints.dashboard import dashboard_bp
+    from blueprints.checkout import checkout_bp
+
+    app.register_blueprint(public_bp)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(dashboard_bp)
+    app.register_blueprint(checkout_bp)
+    app.register_blueprint(reports_bp)
+    app.register_blueprint(qobuz_bp)
+    app.register_blueprint(exports_bp)
+    app.register_blueprint(images_bp)
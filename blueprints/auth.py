@@ -0,0 +1,80 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_user, logout_user, login_required
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from models import db, User
+
+auth_bp = Blueprint("auth", __name__)
+
+
+@auth_bp.route("/register", methods=["GET", "POST"])
+def register():
+    if request.method == "POST":
+        username = (request.form.get("username") or "").strip()
+        email = (request.form.get("email") or "").strip().lower()
+        password = request.form.get("password") or ""
+
+        if not username or not email or not password:
+            flash("Completează username, email și parolă.", "error")
+            return redirect(url_for("auth.register"))
+
+        # FIX: verifică și username și email (email e unique în model)
+        if User.query.filter_by(username=username).first():
+            flash("Utilizatorul deja există", "error")
+            return redirect(url_for("auth.register"))
+        if User.query.filter_by(email=email).first():
+            flash("Email-ul este deja folosit.", "error")
+            return redirect(url_for("auth.register"))
+
+        try:
+            user = User(username=username, email=email, role="client")
+            user.set_password(password)
+            db.session.add(user)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash("Nu s-a putut crea contul (username/email deja existent).", "error")
+            return redirect(url_for("auth.register"))
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Eroare: {str(e)}", "error")
+            return redirect(url_for("auth.register"))
+
+        flash("Contul creat cu succes! Autentifică-te acum.", "success")
+        return redirect(url_for("auth.login"))
+
+    return render_template("register.html")
+
+
+@auth_bp.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        identifier = (request.form.get("username") or "").strip()
+        password = request.form.get("password") or ""
+
+        identifier_email = identifier.lower()
+        user = User.query.filter(
+            or_(
+                User.username == identifier,
+                User.email == identifier_email,
+            )
+        ).first()
+        if user and user.check_password(password):
+            login_user(user)
+            flash(f"Bine ai venit, {user.username}!", "success")
+            # suport pentru ?next=/ruta
+            next_url = request.args.get("next")
+            return redirect(next_url or url_for("dashboard.dashboard"))
+
+        flash("Utilizator sau parola gresit", "error")
+
+    return render_template("login.html")
+
+
+@auth_bp.route("/logout")
+@login_required
+def logout():
+    logout_user()
+    flash("Te-ai deconectat cu succes", "success")
+    return redirect(url_for("public.index"))
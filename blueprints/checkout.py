@@ -0,0 +1,370 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort
+from flask_login import login_required, current_user
+
+from models import db, Order, OrderStatusHistory, Address
+from cart_store import MAX_CART_QUANTITY, apply_cart_changes, clear_cart, load_cart, place_cart_order, serialize_cart
+from order_workflow import (
+    CLIENT_CANCELLABLE,
+    ORDER_STATUSES,
+    classify_results,
+    delete_orders,
+    transition_orders,
+)
+import cache_bus
+from product_cache import product_cache
+from recommendations import record_order
+from stock_shards import InsufficientStock
+
+checkout_bp = Blueprint("checkout", __name__)
+
+MAX_BULK_ORDERS = 1000
+MAX_CART_ITEMS = 200
+
+
+@checkout_bp.route("/checkout")
+@login_required
+def checkout():
+    if current_user.role != "client":
+        flash("Acces interzis", "error")
+        return redirect(url_for("dashboard.dashboard"))
+    addresses = Address.query.filter_by(user_id=current_user.id).order_by(Address.created_at.desc()).all()
+    return render_template("checkout.html", addresses=addresses)
+
+
+def parse_cart(cart, allow_zero=False):
+    """
+    Cantitatile per produs din cart-ul trimis de client; (qty, None) sau (None, eroare).
+    `allow_zero` accepta cantitatea 0 (stergere linie in PATCH /api/cart); peste
+    MAX_CART_QUANTITY per produs (si dupa insumarea liniilor duplicate) e eroare, nu se taie.
+    """
+    if not isinstance(cart, list):
+        return None, {"error": "Invalid cart"}
+    qty = defaultdict(int)
+    for item in cart:
+        if not isinstance(item, dict):
+            return None, {"error": "Invalid cart item"}
+        pid = item.get("id") or item.get("product_id")
+        try:
+            pid = int(pid)
+        except Exception:
+            return None, {"error": "Invalid product id in cart"}
+
+        try:
+            q = int(item.get("quantity", 1))
+        except Exception:
+            return None, {"error": "Invalid quantity in cart"}
+
+        if q < 0 or (q == 0 and not allow_zero):
+            return None, {"error": "Quantity must be >= 1", "product_id": pid}
+
+        qty[pid] += q
+        if qty[pid] > MAX_CART_QUANTITY:
+            return None, {"error": f"Quantity must be <= {MAX_CART_QUANTITY}", "product_id": pid}
+    return qty, None
+
+
+@checkout_bp.route("/api/cart/quote", methods=["POST"])
+def cart_quote():
+    """
+    Preturi, stoc si total pentru tot cosul, din cache-ul de produse (o singura interogare
+    pentru produsele lipsa). Cosul din modal il apeleaza la deschidere.
+    """
+    data = request.get_json(silent=True) or {}
+    cart = data.get("cart", [])
+    if not isinstance(cart, list) or len(cart) > MAX_CART_ITEMS:
+        return jsonify({"error": "Invalid cart"}), 400
+
+    qty, error = parse_cart(cart)
+    if error:
+        return jsonify(error), 400
+
+    products = product_cache.get_many(list(qty))
+    items = []
+    total = Decimal("0.00")
+    for pid, q in qty.items():
+        product = products.get(pid)
+        if product is None:
+            items.append({"id": pid, "quantity": q, "status": "not_found"})
+            continue
+        line_total = product["price"] * q
+        status = "ok" if product["stock"] >= q else "insufficient_stock"
+        if status == "ok":
+            total += line_total
+        items.append(
+            {
+                "id": pid,
+                "name": product["title"],
+                "price": float(product["price"]),
+                "quantity": q,
+                "stock": product["stock"],
+                "line_total": float(line_total),
+                "status": status,
+            }
+        )
+    return jsonify(
+        {
+            "items": items,
+            "total": float(total),
+            "valid": all(item["status"] == "ok" for item in items),
+        }
+    )
+
+
+@checkout_bp.route("/api/cart", methods=["GET"])
+@login_required
+def get_cart():
+    return jsonify({"cart": serialize_cart(load_cart(current_user.id))})
+
+
+@checkout_bp.route("/api/cart", methods=["PATCH"])
+@login_required
+def patch_cart():
+    """Delta: doar liniile schimbate, cu cantitatea noua ({"items": [{"id", "quantity"}]}, 0 = sterge)."""
+    data = request.get_json(silent=True) or {}
+    items = data.get("items", [])
+    if not isinstance(items, list) or len(items) > MAX_CART_ITEMS:
+        return jsonify({"error": "Invalid cart"}), 400
+    qty, error = parse_cart(items, allow_zero=True)
+    if error:
+        return jsonify(error), 400
+    try:
+        apply_cart_changes(current_user.id, qty)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"success": True})
+
+
+@checkout_bp.route("/api/cart/merge", methods=["POST"])
+@login_required
+def merge_cart():
+    """Merge la login: cosul din localStorage + cel salvat (cantitatea maxima per produs)."""
+    data = request.get_json(silent=True) or {}
+    cart = data.get("cart", [])
+    if not isinstance(cart, list) or len(cart) > MAX_CART_ITEMS:
+        return jsonify({"error": "Invalid cart"}), 400
+    qty, error = parse_cart(cart)
+    if error:
+        return jsonify(error), 400
+    try:
+        apply_cart_changes(current_user.id, qty, keep_max=True)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"cart": serialize_cart(load_cart(current_user.id))})
+
+
+@checkout_bp.route("/api/checkout", methods=["POST"])
+@login_required
+def api_checkout():
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Invalid payload"}), 400
+
+    cart = data.get("cart")
+    expected = data.get("expected")
+    shipping_address = (data.get("shippingaddress") or "").strip()
+    shipping_name = (data.get("shippingname") or "").strip()
+    shipping_phone = (data.get("shippingphone") or "").strip()
+
+    if not shipping_address or not shipping_name or not shipping_phone:
+        return jsonify({"error": "Missing shipping information"}), 400
+    if expected is not None:
+        # Liniile afisate clientului; comanda se face doar daca cosul de pe server e acelasi
+        expected, error = parse_cart(expected)
+        if error:
+            return jsonify(error), 400
+
+    try:
+        if cart:
+            # Compatibilitate: un client care trimite tot cosul il inlocuieste pe cel de pe server
+            qty, error = parse_cart(cart)
+            if error:
+                return jsonify(error), 400
+            clear_cart(current_user.id)
+            apply_cart_changes(current_user.id, qty)
+            db.session.flush()
+
+        rows = load_cart(current_user.id, for_update=True)
+        if not rows:
+            db.session.rollback()
+            return jsonify({"error": "Cart gol"}), 400
+        if cart and len(rows) != len(qty):
+            db.session.rollback()
+            return jsonify({"error": "Unele produse nu au fost gasite"}), 404
+        if expected is not None and {p.id: quantity for quantity, p in rows} != expected:
+            current = serialize_cart(rows)
+            db.session.rollback()
+            return jsonify({"error": "Cosul s-a schimbat. Verifica produsele si plaseaza comanda din nou.", "cart": current}), 409
+
+        ids = set()
+        for quantity, p in rows:
+            if p.stock_total < quantity:
+                db.session.rollback()
+                return jsonify({"error": f"Stoc insuficient pentru {p.title}", "product_id": p.id}), 400
+            ids.add(p.id)
+
+        order = Order(
+            user_id=current_user.id,
+            shipping_address=shipping_address,
+            shipping_name=shipping_name,
+            shipping_phone=shipping_phone,
+        )
+        db.session.add(order)
+        db.session.flush()
+        db.session.add(
+            OrderStatusHistory(
+                order_id=order.id,
+                status=order.status or "pending",
+                note="Order created",
+            )
+        )
+        # Linii, total (SUM(price * quantity)) si stoc direct in SQL, fara aritmetica per rand in Python
+        try:
+            place_cart_order(order.id, current_user.id)
+        except InsufficientStock as e:
+            # Produs cu stoc distribuit epuizat intre verificare si scadere
+            db.session.rollback()
+            title = next((p.title for _, p in rows if p.id == e.product_id), e.product_id)
+            return jsonify({"error": f"Stoc insuficient pentru {title}", "product_id": e.product_id}), 400
+        # Perechile "cumparate impreuna" pentru recomandari, in aceeasi tranzactie
+        record_order(order.id)
+        order_id = order.id
+
+        db.session.commit()
+        cache_bus.invalidate(("products", ids), ("recommendations", ids))
+        return jsonify({"success": True, "order_id": order_id}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
+@checkout_bp.route("/order-confirmation/<int:order_id>")
+@login_required
+def order_confirmation(order_id):
+    order = Order.query.get_or_404(order_id)
+    if order.user_id != current_user.id and current_user.role not in ["angajat", "admin"]:
+        flash("Acces interzis", "error")
+        return redirect(url_for("public.index"))
+    return render_template("order_confirmation.html", order=order)
+
+
+@checkout_bp.route("/api/orders/<int:order_id>/status", methods=["POST"])
+@login_required
+def update_order_status(order_id):
+    if current_user.role not in ["angajat", "admin"]:
+        return jsonify({"error": "Forbidden"}), 403
+
+    data = request.get_json() or {}
+    new_status = data.get("status")
+    if not new_status:
+        return jsonify({"error": "Missing status"}), 400
+    if new_status not in ORDER_STATUSES:
+        return jsonify({"error": "Status invalid"}), 400
+
+    try:
+        updated = transition_orders(
+            [order_id], new_status, note=f"Status updated by {current_user.username}"
+        )
+        result = classify_results([order_id], new_status, updated)[0]["result"]
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    if result == "not_found":
+        abort(404)
+    if result == "invalid_transition":
+        return jsonify({"error": f"Tranzitie nepermisa catre {new_status}"}), 409
+    return jsonify({"success": True, "result": result})
+
+
+@checkout_bp.route("/api/orders/status", methods=["POST"])
+@login_required
+def bulk_update_order_status():
+    """Schimba statusul mai multor comenzi intr-o singura tranzactie."""
+    if current_user.role not in ["angajat", "admin"]:
+        return jsonify({"error": "Forbidden"}), 403
+
+    data = request.get_json() or {}
+    new_status = data.get("status")
+    raw_ids = data.get("ids")
+    if not new_status:
+        return jsonify({"error": "Missing status"}), 400
+    if new_status not in ORDER_STATUSES:
+        return jsonify({"error": "Status invalid"}), 400
+    if not isinstance(raw_ids, list) or not raw_ids:
+        return jsonify({"error": "Missing ids"}), 400
+    if len(raw_ids) > MAX_BULK_ORDERS:
+        return jsonify({"error": f"Maxim {MAX_BULK_ORDERS} comenzi per request"}), 400
+
+    results = []
+    ids = []
+    for raw in raw_ids:
+        try:
+            ids.append(int(raw))
+        except (TypeError, ValueError):
+            results.append({"id": raw, "result": "invalid"})
+    ids = list(dict.fromkeys(ids))
+
+    try:
+        updated = transition_orders(
+            ids, new_status, note=f"Status updated by {current_user.username}"
+        )
+        results.extend(classify_results(ids, new_status, updated))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({"success": True, "updated": len(updated), "results": results})
+
+
+@checkout_bp.route("/api/orders/<int:order_id>/cancel", methods=["POST"])
+@login_required
+def cancel_order(order_id):
+    order = Order.query.get_or_404(order_id)
+
+    if order.user_id != current_user.id:
+        return jsonify({"error": "Forbidden"}), 403
+
+    try:
+        updated = transition_orders(
+            [order.id],
+            "cancelled",
+            note=f"Cancelled by {current_user.username}",
+            sources=CLIENT_CANCELLABLE,
+            user_id=current_user.id,
+        )
+        if not updated:
+            db.session.rollback()
+            return jsonify({"error": "Doar comenzile în status pending pot fi anulate"}), 400
+        db.session.commit()
+        return jsonify({"success": True, "message": "Comanda a fost anulată cu succes"})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
+@checkout_bp.route("/api/orders/<int:order_id>", methods=["DELETE"])
+@login_required
+def delete_order(order_id):
+    if current_user.role not in ["angajat", "admin"]:
+        return jsonify({"error": "Forbidden"}), 403
+
+    try:
+        deleted = delete_orders([order_id])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    if not deleted:
+        abort(404)
+    return jsonify({"success": True, "message": "Comanda a fost ștearsă cu succes"})
@@ -0,0 +1,823 @@
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify, abort
+from flask_login import logout_user, login_required, current_user
+from sqlalchemy import delete, func, or_, select, update
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from models import db, User, Product, Order, OrderItem, Feedback, Address, CartItem, Job, ProductCoPurchase, StockShard
+import cache_bus
+import stock_shards
+from category_map import category_map
+from image_pipeline import image_format
+from order_partitions import day_bounds
+from order_workflow import ORDER_STATUSES, ORDER_TRANSITIONS
+
+dashboard_bp = Blueprint("dashboard", __name__)
+
+MAX_BULK_DELETE = 1000
+
+# Joburi care se pot porni manual din dashboard (fara argumente)
+MANUAL_JOBS = ("recommendations.rebuild", "orders.compact_history", "stock.rebalance")
+
+
+def parse_price(value):
+    """Pretul din formular ca Decimal cu 2 zecimale (ValueError daca nu e numar)."""
+    try:
+        price = Decimal(str(value).strip().replace(",", "."))
+    except InvalidOperation:
+        raise ValueError("Pret invalid.")
+    if not price.is_finite():
+        raise ValueError("Pret invalid.")
+    return price.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def enqueue_image_prewarm(url):
+    """Variantele copertii se genereaza in worker (download de pe CDN), nu la prima vizita."""
+    if url and image_format():
+        # Importat la cerere: jobs aduce toate task-urile (recomandari, imagini...)
+        import jobs
+
+        jobs.enqueue("images.prewarm", {"urls": [url]})
+
+
+@dashboard_bp.route("/dashboard")
+@login_required
+def dashboard():
+    stats = {}
+
+    if current_user.role == "admin":
+        stats["total_users"] = User.query.count()
+        active = Product.query.filter(Product.deleted_at.is_(None))
+        stats["total_products"] = active.count()
+        stats["low_stock"] = active.filter(Product.stock_total < 5).count()
+
+        stats["total_orders"] = Order.query.count()
+        stats["pending_orders"] = Order.query.filter_by(status="pending").count()
+        stats["shipped_orders"] = Order.query.filter_by(status="shipped").count()
+
+        total_revenue = db.session.query(func.coalesce(func.sum(Order.total_price), 0)).scalar()
+        stats["total_revenue"] = float(total_revenue or 0)
+
+        # FIX MAJOR (PostgreSQL): join explicit + group_by complet
+        top_products = (
+            db.session.query(
+                Product.title,
+                Product.artist,
+                func.coalesce(func.sum(OrderItem.quantity), 0).label("qty_sold"),
+            )
+            .join(OrderItem, OrderItem.product_id == Product.id)
+            .group_by(Product.id, Product.title, Product.artist)
+            .order_by(func.sum(OrderItem.quantity).desc())
+            .limit(5)
+            .all()
+        )
+        stats["top_products"] = [{"title": p[0], "artist": p[1], "qty": int(p[2] or 0)} for p in top_products]
+
+    elif current_user.role == "angajat":
+        stats["out_of_stock"] = Product.query.filter(Product.deleted_at.is_(None), Product.stock_total == 0).count()
+        stats["pending_orders"] = Order.query.filter_by(status="pending").count()
+
+        today_start, tomorrow = day_bounds(datetime.utcnow().date())
+        stats["orders_today"] = (
+            Order.query.filter(Order.created_at >= today_start, Order.created_at < tomorrow).count()
+        )
+
+    return render_template("/dashboard/dashboard.html", user=current_user, stats=stats)
+
+
+@dashboard_bp.route("/dashboard/orders")
+@login_required
+def my_orders():
+    if current_user.role != "client":
+        return redirect(url_for("dashboard.dashboard"))
+    try:
+        page = request.args.get("page", 1, type=int)
+        pagination = (
+            Order.query.filter_by(user_id=current_user.id)
+            .order_by(Order.created_at.desc())
+            .paginate(page=page, per_page=12, error_out=False)
+        )
+        orders = pagination.items
+    except Exception as e:
+        current_app.logger.error("Failed to load orders for user %s: %s", current_user.id, e)
+        flash("Încă nu este posibil să afișăm comenzile: schema bazei de date nu este actualizată.", "error")
+        orders = []
+        pagination = None
+    return render_template("dashboard/orders.html", orders=orders, pagination=pagination)
+
+
+@dashboard_bp.route("/dashboard/settings")
+@login_required
+def settings():
+    addresses = []
+    if current_user.role == "client":
+        addresses = Address.query.filter_by(user_id=current_user.id).order_by(Address.created_at.desc()).all()
+    return render_template("dashboard/settings.html", user=current_user, addresses=addresses)
+
+
+@dashboard_bp.route("/dashboard/settings/profile", methods=["POST"])
+@login_required
+def update_profile():
+    username = (request.form.get("username") or "").strip()
+    email = (request.form.get("email") or "").strip().lower()
+
+    if not username or not email:
+        flash("Completeaza username si email.", "error")
+        return redirect(url_for("dashboard.settings"))
+
+    if username != current_user.username and User.query.filter_by(username=username).first():
+        flash("Username-ul este deja folosit.", "error")
+        return redirect(url_for("dashboard.settings"))
+    if email != current_user.email and User.query.filter_by(email=email).first():
+        flash("Email-ul este deja folosit.", "error")
+        return redirect(url_for("dashboard.settings"))
+
+    try:
+        current_user.username = username
+        current_user.email = email
+        db.session.commit()
+        flash("Datele de cont au fost actualizate.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Eroare la actualizare: {str(e)}", "error")
+
+    return redirect(url_for("dashboard.settings"))
+
+
+@dashboard_bp.route("/dashboard/settings/password", methods=["POST"])
+@login_required
+def update_password():
+    current_password = request.form.get("current_password") or ""
+    new_password = request.form.get("new_password") or ""
+    confirm_password = request.form.get("confirm_password") or ""
+
+    if not current_password or not new_password or not confirm_password:
+        flash("Completeaza toate campurile de parola.", "error")
+        return redirect(url_for("dashboard.settings"))
+
+    if not current_user.check_password(current_password):
+        flash("Parola actuala este gresita.", "error")
+        return redirect(url_for("dashboard.settings"))
+
+    if new_password != confirm_password:
+        flash("Parolele noi nu coincid.", "error")
+        return redirect(url_for("dashboard.settings"))
+
+    if len(new_password) < 6:
+        flash("Parola noua trebuie sa aiba cel putin 6 caractere.", "error")
+        return redirect(url_for("dashboard.settings"))
+
+    try:
+        current_user.set_password(new_password)
+        db.session.commit()
+        flash("Parola a fost actualizata.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Eroare la actualizare: {str(e)}", "error")
+
+    return redirect(url_for("dashboard.settings"))
+
+
+@dashboard_bp.route("/dashboard/addresses/add", methods=["POST"])
+@login_required
+def add_address():
+    if current_user.role != "client":
+        flash("Acces interzis", "error")
+        return redirect(url_for("dashboard.dashboard"))
+
+    label = (request.form.get("label") or "").strip()
+    name = (request.form.get("name") or "").strip()
+    phone = (request.form.get("phone") or "").strip()
+    address_line1 = (request.form.get("address_line1") or "").strip()
+    address_line2 = (request.form.get("address_line2") or "").strip()
+    city = (request.form.get("city") or "").strip()
+    county = (request.form.get("county") or "").strip()
+    postal_code = (request.form.get("postal_code") or "").strip()
+
+    if not name or not phone or not address_line1 or not city:
+        flash("Completeaza campurile obligatorii pentru adresa.", "error")
+        return redirect(url_for("dashboard.settings"))
+
+    try:
+        address = Address(
+            user_id=current_user.id,
+            label=label or None,
+            name=name,
+            phone=phone,
+            address_line1=address_line1,
+            address_line2=address_line2 or None,
+            city=city,
+            county=county or None,
+            postal_code=postal_code or None,
+        )
+        db.session.add(address)
+        db.session.commit()
+        flash("Adresa a fost salvata.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Eroare la salvare: {str(e)}", "error")
+
+    return redirect(url_for("dashboard.settings"))
+
+
+@dashboard_bp.route("/dashboard/addresses/<int:address_id>/update", methods=["POST"])
+@login_required
+def update_address(address_id):
+    if current_user.role != "client":
+        flash("Acces interzis", "error")
+        return redirect(url_for("dashboard.dashboard"))
+
+    address = Address.query.get_or_404(address_id)
+    if address.user_id != current_user.id:
+        abort(403)
+
+    label = (request.form.get("label") or "").strip()
+    name = (request.form.get("name") or "").strip()
+    phone = (request.form.get("phone") or "").strip()
+    address_line1 = (request.form.get("address_line1") or "").strip()
+    address_line2 = (request.form.get("address_line2") or "").strip()
+    city = (request.form.get("city") or "").strip()
+    county = (request.form.get("county") or "").strip()
+    postal_code = (request.form.get("postal_code") or "").strip()
+
+    if not name or not phone or not address_line1 or not city:
+        flash("Completeaza campurile obligatorii pentru adresa.", "error")
+        return redirect(url_for("dashboard.settings"))
+
+    try:
+        address.label = label or None
+        address.name = name
+        address.phone = phone
+        address.address_line1 = address_line1
+        address.address_line2 = address_line2 or None
+        address.city = city
+        address.county = county or None
+        address.postal_code = postal_code or None
+        db.session.commit()
+        flash("Adresa a fost actualizata.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Eroare la actualizare: {str(e)}", "error")
+
+    return redirect(url_for("dashboard.settings"))
+
+
+@dashboard_bp.route("/dashboard/addresses/<int:address_id>/delete", methods=["POST"])
+@login_required
+def delete_address(address_id):
+    if current_user.role != "client":
+        flash("Acces interzis", "error")
+        return redirect(url_for("dashboard.dashboard"))
+
+    address = Address.query.get_or_404(address_id)
+    if address.user_id != current_user.id:
+        abort(403)
+
+    try:
+        db.session.delete(address)
+        db.session.commit()
+        flash("Adresa a fost stearsa.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Eroare la stergere: {str(e)}", "error")
+
+    return redirect(url_for("dashboard.settings"))
+
+
+@dashboard_bp.route("/dashboard/process-orders")
+@login_required
+def process_orders():
+    if current_user.role not in ["angajat", "admin"]:
+        flash("Acces interzis", "error")
+        return redirect(url_for("dashboard.dashboard"))
+    try:
+        page = request.args.get("page", 1, type=int)
+        pagination = (
+            Order.query.order_by(Order.created_at.desc())
+            .paginate(page=page, per_page=12, error_out=False)
+        )
+        orders = pagination.items
+    except Exception as e:
+        current_app.logger.error("Failed to load orders for processing: %s", e)
+        flash("Nu se pot încărca comenzile: schema bazei de date nu este actualizată.", "error")
+        orders = []
+        pagination = None
+    return render_template(
+        "dashboard/process_orders.html",
+        orders=orders,
+        pagination=pagination,
+        order_statuses=ORDER_STATUSES,
+        order_transitions=ORDER_TRANSITIONS,
+    )
+
+
+def inventory_filters(args):
+    """Filtrele din pagina de inventar (cautare, categorie, stoc); folosite si la export."""
+    filters = [Product.deleted_at.is_(None)]
+    search_query = args.get("q")
+    category_filter = args.get("category")
+    stock_filter = args.get("stock_status")
+
+    if search_query:
+        term = f"%{search_query}%"
+        filters.append(
+            or_(
+                Product.title.ilike(term),
+                Product.artist.ilike(term),
+            )
+        )
+
+    if category_filter and category_filter != "":
+        filters.append(Product.category_id == category_map.id_for(category_filter))
+
+    if stock_filter:
+        if stock_filter == "out":
+            filters.append(Product.stock_total == 0)
+        elif stock_filter == "low":
+            filters.append(Product.stock_total < 5)
+            filters.append(Product.stock_total > 0)
+        elif stock_filter == "ok":
+            filters.append(Product.stock_total >= 5)
+    return filters
+
+
+@dashboard_bp.route("/dashboard/inventory")
+@login_required
+def inventory():
+    if current_user.role not in ["angajat", "admin"]:
+        flash("Acces interzis", "error")
+        return redirect(url_for("dashboard.dashboard"))
+
+    query = Product.query.filter(*inventory_filters(request.args))
+    query = query.order_by(Product.stock_total.asc(), Product.id.desc())
+    page = request.args.get("page", 1, type=int)
+    pagination = query.paginate(page=page, per_page=12, error_out=False)
+    products = pagination.items
+
+    return render_template(
+        "dashboard/inventory.html",
+        products=products,
+        values=request.args,
+        pagination=pagination,
+    )
+
+
+@dashboard_bp.route("/dashboard/users")
+@login_required
+def manage_users():
+    if current_user.role != "admin":
+        flash("Acces interzis", "error")
+        return redirect(url_for("dashboard.dashboard"))
+    page = request.args.get("page", 1, type=int)
+    pagination = User.query.order_by(User.date_created.desc()).paginate(
+        page=page, per_page=12, error_out=False
+    )
+    users = pagination.items
+    return render_template("dashboard/manage_users.html", users=users, pagination=pagination)
+
+
+@dashboard_bp.route("/dashboard/messages")
+@login_required
+def dashboard_messages():
+    if current_user.role not in ["angajat", "admin"]:
+        flash("Acces interzis", "error")
+        return redirect(url_for("dashboard.dashboard"))
+    page = request.args.get("page", 1, type=int)
+    pagination = Feedback.query.order_by(Feedback.created_at.desc()).paginate(
+        page=page, per_page=12, error_out=False
+    )
+    messages = pagination.items
+    return render_template(
+        "dashboard/messages.html",
+        messages=messages,
+        pagination=pagination,
+    )
+
+
+@dashboard_bp.route("/dashboard/jobs")
+@login_required
+def dashboard_jobs():
+    if current_user.role != "admin":
+        flash("Acces interzis", "error")
+        return redirect(url_for("dashboard.dashboard"))
+    import jobs
+
+    status = request.args.get("status") if request.args.get("status") in jobs.STATUSES else ""
+    page = request.args.get("page", 1, type=int)
+    query = Job.query.order_by(Job.id.desc())
+    if status:
+        query = query.filter(Job.status == status)
+    pagination = query.paginate(page=page, per_page=20, error_out=False)
+    totals, by_kind = jobs.stats()
+    return render_template(
+        "dashboard/jobs.html",
+        jobs=pagination.items,
+        pagination=pagination,
+        totals=totals,
+        by_kind=by_kind,
+        status=status,
+        statuses=jobs.STATUSES,
+        manual_jobs=MANUAL_JOBS,
+    )
+
+
+@dashboard_bp.route("/dashboard/jobs/enqueue", methods=["POST"])
+@login_required
+def enqueue_job():
+    if current_user.role != "admin":
+        abort(403)
+    kind = request.form.get("kind")
+    if kind not in MANUAL_JOBS:
+        flash("Job invalid.", "error")
+        return redirect(url_for("dashboard.dashboard_jobs"))
+    import jobs
+
+    job = jobs.enqueue(kind)
+    db.session.commit()
+    flash(f"Job #{job.id} ({kind}) pus in coada.", "success")
+    return redirect(url_for("dashboard.dashboard_jobs"))
+
+
+@dashboard_bp.route("/dashboard/jobs/retry", methods=["POST"])
+@login_required
+def retry_jobs():
+    if current_user.role != "admin":
+        abort(403)
+    import jobs
+
+    job_id = request.form.get("job_id", type=int)
+    count = jobs.retry(None if job_id is None else [job_id])
+    db.session.commit()
+    flash(f"Joburi repuse in coada: {count}", "success")
+    return redirect(url_for("dashboard.dashboard_jobs", status=request.form.get("status") or None))
+
+
+@dashboard_bp.route("/add_product", methods=["GET", "POST"])
+@login_required
+def add_product():
+    if current_user.role not in ["angajat", "admin"]:
+        flash("Acces interzis! Doar angajații și adminii pot adăuga produse.", "error")
+        abort(403)
+
+    if request.method == "POST":
+        title = (request.form.get("title") or "").strip()
+        artist = (request.form.get("artist") or "").strip()
+        price = request.form.get("price")
+        stock = request.form.get("stock")
+        category = (request.form.get("category") or "").strip()
+        image_url = (request.form.get("image_url") or "").strip()
+        audio_url = (request.form.get("audio_url") or "").strip()
+        description = (request.form.get("description") or "").strip()
+
+        if not title or not artist or not category:
+            flash("Completează title, artist și category.", "error")
+            return redirect(url_for("dashboard.add_product"))
+
+        try:
+            price_val = parse_price(price)
+            stock_val = int(stock)
+            if price_val < 0 or stock_val < 0:
+                raise ValueError("Price/stock trebuie să fie >= 0.")
+        except Exception:
+            flash("Preț sau stoc invalid.", "error")
+            return redirect(url_for("dashboard.add_product"))
+
+        category_id = category_map.id_for(category)
+        if category_id is None:
+            flash("Categorie invalida.", "error")
+            return redirect(url_for("dashboard.add_product"))
+
+        try:
+            product = Product(
+                title=title,
+                artist=artist,
+                price=price_val,
+                stock=stock_val,
+                category_id=category_id,
+                image_url=image_url,
+                audio_url=audio_url or None,
+                description=description,
+            )
+            db.session.add(product)
+            enqueue_image_prewarm(image_url)
+            db.session.commit()
+            cache_bus.invalidate("facets", ("catalog", [product.id]))
+            flash("Produsul a fost adăugat cu succes!", "success")
+            return redirect(url_for("dashboard.inventory"))
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Eroare: {str(e)}", "error")
+            return redirect(url_for("dashboard.add_product"))
+
+    return render_template("/dashboard/add_product.html")
+
+
+def parse_bulk_ids(raw_ids):
+    """(id-uri int unice in ordinea primita, rezultate "invalid" pentru restul)."""
+    ids = []
+    invalid = []
+    for raw in raw_ids:
+        try:
+            ids.append(int(raw))
+        except (TypeError, ValueError):
+            invalid.append({"id": raw, "result": "invalid"})
+    return list(dict.fromkeys(ids)), invalid
+
+
+def delete_products(ids):
+    """
+    Sterge produsele `ids` cu cateva statement-uri set-based, fara commit (tranzactia
+    apelantului). Produsele care apar in comenzi primesc doar deleted_at, ca istoricul
+    comenzilor sa ramana intreg. Intoarce {id: "deleted" | "archived" | "not_found"}.
+    """
+    if not ids:
+        return {}
+    existing = set(
+        db.session.execute(
+            select(Product.id).where(Product.id.in_(ids), Product.deleted_at.is_(None)).with_for_update()
+        ).scalars()
+    )
+    ordered = set(
+        db.session.execute(
+            select(OrderItem.product_id).where(OrderItem.product_id.in_(existing)).distinct()
+        ).scalars()
+    ) if existing else set()
+    removed = existing - ordered
+
+    if existing:
+        # Si produsele arhivate dispar din cosuri si din recomandari
+        db.session.execute(
+            delete(CartItem).where(CartItem.product_id.in_(existing)).execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            delete(ProductCoPurchase)
+            .where(or_(ProductCoPurchase.product_id.in_(existing), ProductCoPurchase.related_id.in_(existing)))
+            .execution_options(synchronize_session=False)
+        )
+    if ordered:
+        db.session.execute(
+            update(Product)
+            .where(Product.id.in_(ordered))
+            .values(deleted_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+    if removed:
+        db.session.execute(
+            delete(StockShard).where(StockShard.product_id.in_(removed)).execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            delete(Product).where(Product.id.in_(removed)).execution_options(synchronize_session=False)
+        )
+    return {
+        pid: "archived" if pid in ordered else "deleted" if pid in removed else "not_found"
+        for pid in ids
+    }
+
+
+def delete_users(ids, acting_user_id):
+    """
+    Sterge userii `ids` (cu adresele si cosul lor), fara commit. Userii cu comenzi raman
+    (comenzile au nevoie de user_id), iar conturile de admin (inclusiv cel curent) nu se
+    sterg de aici. Intoarce {id: "deleted" | "has_orders" | "forbidden" | "not_found"}.
+    """
+    if not ids:
+        return {}
+    roles = dict(db.session.execute(select(User.id, User.role).where(User.id.in_(ids))).all())
+    existing = set(roles)
+    protected = {uid for uid, role in roles.items() if role == "admin"} | {acting_user_id}
+    with_orders = set(
+        db.session.execute(select(Order.user_id).where(Order.user_id.in_(existing)).distinct()).scalars()
+    ) if existing else set()
+    removed = existing - with_orders - protected
+
+    if removed:
+        for model in (CartItem, Address):
+            db.session.execute(
+                delete(model).where(model.user_id.in_(removed)).execution_options(synchronize_session=False)
+            )
+        db.session.execute(
+            delete(User).where(User.id.in_(removed)).execution_options(synchronize_session=False)
+        )
+
+    def outcome(uid):
+        if uid == acting_user_id:
+            return "forbidden"
+        if uid not in existing:
+            return "not_found"
+        if uid in protected:
+            return "forbidden"
+        return "has_orders" if uid in with_orders else "deleted"
+
+    return {uid: outcome(uid) for uid in ids}
+
+
+@dashboard_bp.route("/api/products/delete", methods=["POST"])
+@login_required
+def bulk_delete_products():
+    """Sterge / arhiveaza mai multe produse intr-o singura tranzactie."""
+    if current_user.role not in ["angajat", "admin"]:
+        return jsonify({"error": "Forbidden"}), 403
+
+    raw_ids = (request.get_json(silent=True) or {}).get("ids")
+    if not isinstance(raw_ids, list) or not raw_ids:
+        return jsonify({"error": "Missing ids"}), 400
+    if len(raw_ids) > MAX_BULK_DELETE:
+        return jsonify({"error": f"Maxim {MAX_BULK_DELETE} produse per request"}), 400
+
+    ids, results = parse_bulk_ids(raw_ids)
+    try:
+        outcomes = delete_products(ids)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    changed = [pid for pid, result in outcomes.items() if result != "not_found"]
+    if changed:
+        cache_bus.invalidate(("products", changed), ("catalog", changed), "facets", "recommendations")
+    results.extend({"id": pid, "result": result} for pid, result in outcomes.items())
+    counts = list(outcomes.values())
+    return jsonify(
+        {
+            "success": True,
+            "deleted": counts.count("deleted"),
+            "archived": counts.count("archived"),
+            "results": results,
+        }
+    )
+
+
+@dashboard_bp.route("/api/users/delete", methods=["POST"])
+@login_required
+def bulk_delete_users():
+    """Sterge mai multi useri intr-o singura tranzactie (doar admin)."""
+    if current_user.role != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    raw_ids = (request.get_json(silent=True) or {}).get("ids")
+    if not isinstance(raw_ids, list) or not raw_ids:
+        return jsonify({"error": "Missing ids"}), 400
+    if len(raw_ids) > MAX_BULK_DELETE:
+        return jsonify({"error": f"Maxim {MAX_BULK_DELETE} utilizatori per request"}), 400
+
+    ids, results = parse_bulk_ids(raw_ids)
+    try:
+        outcomes = delete_users(ids, current_user.id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    results.extend({"id": uid, "result": result} for uid, result in outcomes.items())
+    return jsonify(
+        {
+            "success": True,
+            "deleted": list(outcomes.values()).count("deleted"),
+            "results": results,
+        }
+    )
+
+
+@dashboard_bp.route("/delete_product/<int:product_id>", methods=["POST"])
+@login_required
+def delete_product(product_id):
+    if current_user.role not in ["angajat", "admin"]:
+        flash("Acces interzis! Nu ai permisiunea de a șterge produse.", "error")
+        return redirect(url_for("dashboard.inventory"))
+
+    product = Product.query.filter_by(id=product_id, deleted_at=None).first_or_404()
+    title = product.title
+
+    try:
+        result = delete_products([product_id])[product_id]
+        db.session.commit()
+        cache_bus.invalidate(("products", [product_id]), ("catalog", [product_id]), "facets", "recommendations")
+        if result == "archived":
+            flash(f'Produsul "{title}" apare in comenzi; a fost ascuns din catalog.', "success")
+        else:
+            flash(f'Produsul "{title}" a fost șters din catalog.', "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Eroare la ștergere: {str(e)}", "error")
+
+    return redirect(url_for("dashboard.inventory"))
+
+
+@dashboard_bp.route("/edit_product/<int:product_id>", methods=["GET", "POST"])
+@login_required
+def edit_product(product_id):
+    if current_user.role not in ["angajat", "admin"]:
+        flash("Acces interzis!", "error")
+        return redirect(url_for("dashboard.inventory"))
+
+    product = Product.query.filter_by(id=product_id, deleted_at=None).first_or_404()
+
+    if request.method == "POST":
+        try:
+            product.title = (request.form.get("title") or "").strip()
+            product.artist = (request.form.get("artist") or "").strip()
+            product.price = parse_price(request.form.get("price"))
+            stock = int(request.form.get("stock"))
+            product.category = (request.form.get("category") or "").strip()
+            previous_image = product.image_url
+            product.image_url = (request.form.get("image_url") or "").strip()
+            product.audio_url = (request.form.get("audio_url") or "").strip() or None
+            product.description = (request.form.get("description") or "").strip()
+
+            if product.price < 0 or stock < 0:
+                raise ValueError("Price/stock trebuie să fie >= 0.")
+            if not product.title or not product.artist:
+                raise ValueError("Title/artist/category sunt obligatorii.")
+
+            # Stoc distribuit (produse foarte cerute): bifa porneste / opreste impartirea pe randuri
+            sharded = request.form.get("stock_sharded") == "1"
+            if product.stock_shards and not sharded:
+                stock_shards.disable(product)
+            if product.stock_shards:
+                # Doar o valoare schimbata in formular rescrie randurile (vanzarile din timpul editarii raman)
+                if stock != product.stock_total:
+                    stock_shards.set_total(product, stock)
+            else:
+                product.stock = stock
+                if sharded:
+                    stock_shards.enable(product)
+            if product.image_url != previous_image:
+                enqueue_image_prewarm(product.image_url)
+
+            db.session.commit()
+            cache_bus.invalidate(("products", [product_id]), ("catalog", [product_id]), "facets")
+            flash("Produsul a fost actualizat!", "success")
+            return redirect(url_for("dashboard.inventory"))
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Eroare la actualizare: {str(e)}", "error")
+
+    return render_template("dashboard/edit_product.html", product=product)
+
+
+# ===== USER MANAGEMENT =====
+
+@dashboard_bp.route("/add_user", methods=["POST"])
+@login_required
+def add_user():
+    if current_user.role != "admin":
+        flash("Acces interzis!", "error")
+        return redirect(url_for("dashboard.dashboard"))
+
+    username = (request.form.get("username") or "").strip()
+    email = (request.form.get("email") or "").strip().lower()
+    password = request.form.get("password") or ""
+    role = (request.form.get("role") or "client").strip()
+
+    if not username or not email or not password:
+        flash("Completează username, email și parolă.", "error")
+        return redirect(url_for("dashboard.manage_users"))
+
+    if User.query.filter_by(username=username).first():
+        flash("Utilizatorul există deja.", "error")
+        return redirect(url_for("dashboard.manage_users"))
+    if User.query.filter_by(email=email).first():
+        flash("Email-ul este deja folosit.", "error")
+        return redirect(url_for("dashboard.manage_users"))
+
+    try:
+        new_user = User(username=username, email=email, role=role)
+        new_user.set_password(password)
+        db.session.add(new_user)
+        db.session.commit()
+        flash(f"Utilizatorul {username} a fost creat!", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Eroare: {str(e)}", "error")
+
+    return redirect(url_for("dashboard.manage_users"))
+
+
+@dashboard_bp.route("/delete_user/<int:user_id>", methods=["POST"])
+@login_required
+def delete_user(user_id):
+    user_to_delete = User.query.get_or_404(user_id)
+
+    if current_user.role == "client":
+        if current_user.id != user_id:
+            return jsonify({"error": "Forbidden"}), 403
+        db.session.delete(user_to_delete)
+        db.session.commit()
+        logout_user()
+        flash("Contul tău a fost șters", "success")
+        return redirect(url_for("public.index"))
+
+    if current_user.role == "admin":
+        username = user_to_delete.username
+        result = delete_users([user_id], current_user.id)[user_id]
+        db.session.commit()
+        if result == "deleted":
+            flash(f"Utilizatorul {username} a fost șters", "success")
+        elif result == "has_orders":
+            flash(f"Utilizatorul {username} are comenzi si nu poate fi șters.", "error")
+        else:
+            flash("Nu poti sterge propriul cont sau alt admin din administrare.", "error")
+        return redirect(url_for("dashboard.manage_users"))
+
+    return jsonify({"error": "Forbidden"}), 403
+
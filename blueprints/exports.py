@@ -0,0 +1,117 @@
+"""
+Export CSV / JSONL pentru comenzi, inventar si utilizatori.
+Modulul e incarcat lazy (vezi blueprints/__init__.py).
+
+Randurile se citesc cu server-side cursor (yield_per) si se trimit pe bucati
+(chunked transfer), deci memoria nu creste cu dimensiunea tabelei.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from flask import Response, abort, request, stream_with_context
+from flask_login import login_required, current_user
+from sqlalchemy import select
+
+from blueprints.dashboard import inventory_filters
+from models import db, User, Product, Order, Category
+
+EXPORT_BATCH_SIZE = 5000
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def _encode_csv(rows, header=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _encode_jsonl(rows, columns):
+    return "".join(json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False) + "\n" for row in rows)
+
+
+def stream_export(stmt, name, fmt):
+    """Raspuns streaming pentru `stmt`; o partitie din cursor = un chunk HTTP."""
+    columns = list(stmt.selected_columns.keys())
+
+    def generate():
+        # Conexiune separata de sesiune: cursorul ramane deschis cat dureaza download-ul
+        with db.engine.connect() as conn:
+            result = conn.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(stmt)
+            if fmt == "csv":
+                yield _encode_csv([], header=columns)
+            for partition in result.partitions():
+                if fmt == "csv":
+                    yield _encode_csv(partition)
+                else:
+                    yield _encode_jsonl(partition, columns)
+
+    filename = f"{name}_{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@login_required
+def export_orders(fmt):
+    if current_user.role not in ["angajat", "admin"]:
+        abort(403)
+    stmt = select(
+        Order.id,
+        Order.user_id,
+        User.username,
+        Order.status,
+        Order.total_price,
+        Order.shipping_name,
+        Order.shipping_phone,
+        Order.shipping_address,
+        Order.created_at,
+    ).join(User, User.id == Order.user_id)
+    status = request.args.get("status")
+    if status:
+        stmt = stmt.where(Order.status == status)
+    return stream_export(stmt.order_by(Order.created_at.desc(), Order.id.desc()), "orders", fmt)
+
+
+@login_required
+def export_inventory(fmt):
+    if current_user.role not in ["angajat", "admin"]:
+        abort(403)
+    stmt = (
+        select(
+            Product.id,
+            Product.title,
+            Product.artist,
+            Category.name.label("category"),
+            Product.price,
+            Product.stock_total.label("stock"),
+            Product.date_added,
+        )
+        .outerjoin(Category, Category.id == Product.category_id)
+        .where(*inventory_filters(request.args))
+        .order_by(Product.stock_total.asc(), Product.id.desc())
+    )
+    return stream_export(stmt, "inventory", fmt)
+
+
+@login_required
+def export_users(fmt):
+    if current_user.role != "admin":
+        abort(403)
+    stmt = select(User.id, User.username, User.email, User.role, User.date_created).order_by(
+        User.date_created.desc()
+    )
+    return stream_export(stmt, "users", fmt)
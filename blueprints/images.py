@@ -0,0 +1,53 @@
+"""
+Variantele redimensionate ale imaginilor de produs (vezi image_pipeline.py).
+Modulul e incarcat lazy (vezi blueprints/__init__.py).
+
+Un request pentru o varianta existenta pe disc nu atinge DB-ul. Daca varianta lipseste,
+request-ul nu o genereaza (download + resize ar tine workerul ocupat): pune in coada un
+job images.prewarm si redirectioneaza catre imaginea originala. Raspunsurile cu fisier au
+cache de un an ("immutable"), pentru ca URL-ul contine hash-ul lui image_url.
+"""
+import os
+
+from flask import abort, current_app, redirect, send_file, url_for
+
+import jobs
+from image_pipeline import DIGEST_RE, EXTENSIONS, IMAGE_WIDTHS, image_ext, image_format, url_digest, variant_path
+from models import db, Product
+
+CACHE_SECONDS = 365 * 24 * 3600
+
+
+def product_image(product_id, digest, width, ext):
+    if width not in IMAGE_WIDTHS or not DIGEST_RE.fullmatch(digest) or ext not in EXTENSIONS.values():
+        abort(404)
+
+    image_type, current_ext = image_format(), image_ext()
+    path = variant_path(digest, width) if image_type else None
+    if path is None or ext != current_ext or not os.path.exists(path):
+        product = db.session.get(Product, product_id)
+        if product is None or not product.image_url:
+            abort(404)
+        if not image_type:
+            return redirect(product.image_url)
+        current = url_digest(product.image_url)
+        if current != digest or ext != current_ext:
+            # Imaginea produsului (sau formatul) s-a schimbat de la randarea paginii
+            return redirect(
+                url_for("images.product_image", product_id=product_id, digest=current, width=width, ext=current_ext)
+            )
+        try:
+            jobs.enqueue_once("images.prewarm", {"urls": [product.image_url]})
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            current_app.logger.warning("Imagine %s: jobul nu a putut fi pus in coada: %s", product.image_url, exc)
+        # Redirect temporar, fara cache: urmatorul request gaseste varianta generata
+        response = redirect(product.image_url)
+        response.cache_control.no_store = True
+        return response
+
+    response = send_file(path, mimetype=f"image/{image_type}", max_age=CACHE_SECONDS, conditional=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,113 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import current_user
+
+from catalog_facets import catalog_filters, facet_cache
+from catalog_snapshot import catalog_snapshot
+from models import db, Product, Feedback, NewsletterSubscriber
+from recommendations import recommendation_index
+
+public_bp = Blueprint("public", __name__)
+
+
+@public_bp.route("/")
+def index():
+    products = Product.query.filter(Product.deleted_at.is_(None)).order_by(Product.date_added.desc()).limit(6).all()
+    return render_template("index.html", products=products)
+
+
+@public_bp.route("/contact", methods=["GET", "POST"])
+def contact():
+    if request.method == "POST":
+        name = (request.form.get("name") or "").strip()
+        email = (request.form.get("email") or "").strip().lower()
+        subject = (request.form.get("subject") or "").strip()
+        message = (request.form.get("message") or "").strip()
+
+        if not name or not email or not message:
+            flash("Completeaza nume, email si mesaj.", "error")
+            return redirect(url_for("public.contact"))
+
+        try:
+            fb = Feedback(name=name, email=email, subject=subject, message=message)
+            db.session.add(fb)
+            db.session.commit()
+            flash("Multumim pentru mesaj! Te vom contacta in curand.", "success")
+        except Exception:
+            db.session.rollback()
+            flash("Nu am putut salva mesajul. Incearca din nou.", "error")
+
+        return redirect(url_for("public.contact"))
+    return render_template("contact.html")
+
+
+@public_bp.route("/newsletter", methods=["POST"])
+def newsletter_subscribe():
+    email = (request.form.get("email") or "").strip().lower()
+    if not email or "@" not in email:
+        flash("Introdu un email valid pentru newsletter.", "error")
+        return redirect(request.referrer or url_for("public.index"))
+
+    existing = NewsletterSubscriber.query.filter_by(email=email).first()
+    if existing:
+        flash("Esti deja abonat la newsletter.", "info")
+        return redirect(request.referrer or url_for("public.index"))
+
+    try:
+        db.session.add(NewsletterSubscriber(email=email))
+        db.session.commit()
+        flash("Te-ai abonat cu succes!", "success")
+    except Exception:
+        db.session.rollback()
+        flash("Nu am putut salva email-ul. Incearca din nou.", "error")
+
+    return redirect(request.referrer or url_for("public.index"))
+
+
+@public_bp.route("/product/<int:product_id>")
+def product_detail(product_id):
+    product = Product.query.filter_by(id=product_id, deleted_at=None).first_or_404()
+    recommended = recommendation_index.products_for(product)
+    return render_template("product_detail.html", product=product, recommended=recommended)
+
+
+@public_bp.route("/catalog")
+def catalog():
+    sort_by = request.args.get("sort")
+    page = request.args.get("page", 1, type=int)
+
+    # --- SEARCH (cu termeni multipli) + FILTERS ---
+    facet_key, filters = catalog_filters(request.args)
+
+    # Fara cautare text / artist: filtrare + sortare + paginare din snapshot-ul in memorie
+    pagination = catalog_snapshot.paginate(facet_key, sort_by, page, per_page=12)
+    if pagination is None:
+        query = Product.query.filter(*[condition for group in filters.values() for condition in group])
+        if not current_user.is_authenticated:
+            # Vizitatorii anonimi pot citi lista din replica (db_replica.py)
+            query = query.execution_options(replica=True)
+
+        # --- SORT --- (id desc departajeaza egalitatile, ca paginile sa fie stabile)
+        if sort_by == "price_asc":
+            query = query.order_by(Product.price.asc(), Product.id.desc())
+        elif sort_by == "price_desc":
+            query = query.order_by(Product.price.desc(), Product.id.desc())
+        elif sort_by == "name_asc":
+            query = query.order_by(Product.title.asc(), Product.id.desc())
+        else:
+            query = query.order_by(Product.id.desc())
+
+        pagination = query.paginate(page=page, per_page=12, error_out=False)
+    products = pagination.items
+
+    # Numaratorile pe fatete (categorie / pret / artist), din cache cand filtrele se repeta
+    facets = facet_cache.get(facet_key, filters)
+    link_args = {key: value for key, value in request.args.items() if key != "page" and value}
+
+    return render_template(
+        "catalog.html",
+        products=products,
+        pagination=pagination,
+        values=request.args,
+        facets=facets,
+        link_args=link_args,
+    )
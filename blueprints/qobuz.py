@@ -0,0 +1,248 @@
+"""
+Proxy server-side catre API-ul Qobuz.
+Modulul (si `requests`) e incarcat lazy (vezi blueprints/__init__.py).
+
+URL-urile de preview sunt semnate si expira (parametrul `etsp` = timestamp unix);
+sunt tinute in cache pana cu PREVIEW_EXPIRY_MARGIN secunde inainte de expirare.
+/api/qobuz/previews rezolva mai multe piese intr-un singur request, cu cel mult
+QOBUZ_PREVIEW_CONCURRENCY apeluri upstream simultane (pool comun per worker).
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from flask import request, jsonify
+from flask_login import login_required, current_user
+
+API_BASE = "https://fabianchelu.vercel.app/api"
+MAX_BATCH_TRACKS = 50
+PREVIEW_EXPIRY_MARGIN = 60
+# Daca URL-ul nu are `etsp`, cat timp il consideram valid
+PREVIEW_DEFAULT_TTL = 300
+# Piesele fara preview nu sunt recerute upstream la fiecare pagina
+PREVIEW_FAILURE_TTL = 30
+PREVIEW_CACHE_SIZE = 4096
+
+_preview_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("QOBUZ_PREVIEW_CONCURRENCY", "6")),
+    thread_name_prefix="qobuz-preview",
+)
+_preview_cache = {}
+_preview_lock = threading.Lock()
+_local = threading.local()
+
+
+def _session():
+    """Un requests.Session per thread (keep-alive catre upstream)."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _url_expiry(url):
+    try:
+        return int(parse_qs(urlparse(url).query)["etsp"][0])
+    except (KeyError, IndexError, ValueError):
+        return time.time() + PREVIEW_DEFAULT_TTL
+
+
+def _cached_preview(track_id, quality):
+    """URL-ul din cache, "" pentru un esec recent, None daca piesa nu e in cache."""
+    entry = _preview_cache.get((track_id, quality))
+    if entry and entry[0] > time.time():
+        return entry[1]
+    return None
+
+
+def _fetch_preview(track_id, quality):
+    try:
+        resp = _session().get(
+            f"{API_BASE}/download-music",
+            params={"track_id": track_id, "quality": quality},
+            timeout=10,
+        )
+        data = resp.json()
+        if not data.get("success"):
+            return None
+        url = (data.get("data") or {}).get("url")
+    except Exception:
+        # Retea, raspuns ne-JSON sau JSON cu alta forma (lista, null...): preview esuat
+        return None
+    return url if isinstance(url, str) and url else None
+
+
+def _resolve_preview(track_id, quality):
+    """URL-ul semnat pentru piesa (din cache sau upstream); "" daca nu poate fi obtinut."""
+    url = _cached_preview(track_id, quality)
+    if url is not None:
+        return url
+    url = _fetch_preview(track_id, quality)
+    if url:
+        valid_until = _url_expiry(url) - PREVIEW_EXPIRY_MARGIN
+    else:
+        url, valid_until = "", time.time() + PREVIEW_FAILURE_TTL
+
+    if valid_until > time.time():
+        with _preview_lock:
+            if len(_preview_cache) >= PREVIEW_CACHE_SIZE:
+                now = time.time()
+                for key in [key for key, (until, _) in _preview_cache.items() if until <= now]:
+                    del _preview_cache[key]
+                if len(_preview_cache) >= PREVIEW_CACHE_SIZE:
+                    _preview_cache.clear()
+            _preview_cache[(track_id, quality)] = (valid_until, url)
+    return url
+
+
+@login_required
+def qobuz_search():
+    if current_user.role not in ["angajat", "admin"]:
+        return jsonify({"error": "Forbidden"}), 403
+
+    term = (request.args.get("term") or "").strip()
+    if not term:
+        return jsonify({"error": "Missing term"}), 400
+    page = request.args.get("page", 1, type=int)
+    page = max(1, page)
+    per_page = 10
+    offset = (page - 1) * per_page
+
+    try:
+        resp = requests.get(
+            f"{API_BASE}/get-music",
+            params={"q": term, "offset": offset},
+            timeout=10,
+        )
+        data = resp.json()
+    except Exception:
+        return jsonify({"error": "Qobuz request failed"}), 502
+
+    if not data.get("success"):
+        return jsonify({"error": "Qobuz request failed"}), 502
+
+    payload = data.get("data") or {}
+    albums = payload.get("albums") or {}
+    tracks = payload.get("tracks") or {}
+    preview_track_by_album = {}
+    for track in tracks.get("items") or []:
+        album_id = (track.get("album") or {}).get("id")
+        track_id = track.get("id")
+        if album_id and track_id and album_id not in preview_track_by_album:
+            preview_track_by_album[album_id] = track_id
+    results = []
+    for album in albums.get("items") or []:
+        image = album.get("image") or {}
+        results.append(
+            {
+                "collectionId": album.get("id"),
+                "collectionName": album.get("title"),
+                "artistName": (album.get("artist") or {}).get("name"),
+                "artworkUrl100": image.get("small") or image.get("thumbnail"),
+                "artworkUrl600": image.get("large"),
+                "releaseDate": album.get("release_date_original")
+                or album.get("release_date_download")
+                or album.get("release_date_stream"),
+                "primaryGenreName": (album.get("genre") or {}).get("name"),
+                "collectionType": "album",
+                "previewTrackId": preview_track_by_album.get(album.get("id")),
+            }
+        )
+
+    total = int(albums.get("total") or len(results))
+    limit = int(albums.get("limit") or per_page)
+    total_pages = max(1, (total + limit - 1) // limit)
+    page = max(1, min(page, total_pages))
+
+    return jsonify(
+        {
+            "items": results,
+            "page": page,
+            "per_page": limit,
+            "total": total,
+            "total_pages": total_pages,
+        }
+    )
+
+
+def qobuz_preview(track_id):
+    quality = request.args.get("quality", 27, type=int)
+    url = _resolve_preview(track_id, quality)
+    if not url:
+        return jsonify({"error": "Qobuz preview failed"}), 502
+
+    return jsonify({"url": url})
+
+
+def qobuz_previews():
+    """
+    GET /api/qobuz/previews?ids=1,2,3 -> {"urls": {"1": "...", ...}, "failed": [3]}
+    Piesele lipsa din cache sunt rezolvate in paralel (fan-out limitat de pool).
+    """
+    quality = request.args.get("quality", 27, type=int)
+    try:
+        ids = list(dict.fromkeys(int(part) for part in (request.args.get("ids") or "").split(",") if part.strip()))
+    except ValueError:
+        return jsonify({"error": "Invalid ids"}), 400
+    if not ids:
+        return jsonify({"error": "Missing ids"}), 400
+    if len(ids) > MAX_BATCH_TRACKS:
+        return jsonify({"error": f"Maxim {MAX_BATCH_TRACKS} piese per request"}), 400
+
+    urls = {track_id: _cached_preview(track_id, quality) for track_id in ids}
+    missing = [track_id for track_id, url in urls.items() if url is None]
+    if missing:
+        resolved = _preview_pool.map(lambda track_id: _resolve_preview(track_id, quality), missing)
+        urls.update(zip(missing, resolved))
+
+    return jsonify(
+        {
+            "urls": {str(track_id): url for track_id, url in urls.items() if url},
+            "failed": [track_id for track_id, url in urls.items() if not url],
+        }
+    )
+
+
+def qobuz_album(album_id):
+
+    try:
+        resp = requests.get(
+            f"{API_BASE}/get-album",
+            params={"album_id": album_id},
+            timeout=10,
+        )
+        data = resp.json()
+    except Exception:
+        return jsonify({"error": "Qobuz album request failed"}), 502
+
+    if not data.get("success"):
+        return jsonify({"error": "Qobuz album request failed"}), 502
+
+    album = data.get("data") or {}
+    tracks = ((album.get("tracks") or {}).get("items") or [])
+    track_list = []
+    for t in tracks:
+        track_list.append(
+            {
+                "id": t.get("id"),
+                "title": t.get("title"),
+                "duration": t.get("duration"),
+                "trackNumber": t.get("track_number"),
+            }
+        )
+
+    return jsonify(
+        {
+            "albumId": album.get("id"),
+            "title": album.get("title"),
+            "artistName": (album.get("artist") or {}).get("name"),
+            "releaseDate": album.get("release_date_original")
+            or album.get("release_date_download")
+            or album.get("release_date_stream"),
+            "primaryGenreName": (album.get("genre") or {}).get("name"),
+            "tracks": track_list,
+        }
+    )
+
@@ -0,0 +1,135 @@
+"""
+Endpoint-uri JSON pentru rapoartele din dashboard.
+Modulul e incarcat lazy (vezi blueprints/__init__.py). Rapoartele citesc din replica,
+daca e configurata (db_replica.py); filtrele pe interval de created_at se restrang la
+partitiile lunare atinse (order_partitions.py).
+"""
+from datetime import datetime, timedelta
+
+from flask import request, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy import func
+
+from db_pool import pool_status
+from db_replica import replica_reads, replica_status
+from models import db, User, Product, Order, OrderItem
+from order_partitions import day_bounds
+from rate_limit import rate_limiter
+
+
+@login_required
+@replica_reads
+def get_dashboard_stats():
+    if current_user.role == "admin":
+        stats = {}
+
+        stats["total_orders"] = Order.query.count()
+        stats["pending_orders"] = Order.query.filter_by(status="pending").count()
+        stats["shipped_orders"] = Order.query.filter_by(status="shipped").count()
+        stats["cancelled_orders"] = Order.query.filter_by(status="cancelled").count()
+
+        total_revenue = db.session.query(func.coalesce(func.sum(Order.total_price), 0)).scalar()
+        stats["total_revenue"] = float(total_revenue or 0)
+
+        # Interval pe created_at (nu date(created_at)): pe Postgres se citeste doar partitia lunii
+        today_start, tomorrow = day_bounds(datetime.utcnow().date())
+        today_revenue = (
+            db.session.query(func.coalesce(func.sum(Order.total_price), 0))
+            .filter(Order.created_at >= today_start, Order.created_at < tomorrow)
+            .scalar()
+        )
+        stats["today_revenue"] = float(today_revenue or 0)
+
+        stats["total_users"] = User.query.filter_by(role="client").count()
+
+        active = Product.query.filter(Product.deleted_at.is_(None))
+        stats["total_products"] = active.count()
+        stats["low_stock"] = active.filter(Product.stock_total < 5).count()
+
+        return jsonify(stats)
+
+    return jsonify({"error": "Forbidden"}), 403
+
+
+@login_required
+@replica_reads
+def get_top_products():
+    if current_user.role not in ["admin", "angajat"]:
+        return jsonify({"error": "Forbidden"}), 403
+
+    # FIX MAJOR (PostgreSQL): join explicit + group_by complet
+    top_products = (
+        db.session.query(
+            Product.id,
+            Product.title,
+            Product.artist,
+            Product.price,
+            func.coalesce(func.sum(OrderItem.quantity), 0).label("qty_sold"),
+            func.coalesce(func.sum(OrderItem.quantity * OrderItem.price), 0).label("revenue"),
+        )
+        .join(OrderItem, OrderItem.product_id == Product.id)
+        .group_by(Product.id, Product.title, Product.artist, Product.price)
+        .order_by(func.sum(OrderItem.quantity).desc())
+        .limit(10)
+        .all()
+    )
+
+    result = [
+        {
+            "id": p[0],
+            "title": p[1],
+            "artist": p[2],
+            "price": float(p[3]),
+            "qty_sold": int(p[4] or 0),
+            "revenue": float(p[5] or 0),
+        }
+        for p in top_products
+    ]
+
+    return jsonify(result)
+
+
+@login_required
+@replica_reads
+def get_orders_by_date():
+    if current_user.role not in ["admin", "angajat"]:
+        return jsonify({"error": "Forbidden"}), 403
+
+    days_back = request.args.get("days", 30, type=int)
+    start_date, _ = day_bounds(datetime.utcnow().date() - timedelta(days=days_back))
+
+    orders_by_date = (
+        db.session.query(
+            db.func.date(Order.created_at).label("date"),
+            func.count(Order.id).label("count"),
+            func.coalesce(func.sum(Order.total_price), 0).label("revenue"),
+        )
+        .filter(Order.created_at >= start_date)
+        .group_by(db.func.date(Order.created_at))
+        .order_by(db.func.date(Order.created_at))
+        .all()
+    )
+
+    result = [
+        {"date": str(row[0]), "count": int(row[1]), "revenue": float(row[2] or 0)}
+        for row in orders_by_date
+    ]
+
+    return jsonify(result)
+
+
+@login_required
+def get_db_pool_stats():
+    if current_user.role != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+    status = pool_status(db.engine)
+    status["replica"] = replica_status()
+    return jsonify(status)
+
+
+@login_required
+def get_rate_limit_stats():
+    if current_user.role != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+    # Contoarele sunt ale workerului care raspunde
+    return jsonify(rate_limiter.snapshot())
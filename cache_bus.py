@@ -0,0 +1,249 @@
+"""
+Invalidarea cache-urilor per worker (produse, snapshot catalog, fatete, categorii,
+recomandari) in toate procesele si pe toate nodurile, fara server de cache.
+
+Dupa commit, codul care scrie apeleaza invalidate(...): cache-urile locale se golesc
+imediat, iar evenimentul pleaca spre celelalte procese:
+- Postgres: NOTIFY pe canalul CHANNEL; fiecare worker are un thread care asculta (LISTEN)
+  pe o conexiune dedicata si aplica invalidarile cum sosesc;
+- alte DB-uri (SQLite): un rand in tabela cache_events (outbox), citit de thread la fiecare
+  CACHE_BUS_POLL_INTERVAL secunde; randurile mai vechi de OUTBOX_RETENTION se sterg.
+
+Thread-ul porneste la primul request din fiecare worker (dupa fork, gunicorn --preload).
+Dupa o conexiune pierduta pe Postgres toate cache-urile se golesc (NOTIFY-urile din pauza
+nu se pot recupera). TTL-urile cache-urilor raman plasa de siguranta pentru un eveniment
+pierdut (ex: proces oprit intre commit si publicare). CACHE_BUS=0 dezactiveaza publicarea.
+"""
+import json
+import logging
+import os
+import select as select_module
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, delete, event, func, insert, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from models import db, CacheEvent
+
+CHANNEL = "cache_invalidation"
+# NOTIFY accepta payload-uri sub 8000 de bytes; peste limita, id-urile devin "tot cache-ul"
+MAX_PAYLOAD = 7000
+OUTBOX_RETENTION = timedelta(minutes=10)
+POLL_INTERVAL = float(os.getenv("CACHE_BUS_POLL_INTERVAL", "0.5"))
+RECONNECT_DELAY = 2.0
+ENABLED = os.getenv("CACHE_BUS", "1") != "0"
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+_lock = threading.Lock()
+_origin = (None, None)
+_listener_pid = None
+
+
+def register(name, handler):
+    """`handler(ids)` goleste cache-ul `name`: doar id-urile date sau tot (ids=None)."""
+    _handlers[name] = handler
+
+
+def _origin_id():
+    # Id nou dupa fork: fiecare worker isi recunoaste (si ignora) propriile evenimente
+    global _origin
+    pid = os.getpid()
+    if _origin[0] != pid:
+        _origin = (pid, f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}")
+    return _origin[1]
+
+
+def _normalize(targets):
+    result = []
+    for target in targets:
+        name, ids = (target, None) if isinstance(target, str) else target
+        result.append([name, sorted(set(ids)) if ids is not None else None])
+    return result
+
+
+def apply(targets):
+    for name, ids in targets:
+        handler = _handlers.get(name)
+        if handler is not None:
+            handler(ids)
+
+
+def invalidate(*targets):
+    """
+    Goleste cache-urile local si anunta celelalte procese. `targets` sunt nume de cache
+    ("facets") sau perechi (nume, ids): invalidate(("products", [1, 2]), "facets").
+    Se apeleaza dupa commit; o eroare la publicare e doar logata (scrierea e deja facuta).
+    """
+    targets = _normalize(targets)
+    apply(targets)
+    if not ENABLED:
+        return
+    try:
+        publish(targets)
+    except Exception:
+        logger.exception("cache_bus: publicarea invalidarii a esuat")
+
+
+def invalidate_after_commit(*targets):
+    """Ca invalidate(), dar amanat pana la commit-ul sesiunii curente (anulat la rollback)."""
+    session = db.session()
+    if not session.in_transaction():
+        invalidate(*targets)
+        return
+    session.info.setdefault("cache_bus", []).extend(targets)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    targets = session.info.pop("cache_bus", None)
+    if targets:
+        invalidate(*targets)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    # Si rollback() fara tranzactie deschisa; un savepoint anulat nu atinge tranzactia mare
+    if not previous_transaction.nested:
+        session.info.pop("cache_bus", None)
+
+
+def _payload(targets):
+    payload = json.dumps({"origin": _origin_id(), "targets": targets}, separators=(",", ":"))
+    if len(payload) > MAX_PAYLOAD:
+        targets = [[name, None] for name, _ in targets]
+        payload = json.dumps({"origin": _origin_id(), "targets": targets}, separators=(",", ":"))
+    return payload
+
+
+def publish(targets):
+    """Trimite evenimentul pe o conexiune separata (nu atinge tranzactia sesiunii)."""
+    payload = _payload(targets)
+    with db.engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+        else:
+            connection.execute(insert(CacheEvent).values(payload=payload, created_at=datetime.utcnow()))
+            connection.execute(delete(CacheEvent).where(CacheEvent.created_at < datetime.utcnow() - OUTBOX_RETENTION))
+
+
+def _handle(payload):
+    try:
+        event_data = json.loads(payload)
+    except ValueError:
+        logger.warning("cache_bus: eveniment invalid ignorat")
+        return
+    if event_data.get("origin") != _origin_id():
+        apply(event_data.get("targets") or [])
+
+
+def _flush_all():
+    apply([[name, None] for name in _handlers])
+
+
+class _PostgresListener:
+    """LISTEN pe o conexiune proprie (in afara pool-ului aplicatiei), in autocommit."""
+
+    def __init__(self, engine):
+        self.engine = create_engine(engine.url, poolclass=NullPool)
+        self.raw = None
+        self.connection = None
+
+    def connect(self):
+        # Referinta la proxy-ul din pool: fara ea, NullPool inchide conexiunea imediat
+        self.raw = self.engine.raw_connection()
+        self.connection = self.raw.dbapi_connection
+        self.connection.autocommit = True
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+
+    def wait(self):
+        if select_module.select([self.connection], [], [], 5.0) == ([], [], []):
+            return
+        self.connection.poll()
+        while self.connection.notifies:
+            _handle(self.connection.notifies.pop(0).payload)
+
+    def close(self):
+        try:
+            # invalidate(): conexiunea moarta e aruncata fara rollback
+            self.raw.invalidate()
+        except Exception:
+            pass
+        self.raw = None
+        self.connection = None
+
+
+class _OutboxListener:
+    """Citeste evenimentele noi din cache_events (id > ultimul vazut)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.last_id = None
+
+    def connect(self):
+        if self.last_id is None:
+            with self.engine.connect() as connection:
+                self.last_id = connection.execute(select(func.coalesce(func.max(CacheEvent.id), 0))).scalar()
+
+    def wait(self):
+        time.sleep(POLL_INTERVAL)
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(CacheEvent.id, CacheEvent.payload).where(CacheEvent.id > self.last_id).order_by(CacheEvent.id)
+            ).all()
+        for row in rows:
+            _handle(row.payload)
+            self.last_id = row.id
+
+    def close(self):
+        pass
+
+
+def _run(listener, connected):
+    while True:
+        if not connected:
+            try:
+                listener.connect()
+                connected = True
+                # Evenimentele din timpul pauzei s-au pierdut (NOTIFY nu se pastreaza)
+                if isinstance(listener, _PostgresListener):
+                    _flush_all()
+            except Exception:
+                logger.warning("cache_bus: reconectare esuata, reincerc in %.0fs", RECONNECT_DELAY)
+                time.sleep(RECONNECT_DELAY)
+                continue
+        try:
+            listener.wait()
+        except Exception:
+            logger.exception("cache_bus: ascultarea a esuat")
+            listener.close()
+            connected = False
+
+
+def start():
+    """Porneste thread-ul de ascultare pentru procesul curent (o singura data per pid)."""
+    global _listener_pid
+    pid = os.getpid()
+    if not ENABLED or _listener_pid == pid:
+        return
+    with _lock:
+        if _listener_pid == pid:
+            return
+        engine = db.engine
+        listener = _PostgresListener(engine) if engine.dialect.name == "postgresql" else _OutboxListener(engine)
+        # Prima conectare e sincrona: evenimentele de dupa primul request nu se pierd
+        try:
+            listener.connect()
+            connected = True
+        except Exception:
+            logger.exception("cache_bus: conectarea a esuat, reincerc in fundal")
+            connected = False
+        threading.Thread(target=_run, args=(listener, connected), name="cache-bus", daemon=True).start()
+        _listener_pid = pid
@@ -0,0 +1,183 @@
+"""
+Cosul persistent pe server (cart_items): citire cu un singur JOIN, merge la login,
+actualizari delta (doar liniile schimbate, cu cantitatea absoluta) si transformarea
+cosului in comanda (linii + total + stoc calculate in SQL).
+
+Functiile de aici nu fac commit; apelantul decide tranzactia.
+"""
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, CartItem, Order, OrderItem, Product
+import stock_shards
+
+MAX_CART_QUANTITY = 999
+
+
+def _upsert(rows, keep_max):
+    """INSERT ... ON CONFLICT (user_id, product_id) DO UPDATE; `keep_max` = merge (cantitatea cea mai mare)."""
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(CartItem)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(CartItem)
+    else:
+        # Fallback generic: merge() face SELECT + INSERT/UPDATE per rand
+        for row in rows:
+            existing = db.session.get(CartItem, (row["user_id"], row["product_id"]))
+            if existing and keep_max:
+                existing.quantity = max(existing.quantity, row["quantity"])
+            else:
+                db.session.merge(CartItem(**row))
+        return
+
+    quantity = stmt.excluded.quantity
+    if keep_max:
+        quantity = case((CartItem.quantity > stmt.excluded.quantity, CartItem.quantity), else_=quantity)
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[CartItem.user_id, CartItem.product_id],
+            set_={"quantity": quantity},
+        ),
+        rows,
+    )
+
+
+def _existing_product_ids(product_ids):
+    if not product_ids:
+        return set()
+    return set(
+        db.session.execute(
+            select(Product.id).where(Product.id.in_(product_ids), Product.deleted_at.is_(None))
+        ).scalars()
+    )
+
+
+def apply_cart_changes(user_id, quantities, keep_max=False):
+    """
+    Aplica {product_id: cantitate}; 0 sterge linia. Produsele inexistente sunt ignorate.
+    Cu `keep_max` (merge la login) o linie existenta nu scade si nu e stearsa.
+    Cantitatile sunt deja validate (parse_cart: cel mult MAX_CART_QUANTITY).
+    """
+    removed = [pid for pid, qty in quantities.items() if qty <= 0]
+    upserts = {pid: qty for pid, qty in quantities.items() if qty > 0}
+
+    if removed and not keep_max:
+        db.session.execute(
+            delete(CartItem).where(CartItem.user_id == user_id, CartItem.product_id.in_(removed))
+        )
+    valid = _existing_product_ids(list(upserts))
+    rows = [
+        {"user_id": user_id, "product_id": pid, "quantity": qty}
+        for pid, qty in sorted(upserts.items())
+        if pid in valid
+    ]
+    if rows:
+        _upsert(rows, keep_max)
+
+
+def load_cart(user_id, for_update=False):
+    """
+    Liniile cosului cu produsul asociat, intr-un singur SELECT ... JOIN products; produsele
+    arhivate (deleted_at) lipsesc, ca in catalog. Cu `for_update` se blocheaza (si se recitesc) randurile din products, mai putin cele ale
+    produselor cu stoc distribuit: acolo scaderea stocului e ea insasi verificarea.
+    """
+    stmt = (
+        select(CartItem.quantity, Product)
+        .join(Product, Product.id == CartItem.product_id)
+        .where(CartItem.user_id == user_id, Product.deleted_at.is_(None))
+        .order_by(CartItem.product_id)
+    )
+    rows = db.session.execute(stmt).all()
+    locked = [product.id for _, product in rows if not product.stock_shards] if for_update else []
+    if locked:
+        db.session.execute(
+            select(Product)
+            .where(Product.id.in_(locked))
+            .order_by(Product.id)
+            # NO KEY UPDATE: nu intra in conflict cu FK-urile din cart_items / order_items (KEY SHARE)
+            # ale altor checkout-uri, care altfel se blocheaza reciproc (deadlock)
+            .with_for_update(of=Product, key_share=True)
+            .execution_options(populate_existing=True)
+        )
+    return rows
+
+
+def clear_cart(user_id):
+    db.session.execute(delete(CartItem).where(CartItem.user_id == user_id))
+
+
+def place_cart_order(order_id, user_id):
+    """
+    Copiaza cosul in order_items (INSERT ... SELECT cu pretul curent), seteaza
+    orders.total_price = SUM(price * quantity), scade stocul si goleste cosul.
+    Pe Postgres liniile si totalul sunt un singur statement (INSERT ... RETURNING in CTE).
+    Intoarce totalul comenzii (Decimal); InsufficientStock daca un produs cu stoc distribuit
+    s-a epuizat intre timp. Liniile cu produse arhivate se scot din cos, nu se comanda.
+    """
+    db.session.execute(
+        delete(CartItem)
+        .where(
+            CartItem.user_id == user_id,
+            CartItem.product_id.in_(select(Product.id).where(Product.deleted_at.is_not(None))),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    lines = (
+        select(literal(order_id), CartItem.product_id, CartItem.quantity, Product.price)
+        .join(Product, Product.id == CartItem.product_id)
+        .where(CartItem.user_id == user_id)
+    )
+    insert_lines = insert(OrderItem).from_select(["order_id", "product_id", "quantity", "price"], lines)
+
+    if db.engine.dialect.name == "postgresql":
+        inserted = insert_lines.returning(OrderItem.price, OrderItem.quantity).cte("inserted")
+        total = select(func.coalesce(func.sum(inserted.c.price * inserted.c.quantity), 0)).scalar_subquery()
+        stmt = update(Order).add_cte(inserted)
+    else:
+        db.session.execute(insert_lines)
+        total = (
+            select(func.coalesce(func.sum(OrderItem.price * OrderItem.quantity), 0))
+            .where(OrderItem.order_id == order_id)
+            .scalar_subquery()
+        )
+        stmt = update(Order)
+    order_total = db.session.execute(
+        stmt.values(total_price=total)
+        .where(Order.id == order_id)
+        .returning(Order.total_price)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+
+    db.session.execute(
+        update(Product)
+        .values(stock=Product.stock - CartItem.quantity)
+        .where(Product.id == CartItem.product_id, CartItem.user_id == user_id, Product.stock_shards == 0)
+        .execution_options(synchronize_session=False)
+    )
+    sharded = db.session.execute(
+        select(CartItem.product_id, CartItem.quantity, Product.stock_shards)
+        .join(Product, Product.id == CartItem.product_id)
+        .where(CartItem.user_id == user_id, Product.stock_shards > 0)
+        .order_by(CartItem.product_id)
+    ).all()
+    for row in sharded:
+        if not stock_shards.take(row.product_id, row.stock_shards, row.quantity):
+            raise stock_shards.InsufficientStock(row.product_id)
+    clear_cart(user_id)
+    return order_total
+
+
+def serialize_cart(rows):
+    """Acelasi format ca item-urile din localStorage (main.js)."""
+    return [
+        {
+            "id": product.id,
+            "name": f"{product.title} - {product.artist}",
+            "type": product.category,
+            "price": float(product.price),
+            "quantity": quantity,
+            "image_url": product.image_url,
+        }
+        for quantity, product in rows
+    ]
@@ -0,0 +1,208 @@
+"""
+Fatete pentru catalog: numar de produse pe categorie, histograma de pret si top artisti
+pentru cautarea curenta, intr-un singur query grupat (GROUPING SETS pe Postgres,
+UNION ALL de GROUP BY-uri in rest).
+
+Fiecare fateta ignora propriul filtru (altfel selectul de categorie ar arata doar
+categoria aleasa), dar respecta restul filtrelor. Rezultatele sunt tinute in cache per
+worker, cu cheia = filtrele normalizate (CATALOG_FACETS_TTL secunde); adaugarea /
+editarea / stergerea de produse invalideaza tot cache-ul.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import String, and_, case, cast, func, literal, or_, select, true, union_all
+
+from category_map import category_map
+from models import db, Product
+
+# (min, max) in RON; ultimul interval e deschis
+PRICE_BUCKETS = ((0, 50), (50, 100), (100, 200), (200, 500), (500, None))
+TOP_ARTISTS = 8
+FACETS = ("category", "price", "artist")
+
+
+# Limitele coloanei NUMERIC(10,2); in afara lor filtrul se limiteaza (snapshot-ul tine bani in int64)
+MAX_PRICE = Decimal("99999999.99")
+
+
+def _parse_price(value):
+    """Pretul din query string, limitat la [0, MAX_PRICE]; None daca lipseste sau nu e un numar finit."""
+    try:
+        price = Decimal(value) if value else None
+    except (InvalidOperation, ValueError):
+        return None
+    # Decimal("nan") / Decimal("inf") trec de constructor si de quantize
+    if price is None or not price.is_finite():
+        return None
+    return min(max(price, Decimal(0)), MAX_PRICE).quantize(Decimal("0.01"))
+
+
+def catalog_filters(args):
+    """
+    Filtrele din query string, grupate: {"search", "category", "price", "artist"}.
+    Intoarce (cheie normalizata pentru cache, filtre).
+    """
+    terms = tuple(sorted({term.casefold() for term in (args.get("q") or "").split()}))
+    category = (args.get("category") or "").strip()
+    category_id = category_map.id_for(category) if category else None
+    artist = (args.get("artist") or "").strip()
+    min_price = _parse_price(args.get("min_price"))
+    max_price = _parse_price(args.get("max_price"))
+
+    filters = {name: [] for name in ("search",) + FACETS}
+    # Produsele arhivate (deleted_at) nu apar nici in lista, nici in numaratori
+    filters["search"].append(Product.deleted_at.is_(None))
+    for term in terms:
+        pattern = f"%{term}%"
+        filters["search"].append(
+            or_(
+                Product.title.ilike(pattern),
+                Product.artist.ilike(pattern),
+                Product.description.ilike(pattern),
+            )
+        )
+    if category:
+        # Categorie necunoscuta -> category_id = NULL, nu potriveste nimic
+        filters["category"].append(Product.category_id == category_id)
+    if artist:
+        filters["artist"].append(Product.artist.ilike(f"%{artist}%"))
+    if min_price is not None:
+        filters["price"].append(Product.price >= min_price)
+    if max_price is not None:
+        filters["price"].append(Product.price <= max_price)
+
+    key = (terms, category.casefold(), artist.casefold(), min_price, max_price)
+    return key, filters
+
+
+def _match(conditions):
+    return and_(*conditions) if conditions else true()
+
+
+def _facet_query(filters):
+    """
+    Subquery-ul filtrat doar dupa cautare, cu cate un flag per filtru de fateta; fiecare
+    numarare foloseste flag-urile celorlalte fatete (count(*) FILTER (WHERE ...)).
+    """
+    bucket = case(
+        *[(Product.price < high, index) for index, (_, high) in enumerate(PRICE_BUCKETS) if high is not None],
+        else_=len(PRICE_BUCKETS) - 1,
+    )
+    base = (
+        select(
+            Product.category_id,
+            bucket.label("bucket"),
+            Product.artist,
+            *[_match(filters[name]).label(f"m_{name}") for name in FACETS],
+        )
+        .where(*filters["search"])
+        .subquery("facet_base")
+    )
+
+    def count_for(facet):
+        others = [base.c[f"m_{name}"] for name in FACETS if name != facet and filters[name]]
+        return func.count().filter(and_(*others)) if others else func.count()
+
+    columns = {"category": base.c.category_id, "price": base.c.bucket, "artist": base.c.artist}
+    return base, columns, count_for
+
+
+def _query_counts(filters):
+    """Randuri (fateta, valoare, numar) intr-un singur statement."""
+    base, columns, count_for = _facet_query(filters)
+    if db.engine.dialect.name == "postgresql":
+        stmt = select(
+            func.grouping(base.c.category_id).label("g_category"),
+            func.grouping(base.c.bucket).label("g_price"),
+            *columns.values(),
+            *[count_for(name).label(f"n_{name}") for name in FACETS],
+        ).group_by(func.grouping_sets(*columns.values()))
+        for row in db.session.execute(stmt):
+            facet = "category" if row.g_category == 0 else "price" if row.g_price == 0 else "artist"
+            yield facet, getattr(row, columns[facet].name), getattr(row, f"n_{facet}")
+        return
+
+    stmt = union_all(
+        *[
+            select(
+                literal(name).label("facet"),
+                cast(column, String).label("value"),
+                count_for(name).label("count"),
+            ).group_by(column)
+            for name, column in columns.items()
+        ]
+    )
+    for facet, value, count in db.session.execute(stmt):
+        if facet != "artist" and value is not None:
+            value = int(value)
+        yield facet, value, count
+
+
+def compute_facets(filters):
+    counts = {name: {} for name in FACETS}
+    for facet, value, count in _query_counts(filters):
+        if value is not None and count:
+            counts[facet][value] = count
+
+    categories = [
+        {"name": name, "count": counts["category"].get(category_map.id_for(name), 0)}
+        for name in category_map.names()
+    ]
+    prices = [
+        {
+            "label": f"{low}+" if high is None else f"{low} - {high}",
+            "min_price": low,
+            # intervalul e [min, max); filtrul din catalog e inclusiv
+            "max_price": None if high is None else f"{Decimal(high) - Decimal('0.01')}",
+            "count": counts["price"].get(index, 0),
+        }
+        for index, (low, high) in enumerate(PRICE_BUCKETS)
+    ]
+    artists = sorted(counts["artist"].items(), key=lambda item: (-item[1], item[0].casefold()))
+    return {
+        "categories": categories,
+        "prices": [bucket for bucket in prices if bucket["count"]],
+        "artists": [{"name": name, "count": count} for name, count in artists[:TOP_ARTISTS]],
+    }
+
+
+class FacetCache:
+    """Cache LRU cu TTL, cheia = filtrele normalizate din catalog_filters()."""
+
+    def __init__(self, ttl, max_entries=512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, filters):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        facets = compute_facets(filters)
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, facets)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return facets
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+facet_cache = FacetCache(ttl=float(os.getenv("CATALOG_FACETS_TTL", "60")))
@@ -0,0 +1,171 @@
+"""
+Snapshot columnar al catalogului (array-uri NumPy), per worker, pentru /catalog.
+
+Cand lipseste cautarea text (q) si filtrul de artist, filtrele pe categorie / pret, sortarea
+si paginarea se fac vectorizat pe array-uri (id, pret in bani, category_id) si pe ordinile
+precalculate pentru fiecare sortare, fara query: doar cele 12 randuri vizibile devin
+obiecte. Cautarea text, artistul si fatetele raman pe DB.
+
+Snapshot-ul se incarca la primul request dintr-un singur SELECT. Scrierile din acelasi
+proces (adaugare / editare / stergere produs) marcheaza id-urile modificate, iar la urmatorul
+request se recitesc doar acele randuri. TTL-ul (CATALOG_SNAPSHOT_TTL secunde, 0 dezactiveaza)
+limiteaza cat de vechi pot fi modificarile facute de alte procese. Fara NumPy, /catalog
+merge direct pe DB. NumPy se importa abia la primul snapshot, nu la pornirea workerului.
+
+Ordinea "name_asc" vine din DB (row_number() OVER (ORDER BY title, id DESC)), deci
+foloseste colatia bazei, exact ca lista sortata din DB (cu q / artist).
+"""
+import os
+import threading
+import time
+from importlib.util import find_spec
+
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import func, select
+
+from category_map import category_map
+from models import db, Product
+
+
+def _select():
+    return select(
+        Product.id,
+        Product.title,
+        Product.artist,
+        Product.price,
+        Product.category_id,
+        Product.image_url,
+    ).where(Product.deleted_at.is_(None))
+
+
+def _name_ranks():
+    """{id: pozitia in ORDER BY title, id DESC} pentru produsele active."""
+    rank = func.row_number().over(order_by=(Product.title, Product.id.desc()))
+    return dict(db.session.execute(select(Product.id, rank).where(Product.deleted_at.is_(None))).all())
+
+
+def _cents(value):
+    return int(value * 100) if value is not None else None
+
+
+class CatalogItem:
+    """Un rand din grid, cu atributele din Product folosite de catalog.html."""
+
+    __slots__ = ("id", "title", "artist", "price", "category_id", "image_url")
+
+    def __init__(self, row):
+        self.id, self.title, self.artist, self.price, self.category_id, self.image_url = row
+
+    @property
+    def category(self):
+        return category_map.name_for(self.category_id)
+
+
+class _Columns:
+    """Array-urile unui snapshot; ordinea de baza e cea implicita din catalog (id desc)."""
+
+    def __init__(self, rows, name_ranks):
+        import numpy as np
+
+        ids = sorted(rows, reverse=True)
+        self.rows = [rows[pid] for pid in ids]
+        self.price = np.array([_cents(row[3]) for row in self.rows], dtype=np.int64)
+        self.category = np.array([row[4] for row in self.rows], dtype=np.int64)
+        # Un produs adaugat intre cele doua SELECT-uri nu are rang: ajunge la final
+        ranks = np.array([name_ranks.get(pid, len(name_ranks) + 1) for pid in ids], dtype=np.int64)
+        # Permutari precalculate: o cerere sortata doar filtreaza, fara argsort
+        self.orders = {
+            "price_asc": np.argsort(self.price, kind="stable"),
+            "price_desc": np.argsort(-self.price, kind="stable"),
+            "name_asc": np.argsort(ranks, kind="stable"),
+        }
+
+    def matches(self, category_id, min_cents, max_cents, sort):
+        """Pozitiile produselor care trec filtrele, in ordinea ceruta."""
+        import numpy as np
+
+        mask = np.ones(len(self.rows), dtype=bool)
+        if category_id is not None:
+            mask &= self.category == category_id
+        if min_cents is not None:
+            mask &= self.price >= min_cents
+        if max_cents is not None:
+            mask &= self.price <= max_cents
+        order = self.orders.get(sort)
+        if order is None:
+            return np.flatnonzero(mask)
+        return order[mask[order]]
+
+
+class SnapshotPagination(Pagination):
+    """Aceeasi interfata ca query.paginate(), peste pozitiile din snapshot."""
+
+    def _query_items(self):
+        columns = self._query_args["columns"]
+        start = (self.page - 1) * self.per_page
+        return [CatalogItem(columns.rows[index]) for index in self._query_args["matches"][start:start + self.per_page]]
+
+    def _query_count(self):
+        return len(self._query_args["matches"])
+
+
+class CatalogSnapshot:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.enabled = ttl > 0 and find_spec("numpy") is not None
+        self._lock = threading.Lock()
+        self._rows = None
+        self._columns = None
+        self._expires = 0.0
+        self._dirty = set()
+
+    def columns(self):
+        columns = self._columns
+        if columns is not None and not self._dirty and self._expires > time.monotonic():
+            return columns
+        with self._lock:
+            if self._rows is None or self._expires <= time.monotonic():
+                self._rows = {row.id: tuple(row) for row in db.session.execute(_select())}
+                self._expires = time.monotonic() + self.ttl
+                self._dirty.clear()
+            elif self._dirty:
+                # Doar randurile modificate; cele sterse / arhivate nu mai vin din SELECT
+                dirty, self._dirty = self._dirty, set()
+                fresh = db.session.execute(_select().where(Product.id.in_(dirty)))
+                rows = {pid: row for pid, row in self._rows.items() if pid not in dirty}
+                rows.update((row.id, tuple(row)) for row in fresh)
+                self._rows = rows
+            elif self._columns is not None:
+                return self._columns
+            # Rangurile se recitesc mereu: un titlu modificat muta si pozitia celorlalte
+            self._columns = _Columns(self._rows, _name_ranks())
+            return self._columns
+
+    def paginate(self, key, sort, page, per_page):
+        """
+        Pagina ceruta din snapshot, pentru cheia din catalog_filters(); None daca snapshot-ul
+        e dezactivat sau filtrele cer DB (cautare text / artist).
+        """
+        if not self.enabled:
+            return None
+        terms, category, artist, min_price, max_price = key
+        if terms or artist:
+            return None
+        columns = self.columns()
+        # Categorie necunoscuta -> niciun produs, ca filtrul din DB
+        category_id = category_map.id_for(category) if category else None
+        if category and category_id is None:
+            category_id = -1
+        matches = columns.matches(category_id, _cents(min_price), _cents(max_price), sort)
+        return SnapshotPagination(page=page, per_page=per_page, error_out=False, columns=columns, matches=matches)
+
+    def invalidate(self, ids=None):
+        with self._lock:
+            if ids is None:
+                self._rows = None
+                self._columns = None
+            else:
+                self._dirty.update(ids)
+
+
+catalog_snapshot = CatalogSnapshot(ttl=float(os.getenv("CATALOG_SNAPSHOT_TTL", "300")))
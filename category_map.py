@@ -0,0 +1,62 @@
+"""
+Harta categoriilor (id <-> nume) tinuta in memorie, per worker.
+
+products.category_id e singura sursa de adevar; numele categoriei vine de aici,
+fara query per produs si fara `Category.query.filter_by(name=...)` la fiecare salvare.
+Se incarca la pornire (app.py) si se invalideaza cand se modifica tabela categories.
+Un nume / id necunoscut reincarca harta (cel mult o data la RELOAD_INTERVAL secunde),
+ca sa fie vazute si categoriile create de alte procese.
+"""
+import threading
+import time
+
+from sqlalchemy import select
+
+RELOAD_INTERVAL = 5.0
+
+
+class CategoryMap:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (id -> nume, nume casefold -> id), inlocuit atomic la reload
+        self._maps = None
+        self._loaded_at = 0.0
+
+    def load(self):
+        from models import db, Category
+
+        rows = db.session.execute(select(Category.id, Category.name)).all()
+        maps = ({row.id: row.name for row in rows}, {row.name.casefold(): row.id for row in rows})
+        with self._lock:
+            self._maps = maps
+            self._loaded_at = time.monotonic()
+        return maps
+
+    def invalidate(self):
+        with self._lock:
+            self._maps = None
+
+    def _lookup(self, index, key):
+        maps = self._maps or self.load()
+        value = maps[index].get(key)
+        if value is None and time.monotonic() - self._loaded_at > RELOAD_INTERVAL:
+            value = self.load()[index].get(key)
+        return value
+
+    def id_for(self, name):
+        """Id-ul categoriei dupa nume (case-insensitive) sau None."""
+        if not name:
+            return None
+        return self._lookup(1, name.strip().casefold())
+
+    def name_for(self, category_id):
+        if category_id is None:
+            return None
+        return self._lookup(0, category_id)
+
+    def names(self):
+        maps = self._maps or self.load()
+        return sorted(maps[0].values())
+
+
+category_map = CategoryMap()
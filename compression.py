@@ -0,0 +1,156 @@
+"""
+Compresie gzip / brotli pentru raspunsuri (HTML, JSON, CSS/JS, CSV...), negociata din Accept-Encoding.
+
+Raspunsurile cu corp mai mic de COMPRESSION_MIN_SIZE octeti, cele deja comprimate (imagini,
+Content-Encoding setat), 206/304 si cele cu `Cache-Control: no-transform` pleaca neschimbate.
+Raspunsurile streaming (exporturile) se comprima pe bucati: fiecare chunk e trimis imediat
+(sync flush), deci download-ul incepe la fel de repede si memoria nu creste.
+
+Fisierele statice au prioritate varianta precomprimata de langa ele (`main.css.br`,
+`main.css.gz`, generate cu scripts/precompress_static.py), daca e mai noua decat originalul;
+altfel se comprima la cerere, cu nivel mic. Brotli e optional (pachetul `Brotli`); fara el
+se foloseste doar gzip.
+"""
+import mimetypes
+import os
+import time
+import zlib
+
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml",
+}
+STATIC_VARIANTS = {"br": ".br", "gzip": ".gz"}
+
+
+def compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES)
+
+
+def _stream(chunks, compressor, flush, finish):
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compressor(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        # Inchide generatorul original (conexiunea exportului) si la download intrerupt
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+class Compressor:
+    def __init__(self):
+        self.enabled = False
+        self.static_folder = None
+        self.min_size = 500
+        self.gzip_level = 6
+        # Brotli 5 costa cat gzip 6 si iese mai mic; la 4, main.css iese mai mare decat cu gzip
+        self.brotli_quality = 5
+        self.encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    def init_app(self, app):
+        self.enabled = os.getenv("COMPRESSION_ENABLED", "1").lower() not in {"0", "false", "no"}
+        self.min_size = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+        self.gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+        self.brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+        if not self.enabled:
+            return
+        self.static_folder = app.static_folder
+        app.before_request(self.serve_precompressed)
+        app.after_request(self.compress)
+
+    def negotiate(self, available):
+        """Prima codare din `available` acceptata de client (dupa q), sau None."""
+        return request.accept_encodings.best_match(available)
+
+    def serve_precompressed(self):
+        """before_request: varianta .br / .gz a fisierului static cerut, daca exista si e la zi."""
+        if request.endpoint != "static" or "filename" not in (request.view_args or {}):
+            return None
+        filename = request.view_args["filename"]
+        path = safe_join(self.static_folder, filename)
+        mimetype = mimetypes.guess_type(filename)[0]
+        if path is None or not compressible(mimetype) or not os.path.isfile(path):
+            return None
+        source_mtime = os.path.getmtime(path)
+        available = [
+            encoding
+            for encoding, suffix in STATIC_VARIANTS.items()
+            if os.path.isfile(path + suffix) and os.path.getmtime(path + suffix) >= source_mtime
+        ]
+        encoding = self.negotiate(available)
+        if encoding is None:
+            return None
+        # ETag-ul vine din fisierul comprimat, deci difera de cel al variantei necomprimate
+        response = send_from_directory(self.static_folder, filename + STATIC_VARIANTS[encoding], mimetype=mimetype)
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
+
+    def _compressor(self, encoding):
+        """(comprima, flush, final) pentru un stream in `encoding`."""
+        if encoding == "br":
+            engine = brotli.Compressor(quality=self.brotli_quality)
+            return engine.process, engine.flush, engine.finish
+        engine = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return engine.compress, lambda: engine.flush(zlib.Z_SYNC_FLUSH), engine.flush
+
+    def compress(self, response):
+        """after_request: comprima corpul raspunsului daca merita si clientul accepta."""
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or "no-transform" in response.headers.get("Cache-Control", "")
+            or not compressible(response.mimetype)
+        ):
+            return response
+        # Fisierele statice fara varianta precomprimata vin ca direct_passthrough (send_file):
+        # au lungime cunoscuta si se citesc intregi, nu se comprima pe bucati
+        passthrough = response.direct_passthrough
+        streamed = response.is_streamed and not passthrough
+        # La streaming lungimea e cunoscuta doar din header (ex: paginile de eroare werkzeug)
+        length = response.content_length if response.is_streamed else response.calculate_content_length()
+        if length is not None and length < self.min_size:
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = self.negotiate(self.encodings)
+        if encoding is None:
+            return response
+
+        if streamed:
+            chunks = response.response
+            response.response = _stream(chunks, *self._compressor(encoding))
+            response.headers.pop("Content-Length", None)
+        else:
+            response.direct_passthrough = False
+            started = time.perf_counter()
+            compress, _, finish = self._compressor(encoding)
+            response.set_data(compress(response.get_data()) + finish())
+            response.headers.add("Server-Timing", f"compress;dur={(time.perf_counter() - started) * 1000:.2f}")
+        response.headers["Content-Encoding"] = encoding
+        # Ca nginx: ETag-ul puternic devine slab (acelasi continut, alta codare)
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+compressor = Compressor()
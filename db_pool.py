@@ -0,0 +1,208 @@
+"""
+Configurare pool SQLAlchemy + telemetrie (timp de asteptare la checkout, utilizare pool,
+timp petrecut in DB per request).
+
+Profilul se alege cu DB_POOL_PROFILE (small/default/large); fiecare valoare poate fi
+suprascrisa individual prin env (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE,
+DB_POOL_TIMEOUT, DB_POOL_USE_LIFO, DB_POOL_PRE_PING).
+"""
+import os
+import threading
+import time
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+POOL_PROFILES = {
+    "small": {"pool_size": 2, "max_overflow": 2, "pool_recycle": 1800, "pool_timeout": 10},
+    "default": {"pool_size": 5, "max_overflow": 10, "pool_recycle": 1800, "pool_timeout": 30},
+    "large": {"pool_size": 20, "max_overflow": 20, "pool_recycle": 900, "pool_timeout": 30},
+}
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.lower() in {"1", "true", "yes"}
+
+
+class PoolStats:
+    """Contoare globale (per worker) pentru pool si timpul petrecut in DB."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.queries = 0
+            self.query_total = 0.0
+            self.query_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+        if has_request_context():
+            g.db_pool_wait = g.get("db_pool_wait", 0.0) + seconds
+
+    def record_query(self, seconds):
+        with self._lock:
+            self.queries += 1
+            self.query_total += seconds
+            self.query_max = max(self.query_max, seconds)
+        if has_request_context():
+            g.db_query_time = g.get("db_query_time", 0.0) + seconds
+
+    def snapshot(self):
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_avg_ms": round(self.wait_total / attempts * 1000, 3) if attempts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+                "queries": self.queries,
+                "query_avg_ms": round(self.query_total / self.queries * 1000, 3) if self.queries else 0.0,
+                "query_max_ms": round(self.query_max * 1000, 3),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool care masoara cat asteapta un request dupa o conexiune libera."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def build_engine_options(database_url):
+    """Optiunile pentru SQLALCHEMY_ENGINE_OPTIONS in functie de env si de driver."""
+    if database_url.startswith("sqlite"):
+        return {"pool_pre_ping": True}
+
+    profile = POOL_PROFILES.get(os.getenv("DB_POOL_PROFILE", "default"), POOL_PROFILES["default"])
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", profile["pool_size"]),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", profile["max_overflow"]),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", profile["pool_recycle"]),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", profile["pool_timeout"]),
+        "pool_use_lifo": _env_bool("DB_POOL_USE_LIFO", True),
+        # Cu LIFO + recycle, pre_ping (un round-trip in plus la fiecare checkout) devine optional
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", False),
+        # Cache-ul de statement-uri compilate de SQLAlchemy (per engine)
+        "query_cache_size": _env_int("DB_QUERY_CACHE_SIZE", 500),
+    }
+
+    connect_args = {}
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if statement_timeout > 0:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+    # psycopg2 nu are prepared statements server-side; psycopg (v3) le activeaza
+    # dupa `prepare_threshold` executii ale aceleiasi interogari.
+    if database_url.startswith("postgresql+psycopg://"):
+        connect_args["prepare_threshold"] = _env_int("DB_PREPARE_THRESHOLD", 5)
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def pool_status(engine):
+    """Starea curenta a pool-ului + contoarele cumulate."""
+    pool = engine.pool
+    data = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        data.update(
+            {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": checked_out,
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "utilization": round(checked_out / capacity, 3) if capacity > 0 else None,
+            }
+        )
+    data.update(pool_stats.snapshot())
+    return data
+
+
+def enable_sqlite_wal(engine):
+    """
+    SQLite in modul WAL: o citire lunga (rebuild recomandari, rapoarte) nu mai tine pe loc
+    commit-urile scrierilor (checkout), ca in modul implicit cu rollback journal.
+    """
+    if engine.dialect.name != "sqlite" or engine.url.database in (None, "", ":memory:"):
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_wal(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+
+def init_pool_telemetry(app, engine):
+    """Leaga evenimentele de timing pe engine si adauga header-ul Server-Timing."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            pool_stats.record_query(time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    @app.after_request
+    def _server_timing(response):
+        wait = g.get("db_pool_wait")
+        query = g.get("db_query_time")
+        parts = []
+        if wait is not None:
+            parts.append(f"db-pool;dur={wait * 1000:.2f}")
+        if query is not None:
+            parts.append(f"db;dur={query * 1000:.2f}")
+        if parts:
+            response.headers.add("Server-Timing", ", ".join(parts))
+        return response
@@ -0,0 +1,157 @@
+"""
+Rutare catre o replica de citire (DATABASE_REPLICA_URL) pentru rapoarte si catalogul anonim.
+
+Pe replica ajung doar SELECT-urile marcate:
+- tot view-ul, cu decoratorul @replica_reads (endpoint-urile din blueprints/reports.py);
+- un singur query, cu .execution_options(replica=True) (lista din /catalog pentru anonimi).
+Scrierile, flush-urile si restul aplicatiei raman pe primary. Cache-urile (snapshot catalog,
+fatete, produse) se incarca din primary: o replica in urma ar fixa date vechi in cache pana
+la expirarea TTL-ului.
+
+Fallback pe primary, decis o data per request:
+- replica e in urma cu mai mult de DATABASE_REPLICA_MAX_LAG secunde sau nu raspunde
+  (verificat cel mult o data pe secunda per worker);
+- read-your-writes: dupa un commit cu scrieri (ex: checkout), sesiunea userului citeste din
+  primary timp de DATABASE_REPLICA_STICKY secunde (marcaj in cookie-ul de sesiune Flask).
+Fara DATABASE_REPLICA_URL totul merge pe primary.
+"""
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+REPLICA_BIND = "replica"
+REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+MAX_LAG = float(os.getenv("DATABASE_REPLICA_MAX_LAG", "5"))
+STICKY_SECONDS = float(os.getenv("DATABASE_REPLICA_STICKY", "10"))
+LAG_CHECK_INTERVAL = 1.0
+STICKY_KEY = "db_primary_until"
+
+# Pe un standby prins din urma (LSN primit = LSN aplicat) lag-ul e 0, chiar daca ultima
+# tranzactie e veche; pe un server care nu e standby, 0.
+LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+def replica_binds():
+    """Valoarea pentru SQLALCHEMY_BINDS ({} fara replica)."""
+    if not REPLICA_URL:
+        return {}
+    url = REPLICA_URL
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return {REPLICA_BIND: url}
+
+
+class ReplicaHealth:
+    """Lag-ul replicii, masurat cel mult o data la LAG_CHECK_INTERVAL secunde (per worker)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self.healthy = False
+        self.lag = None
+
+    def check(self, engine):
+        if self._checked_at is not None and time.monotonic() - self._checked_at < LAG_CHECK_INTERVAL:
+            return self.healthy
+        with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < LAG_CHECK_INTERVAL:
+                return self.healthy
+            try:
+                with engine.connect() as connection:
+                    lag = 0.0
+                    if connection.dialect.name == "postgresql":
+                        lag = float(connection.execute(LAG_SQL).scalar() or 0)
+                self.lag, self.healthy = lag, lag <= MAX_LAG
+            except Exception:
+                self.lag, self.healthy = None, False
+            self._checked_at = time.monotonic()
+            return self.healthy
+
+
+replica_health = ReplicaHealth()
+
+
+def _replica_allowed(engine):
+    if not has_request_context():
+        return replica_health.check(engine)
+    if "db_replica" not in g:
+        sticky = flask_session.get(STICKY_KEY, 0) > time.time()
+        g.db_replica = not sticky and replica_health.check(engine)
+    return g.db_replica
+
+
+class RoutingSession(Session):
+    """Session-ul Flask-SQLAlchemy care trimite SELECT-urile marcate pe bind-ul "replica"."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and self._wants_replica(clause):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None and _replica_allowed(engine):
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _wants_replica(self, clause):
+        if clause is None or not getattr(clause, "is_select", False):
+            return False
+        return self.info.get("replica", False) or clause.get_execution_options().get("replica", False)
+
+
+def replica_reads(view):
+    """Toate SELECT-urile din view merg pe replica (cand exista si nu e in urma)."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        session = current_app.extensions["sqlalchemy"].session
+        session.info["replica"] = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            session.info.pop("replica", None)
+
+    return wrapper
+
+
+def replica_status():
+    return {
+        "configured": bool(REPLICA_URL),
+        "healthy": replica_health.healthy,
+        "lag_seconds": replica_health.lag,
+        "max_lag_seconds": MAX_LAG,
+    }
+
+
+# ===== read-your-writes =====
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info["db_wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["db_wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _stick_to_primary(session):
+    if session.info.pop("db_wrote", False) and REPLICA_URL and has_request_context():
+        flask_session[STICKY_KEY] = time.time() + STICKY_SECONDS
+        g.db_replica = False
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def _forget_writes(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop("db_wrote", None)
@@ -0,0 +1,155 @@
+"""
+Imagini produse redimensionate local, pentru grid-uri si pagina de produs.
+
+Sursa (CDN sau /static/...) se descarca o singura data, apoi se scriu variante in cateva
+latimi (IMAGE_WIDTHS), in WebP (IMAGE_FORMAT=webp / avif / jpeg; fallback jpeg daca
+Pillow nu are encoder pentru formatul cerut). Fisierele stau in
+IMAGE_CACHE_DIR/<hash>/<latime>.<ext>, cu hash = sha256(image_url)[:16]: un URL nou da
+alt director, deci variantele se pot servi cu cache de browser "immutable".
+
+Variantele se genereaza in worker (jobul images.prewarm, pus in coada la primul request
+pentru o varianta lipsa) sau dinainte, cu prewarm() din scripts/refresh_products.py.
+Fara Pillow, paginile folosesc direct image_url. Pillow se importa abia la primul apel
+image_format(), nu la pornirea workerului.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from flask import url_for
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(ROOT, "image_cache"))
+IMAGE_WIDTHS = (200, 400, 800)
+EXTENSIONS = {"webp": "webp", "avif": "avif", "jpeg": "jpg"}
+QUALITY = 80
+MAX_SOURCE_BYTES = 15 * 1024 * 1024
+FETCH_TIMEOUT = 10
+DIGEST_RE = re.compile(r"[0-9a-f]{16}")
+
+
+@lru_cache(maxsize=None)
+def image_format():
+    """Formatul variantelor (webp / avif / jpeg), detectat o data; None fara Pillow."""
+    try:
+        from PIL import features
+    except ImportError:
+        return None
+    requested = os.getenv("IMAGE_FORMAT", "webp").lower()
+    if requested in ("webp", "avif") and features.check(requested):
+        return requested
+    return "jpeg"
+
+
+def image_ext():
+    return EXTENSIONS.get(image_format())
+
+
+def url_digest(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def variant_path(digest, width):
+    # digest vine din URL: altceva decat 16 caractere hex ar putea iesi din CACHE_DIR
+    if not DIGEST_RE.fullmatch(digest):
+        raise ValueError(f"Hash imagine invalid: {digest!r}")
+    return os.path.join(CACHE_DIR, digest, f"{width}.{image_ext()}")
+
+
+def image_srcset(product):
+    """Valoarea pentru `srcset` (ex: "/img/5/ab12.../200.webp 200w, ..."), sau "" fara Pillow / imagine."""
+    if not product.image_url or not image_format():
+        return ""
+    digest = url_digest(product.image_url)
+    return ", ".join(
+        f"{url_for('images.product_image', product_id=product.id, digest=digest, width=width, ext=image_ext())} {width}w"
+        for width in IMAGE_WIDTHS
+    )
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read_source(url):
+    if url.startswith("/static/"):
+        static_dir = os.path.join(ROOT, "static")
+        path = os.path.normpath(os.path.join(ROOT, url.lstrip("/").split("?", 1)[0]))
+        if not path.startswith(static_dir + os.sep):
+            raise ValueError(f"Cale imagine invalida: {url}")
+        with open(path, "rb") as handle:
+            return handle.read()
+    if not url.startswith(("http://", "https://")):
+        raise ValueError(f"URL imagine nesuportat: {url}")
+
+    import requests
+
+    with requests.get(url, timeout=FETCH_TIMEOUT, stream=True) as resp:
+        resp.raise_for_status()
+        data = resp.raw.read(MAX_SOURCE_BYTES + 1, decode_content=True)
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f"Imagine prea mare: {url}")
+    return data
+
+
+def build_variants(url, widths=IMAGE_WIDTHS):
+    """
+    Scrie variantele lipsa pentru `url` (sursa e descarcata o data si pastrata langa ele).
+    Intoarce numarul de variante noi. Scrierile sunt atomice, deci doi workeri care
+    genereaza aceeasi imagine nu lasa fisiere partiale.
+    """
+    from PIL import Image, ImageOps
+
+    digest = url_digest(url)
+    missing = [width for width in widths if not os.path.exists(variant_path(digest, width))]
+    if not missing:
+        return 0
+
+    directory = os.path.join(CACHE_DIR, digest)
+    os.makedirs(directory, exist_ok=True)
+    source_path = os.path.join(directory, "source")
+    if os.path.exists(source_path):
+        with open(source_path, "rb") as handle:
+            data = handle.read()
+    else:
+        data = _read_source(url)
+        _write_atomic(source_path, data)
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA", "P") and image_format() != "jpeg"
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        for width in missing:
+            variant = image
+            if image.width > width:
+                # Fara upscale: sursele mai mici raman la latimea lor
+                variant = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            buffer = io.BytesIO()
+            variant.save(buffer, format=image_format().upper(), quality=QUALITY)
+            _write_atomic(variant_path(digest, width), buffer.getvalue())
+    return len(missing)
+
+
+def prewarm(urls, workers=4):
+    """Genereaza variantele pentru toate URL-urile (in paralel). Intoarce (ok, erori)."""
+    if not image_format():
+        return 0, 0
+    urls = sorted({url for url in urls if url})
+
+    def build(url):
+        try:
+            build_variants(url)
+            return True
+        except Exception:
+            return False
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(build, urls))
+    return sum(results), len(results) - sum(results)
@@ -0,0 +1,435 @@
+"""
+Job-uri de fundal tinute in DB (tabela jobs), fara broker extern.
+
+Un request (sau un script) pune un job cu enqueue(), in tranzactia lui: jobul exista doar
+daca request-ul face commit. scripts/job_worker.py ruleaza workerii, in proces separat de
+gunicorn, deci munca lenta (Qobuz, imagini, rebuild-uri) nu mai intra in latenta paginilor.
+
+- claim(): `UPDATE jobs ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED LIMIT n)`; mai
+  multi workeri (thread-uri sau procese) iau joburi diferite fara sa se astepte unul pe altul;
+- o eroare repune jobul in coada cu backoff exponential (JOBS_BACKOFF * 2^(incercare - 1),
+  cel mult JOBS_BACKOFF_MAX), pana la max_attempts; apoi ramane "failed" (retry din dashboard);
+- un job "running" mai vechi de JOBS_LEASE secunde (worker oprit fortat) se repune in coada;
+- job-urile periodice (JOBS_SCHEDULE="tip=secunde,...") au cate un rand in job_schedules;
+  un singur worker castiga UPDATE-ul conditionat pe next_run_at si pune jobul.
+
+Task-urile se inregistreaza cu @task("nume"); primesc payload-ul ca argumente si pot
+intoarce un rezultat JSON (afisat in dashboard). Pe SQLite nu exista SKIP LOCKED: scrierile
+sunt oricum serializate, deci merge pentru dezvoltare, cu un singur proces worker.
+"""
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Job, JobSchedule, Product
+import cache_bus
+import stock_shards
+from image_pipeline import prewarm
+from order_workflow import compact_status_history
+from recommendations import STORED_PER_PRODUCT, index_stats, rebuild
+
+STATUSES = ("queued", "running", "done", "failed")
+MAX_ATTEMPTS = 5
+POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1"))
+LEASE = int(os.getenv("JOBS_LEASE", "900"))
+BACKOFF = float(os.getenv("JOBS_BACKOFF", "10"))
+BACKOFF_MAX = float(os.getenv("JOBS_BACKOFF_MAX", "3600"))
+KEEP_DAYS = int(os.getenv("JOBS_KEEP_DAYS", "7"))
+MAINTENANCE_INTERVAL = 30
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+class Task:
+    def __init__(self, name, func, max_attempts, confirm=False):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+        # Joburile care modifica date in masa se pun in coada doar cu confirmed=True
+        self.confirm = confirm
+
+
+def task(name, max_attempts=MAX_ATTEMPTS, confirm=False):
+    """Inregistreaza functia ca task `name`."""
+    def decorator(func):
+        _tasks[name] = Task(name, func, max_attempts, confirm)
+        return func
+
+    return decorator
+
+
+def task_names():
+    return sorted(_tasks)
+
+
+def enqueue(kind, payload=None, delay=0, max_attempts=None, confirmed=False):
+    """Pune un job in coada (fara commit: pleaca odata cu tranzactia apelantului)."""
+    if kind not in _tasks:
+        raise ValueError(f"Job necunoscut: {kind}")
+    if _tasks[kind].confirm and not confirmed:
+        raise ValueError(f"Jobul {kind} cere confirmare explicita")
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}, separators=(",", ":")),
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts or _tasks[kind].max_attempts,
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    db.session.add(job)
+    return job
+
+
+def enqueue_once(kind, payload=None):
+    """Ca enqueue, dar refoloseste jobul identic inca neterminat (queued / running), daca exista."""
+    encoded = json.dumps(payload or {}, separators=(",", ":"))
+    pending = Job.query.filter(
+        Job.kind == kind, Job.payload == encoded, Job.status.in_(("queued", "running"))
+    ).first()
+    return pending or enqueue(kind, payload)
+
+
+def backoff(attempts):
+    """Secunde pana la urmatoarea incercare, cu +-20% jitter (workerii nu revin deodata)."""
+    delay = min(BACKOFF * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim(worker_id, limit=1, kinds=None):
+    """Ia cel mult `limit` joburi scadente si le marcheaza running (commit). Intoarce randurile."""
+    now = datetime.utcnow()
+    due = (
+        select(Job.id)
+        .where(Job.status == "queued", Job.run_at <= now)
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if kinds:
+        due = due.where(Job.kind.in_(kinds))
+    try:
+        rows = db.session.execute(
+            update(Job)
+            .where(Job.id.in_(due), Job.status == "queued")
+            .values(status="running", locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+            .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        raise
+    return rows
+
+
+def _finish(job_id, worker_id, **values):
+    # Doar daca jobul e tot al nostru (dupa un lease expirat poate rula deja la alt worker)
+    db.session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == "running", Job.locked_by == worker_id)
+        .values(locked_by=None, locked_at=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def execute(row, worker_id):
+    """Ruleaza un job luat cu claim(); done, reprogramat cu backoff sau failed."""
+    started = time.perf_counter()
+    try:
+        registered = _tasks.get(row.kind)
+        if registered is None:
+            raise LookupError(f"Job necunoscut: {row.kind}")
+        result = registered.func(**json.loads(row.payload or "{}"))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        error = f"{type(e).__name__}: {e}"
+        if row.attempts >= row.max_attempts:
+            logger.exception("job %s (%s) a esuat definitiv", row.id, row.kind)
+            _finish(row.id, worker_id, status="failed", last_error=error, finished_at=datetime.utcnow())
+        else:
+            delay = backoff(row.attempts)
+            logger.warning("job %s (%s): %s; reincercare in %.0fs", row.id, row.kind, error, delay)
+            _finish(
+                row.id,
+                worker_id,
+                status="queued",
+                last_error=error,
+                run_at=datetime.utcnow() + timedelta(seconds=delay),
+            )
+        return False
+    _finish(
+        row.id,
+        worker_id,
+        status="done",
+        result=None if result is None else json.dumps(result, default=str),
+        finished_at=datetime.utcnow(),
+    )
+    logger.info("job %s (%s) gata in %.2fs", row.id, row.kind, time.perf_counter() - started)
+    return True
+
+
+def retry(job_ids=None):
+    """Repune in coada joburile failed (toate, daca `job_ids` lipseste). Fara commit."""
+    stmt = update(Job).where(Job.status == "failed")
+    if job_ids is not None:
+        stmt = stmt.where(Job.id.in_(job_ids))
+    return db.session.execute(
+        stmt.values(status="queued", attempts=0, run_at=datetime.utcnow(), finished_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount or 0
+
+
+def requeue_stale():
+    """Joburile running cu lease expirat: inapoi in coada (sau failed, fara incercari ramase)."""
+    now = datetime.utcnow()
+    return db.session.execute(
+        update(Job)
+        .where(Job.status == "running", Job.locked_at < now - timedelta(seconds=LEASE))
+        .values(
+            status=case((Job.attempts >= Job.max_attempts, "failed"), else_="queued"),
+            last_error="Lease expirat (worker oprit in timpul jobului?)",
+            locked_by=None,
+            locked_at=None,
+            run_at=now,
+            finished_at=case((Job.attempts >= Job.max_attempts, now), else_=None),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount or 0
+
+
+def purge(older_than_days=KEEP_DAYS):
+    """Sterge joburile done / failed terminate de mai mult de `older_than_days` zile."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    return db.session.execute(
+        delete(Job)
+        .where(Job.status.in_(("done", "failed")), Job.finished_at < cutoff)
+        .execution_options(synchronize_session=False)
+    ).rowcount or 0
+
+
+def parse_schedule(value):
+    """"tip=secunde,tip=secunde" -> {tip: secunde}."""
+    schedule = {}
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        kind, _, every = item.partition("=")
+        kind = kind.strip()
+        if kind not in _tasks:
+            raise ValueError(f"JOBS_SCHEDULE: job necunoscut {kind}")
+        if _tasks[kind].confirm:
+            raise ValueError(f"JOBS_SCHEDULE: {kind} cere confirmare, nu poate fi periodic")
+        schedule[kind] = int(every)
+        if schedule[kind] <= 0:
+            raise ValueError(f"JOBS_SCHEDULE: interval invalid pentru {kind}")
+    return schedule
+
+
+def sync_schedules(schedule):
+    """Aduce job_schedules la configuratia `schedule`. Fara commit."""
+    now = datetime.utcnow()
+    existing = {row.kind: row for row in JobSchedule.query.all()}
+    for kind, row in existing.items():
+        if kind not in schedule:
+            db.session.delete(row)
+    for kind, every in schedule.items():
+        row = existing.get(kind)
+        if row is None:
+            db.session.add(JobSchedule(kind=kind, every=every, next_run_at=now))
+        elif row.every != every:
+            row.every = every
+            row.next_run_at = min(row.next_run_at, now + timedelta(seconds=every))
+
+
+def enqueue_due():
+    """Pune joburile periodice scadente. Fara commit; intoarce tipurile puse."""
+    now = datetime.utcnow()
+    queued = []
+    for kind, every, next_run_at in db.session.execute(
+        select(JobSchedule.kind, JobSchedule.every, JobSchedule.next_run_at).where(JobSchedule.next_run_at <= now)
+    ):
+        # Doar workerul care muta next_run_at pune jobul
+        moved = db.session.execute(
+            update(JobSchedule)
+            .where(JobSchedule.kind == kind, JobSchedule.next_run_at == next_run_at)
+            .values(next_run_at=now + timedelta(seconds=every))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if moved and kind in _tasks and not _tasks[kind].confirm:
+            enqueue(kind)
+            queued.append(kind)
+    return queued
+
+
+def stats():
+    """{status: numar} si [(tip, status, numar)] pentru dashboard."""
+    rows = db.session.execute(
+        select(Job.kind, Job.status, func.count()).group_by(Job.kind, Job.status).order_by(Job.kind)
+    ).all()
+    totals = dict.fromkeys(STATUSES, 0)
+    for _, status, count in rows:
+        totals[status] = totals.get(status, 0) + count
+    return totals, rows
+
+
+class Worker:
+    """`concurrency` thread-uri care iau si ruleaza joburi pana la stop()."""
+
+    def __init__(self, app, concurrency=1, kinds=None, poll_interval=POLL_INTERVAL, schedule=None):
+        self.app = app
+        self.concurrency = max(concurrency, 1)
+        self.kinds = kinds or None
+        self.poll_interval = poll_interval
+        # None = job_schedules ramane cum e (ex: un `run --once` pornit manual)
+        self.schedule = schedule
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._next_cleanup = 0.0
+        self._next_schedules = 0.0
+        self._maintenance_lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+        self._counter_lock = threading.Lock()
+
+    def stop(self, *_):
+        self._stop.set()
+
+    def _due(self, attribute, interval):
+        # Un singur thread din proces verifica, cel mult o data la `interval` secunde
+        with self._maintenance_lock:
+            if time.monotonic() < getattr(self, attribute):
+                return False
+            setattr(self, attribute, time.monotonic() + interval)
+            return True
+
+    def _maintenance(self):
+        # Joburile periodice la fiecare poll; lease-urile expirate si curatenia mai rar
+        schedules = self._due("_next_schedules", self.poll_interval)
+        cleanup = self._due("_next_cleanup", MAINTENANCE_INTERVAL)
+        if not (schedules or cleanup):
+            return
+        try:
+            queued = enqueue_due() if schedules else []
+            requeued = requeue_stale() if cleanup else 0
+            purged = purge() if cleanup else 0
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("jobs: intretinerea cozii a esuat")
+            return
+        if requeued or queued or purged:
+            logger.info("jobs: %s repuse (lease), periodice %s, %s sterse", requeued, queued or "-", purged)
+
+    def _loop(self, index, once):
+        worker_id = f"{self.name}/{index}"
+        with self.app.app_context():
+            while not self._stop.is_set():
+                self._maintenance()
+                try:
+                    rows = claim(worker_id, 1, self.kinds)
+                except Exception:
+                    logger.exception("jobs: claim a esuat")
+                    self._stop.wait(self.poll_interval)
+                    continue
+                if not rows:
+                    if once:
+                        return
+                    self._stop.wait(self.poll_interval)
+                    continue
+                for row in rows:
+                    ok = execute(row, worker_id)
+                    with self._counter_lock:
+                        self.processed += 1
+                        self.failed += 0 if ok else 1
+                db.session.remove()
+
+    def run(self, once=False):
+        """Porneste thread-urile; cu `once` se opreste cand nu mai sunt joburi scadente."""
+        if self.schedule is not None:
+            with self.app.app_context():
+                try:
+                    sync_schedules(self.schedule)
+                    db.session.commit()
+                except IntegrityError:
+                    # Alt worker pornit in acelasi timp a inserat deja randurile
+                    db.session.rollback()
+                    sync_schedules(self.schedule)
+                    db.session.commit()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        threads = [
+            threading.Thread(target=self._loop, args=(index, once), name=f"jobs-{index}", daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        # join cu timeout: semnalele ajung la thread-ul principal
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(0.5)
+        return self.processed, self.failed
+
+
+# ===== task-uri =====
+
+@task("recommendations.rebuild")
+def rebuild_recommendations(top=None):
+    # rebuild face commit pe loturi
+    rebuild(top or STORED_PER_PRODUCT)
+    cache_bus.invalidate("recommendations")
+    pairs, products = index_stats()
+    return {"pairs": pairs, "products": products}
+
+
+@task("orders.compact_history")
+def compact_order_history(days=90, archive=True):
+    return {"removed": compact_status_history(days, archive=archive)}
+
+
+@task("stock.rebalance")
+def rebalance_stock():
+    totals = {}
+    for product_id in stock_shards.sharded_product_ids():
+        totals[product_id] = stock_shards.rebalance(product_id)
+        db.session.commit()
+    if totals:
+        cache_bus.invalidate(("products", list(totals)))
+    return totals
+
+
+@task("images.prewarm")
+def prewarm_images(urls):
+    ok, failed = prewarm(urls)
+    if failed and not ok:
+        # Sursa (CDN) indisponibila: se reincearca cu backoff
+        raise RuntimeError(f"{failed} imagini nu au putut fi descarcate")
+    return {"ok": ok, "failed": failed}
+
+
+@task("products.refresh", max_attempts=1, confirm=True)
+def refresh_qobuz_products(max_albums=None):
+    # Importat la cerere: scriptul aduce `requests` si aplicatia. Upsert: nu sterge produse,
+    # iar stergerea comenzilor (--wipe-orders) exista doar in CLI-ul scriptului
+    from scripts.refresh_products import refresh_products
+
+    created, updated = refresh_products(max_albums)
+    cache_bus.invalidate("products", "catalog", "facets", "categories", "recommendations")
+    # Copertile intr-un job separat (reincercat singur daca CDN-ul cade)
+    urls = [url for (url,) in db.session.query(Product.image_url).filter(Product.deleted_at.is_(None)) if url]
+    if urls:
+        enqueue("images.prewarm", {"urls": urls})
+    return {"created": created, "updated": updated}
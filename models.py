@@ -10,10 +10,15 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 # Pentru default-uri de timp (created_at, date_added etc.)
 from datetime import datetime
+from decimal import Decimal
+
+from category_map import category_map
+from db_replica import RoutingSession
 
 
 # Instanța SQLAlchemy; de obicei e inițializată în app factory cu db.init_app(app)
-db = SQLAlchemy()
+# RoutingSession trimite citirile marcate pe replica (vezi db_replica.py)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class User(UserMixin, db.Model):
@@ -107,8 +112,8 @@ class Product(db.Model):
     # Artistul
     artist = db.Column(db.String(120), nullable=False)
 
-    # Prețul (Float e ok pentru proiect, dar în producție se preferă Decimal/Numeric)
-    price = db.Column(db.Float, nullable=False)
+    # Prețul (Numeric => Decimal exact in Python, fara erori de rotunjire float)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
 
     # URL imagine (Text ca să accepte linkuri lungi)
     image_url = db.Column(db.Text)
@@ -119,15 +124,32 @@ class Product(db.Model):
     # Descriere (opțional)
     description = db.Column(db.Text, nullable=True)
 
-    # Stoc (implicit 0)
+    # Stoc (implicit 0); la produsele cu stoc distribuit e suma de la ultima rebalansare
     stock = db.Column(db.Integer, default=0)
 
-    # Categoria (ex: CD/Vinyl/Merch)
-    category = db.Column(db.String(50), nullable=False)
-    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=True)
+    # 0 = stoc normal; N > 0 = stocul sta in N randuri din product_stock_shards (vezi stock_shards.py)
+    stock_shards = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Categoria (ex: CD/Vinyl/Merch): category_id e sursa de adevar (FK indexat)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False, index=True)
 
     category_ref = db.relationship('Category')
 
+    # Soft-delete: produsele care apar in comenzi nu se sterg, doar se ascund din magazin
+    deleted_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def category(self):
+        """Numele categoriei, din harta tinuta in memorie (fara query)."""
+        return category_map.name_for(self.category_id)
+
+    @category.setter
+    def category(self, name):
+        category_id = category_map.id_for(name)
+        if category_id is None:
+            raise ValueError(f"Categorie invalida: {name}")
+        self.category_id = category_id
+
     # Data adăugării în catalog
     date_added = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -146,7 +168,7 @@ class Order(db.Model):
 
     # ---- Compatibilitate legacy ----
     # Dacă DB veche folosea nume total_price / date_ordered, le păstrezi ca să nu rupi migrarea.
-    total_price = db.Column('total_price', db.Float, nullable=True)
+    total_price = db.Column('total_price', db.Numeric(10, 2), nullable=True)
     date_ordered = db.Column('date_ordered', db.DateTime, nullable=True)
 
     # ---- Câmpuri preferate în aplicație ----
@@ -162,7 +184,7 @@ class Order(db.Model):
     shipping_name = db.Column(db.String(120), nullable=True)
     shipping_phone = db.Column(db.String(50), nullable=True)
 
-    # Timestamp
+    # Timestamp; pe Postgres e cheia de partitionare lunara (vezi order_partitions.py)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relația 1 -> N (o comandă are mai multe item-uri)
@@ -181,8 +203,8 @@ class Order(db.Model):
     # ---- Proprietăți pentru compatibilitate / alias ----
     @property
     def total_amount(self):
-        """Alias “safe” pentru total: dacă total_price e None, întoarce 0.0."""
-        return self.total_price if self.total_price is not None else 0.0
+        """Alias “safe” pentru total: dacă total_price e None, întoarce 0."""
+        return self.total_price if self.total_price is not None else Decimal("0.00")
 
     @total_amount.setter
     def total_amount(self, value):
@@ -212,7 +234,7 @@ class OrderItem(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
 
-    # FK către orders
+    # FK către orders (in DB lipseste dupa partitionarea orders, vezi order_partitions.py)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
 
     # FK către products
@@ -222,7 +244,7 @@ class OrderItem(db.Model):
     quantity = db.Column(db.Integer, default=1)
 
     # Prețul la momentul cumpărării (important: dacă se schimbă prețul produsului ulterior)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
 
     # Relația către Product (ca să poți face item.product.title etc.)
     product = db.relationship('Product')
@@ -241,6 +263,130 @@ class OrderStatusHistory(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class OrderStatusHistoryArchive(db.Model):
+    """
+    Randuri vechi din order_status_history mutate de job-ul de compactare.
+    Fara FK catre orders, ca sa poata supravietui stergerii comenzii.
+    """
+    __tablename__ = 'order_status_history_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False)
+    note = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class StockShard(db.Model):
+    """
+    O parte din stocul unui produs marcat (tabela: product_stock_shards); stocul produsului
+    e suma randurilor lui.
+    """
+    __tablename__ = 'product_stock_shards'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    stock = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Stocul real: suma randurilor pentru produsele marcate, products.stock pentru restul.
+# CASE evita subquery-ul pentru produsele nemarcate.
+Product.stock_total = db.column_property(
+    db.case(
+        (
+            Product.stock_shards > 0,
+            db.select(db.func.coalesce(db.func.sum(StockShard.stock), 0))
+            .where(StockShard.product_id == Product.id)
+            .correlate_except(StockShard)
+            .scalar_subquery(),
+        ),
+        else_=db.func.coalesce(Product.stock, 0),
+    )
+)
+
+
+class CartItem(db.Model):
+    """
+    Cosul salvat pe server (tabela: cart_items): doar perechi (produs, cantitate) per user.
+    Numele / pretul / imaginea se iau din products la citire.
+    """
+    __tablename__ = 'cart_items'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False)
+
+
+class ProductCoPurchase(db.Model):
+    """
+    Indexul de recomandari (tabela: product_copurchases): in cate comenzi apare `related_id`
+    impreuna cu `product_id`. Reconstruit de scripts/build_recommendations.py (top N per
+    produs) si incrementat la checkout.
+    """
+    __tablename__ = 'product_copurchases'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    related_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    orders_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_product_copurchases_rank', 'product_id', 'orders_count'),
+    )
+
+
+class CacheEvent(db.Model):
+    """
+    Outbox pentru invalidarea cache-urilor intre procese (tabela: cache_events), folosit
+    cand DB-ul nu e Postgres (acolo evenimentele merg prin NOTIFY). Vezi cache_bus.py.
+    """
+    __tablename__ = 'cache_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
+class Job(db.Model):
+    """
+    Job de fundal (tabela: jobs), rulat de scripts/job_worker.py; status queued / running /
+    done / failed. Vezi jobs.py.
+    """
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(80), nullable=False)
+    # Argumentele task-ului, JSON
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    # Nu ruleaza inainte de run_at (programare / backoff dupa o eroare)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(80))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    result = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+
+class JobSchedule(db.Model):
+    """
+    Job-urile periodice (tabela: job_schedules, din JOBS_SCHEDULE): cate un rand per tip,
+    cu urmatoarea rulare.
+    """
+    __tablename__ = 'job_schedules'
+
+    kind = db.Column(db.String(80), primary_key=True)
+    every = db.Column(db.Integer, nullable=False)
+    next_run_at = db.Column(db.DateTime, nullable=False)
+
+
 class Feedback(db.Model):
     """
     Mesaje trimise din pagina de contact.
@@ -0,0 +1,246 @@
+"""
+Partitionare lunara (Postgres, RANGE pe created_at) pentru orders si order_status_history.
+
+Tabelele devin parinti partitionati, cu cate o partitie pe luna: <tabela>_pYYYY_MM, cu
+intervalul [1 ale lunii, 1 ale lunii urmatoare). Un filtru pe interval de created_at
+(ex: comenzile de azi, ultimele 30 de zile) citeste doar partitiile lunilor atinse; filtrele
+de forma date(created_at) = ... nu se pot restrange si scaneaza tot istoricul.
+
+- conversia tabelelor existente: partition_tables() (scripts/migrate_partitions.py);
+- partitiile viitoare (luna curenta + ORDER_PARTITIONS_AHEAD luni) se creeaza de
+  ensure_partitions(), la cel mult CHECK_INTERVAL secunde per worker (before_request)
+  si din scripts/manage_partitions.py (cron);
+- lunile vechi se scot cu detach_partitions(): partitia ramane o tabela separata (de
+  arhivat cu pg_dump sau sters), fara sa rescrie restul istoricului.
+
+Postgres nu permite chei straine catre o tabela partitionata fara created_at in cheie, asa
+ca order_items.order_id si order_status_history.order_id pierd FK-ul catre orders; cascada
+din ORM (Order.items / Order.status_history) si order_workflow sterg liniile impreuna cu
+comanda. Pe alte DB-uri (SQLite) tabelele raman neschimbate.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+PARTITIONED_TABLES = ("orders", "order_status_history")
+MONTHS_AHEAD = int(os.getenv("ORDER_PARTITIONS_AHEAD", "3"))
+CHECK_INTERVAL = 6 * 60 * 60
+RETRY_INTERVAL = 60
+LOCK_KEY = 987655
+
+logger = logging.getLogger(__name__)
+
+# Indexuri pe parinte: se propaga in fiecare partitie, inclusiv in cele create ulterior
+INDEXES = {
+    "orders": (("ix_orders_created_at", "created_at"), ("ix_orders_user_id", "user_id")),
+    "order_status_history": (("ix_order_status_history_order_id", "order_id"),),
+}
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def day_bounds(day):
+    """Intervalul [day, day + 1) ca datetime, pentru filtre care se pot restrange pe partitii."""
+    start = datetime(day.year, day.month, day.day)
+    return start, start + timedelta(days=1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def is_partitioned(connection, table):
+    return bool(
+        connection.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def list_partitions(connection, table):
+    """[(nume, luna)] pentru partitiile atasate, in ordinea lunilor."""
+    names = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).scalars()
+    pattern = re.compile(r"_p(\d{4})_(\d{2})$")
+    result = []
+    for name in names:
+        match = pattern.search(name)
+        if match:
+            result.append((name, datetime(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(result, key=lambda item: item[1])
+
+
+def create_partitions(connection, table, first_month, last_month, parent=None):
+    """Creeaza partitiile lipsa pentru lunile [first_month, last_month]; intoarce numele noi."""
+    parent = parent or table
+    existing = {name for name, _ in list_partitions(connection, parent)}
+    created = []
+    month = month_start(first_month)
+    while month <= last_month:
+        name = partition_name(table, month)
+        if name not in existing:
+            connection.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} "
+                    f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+                )
+            )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_partitions(connection, months_ahead=None):
+    """Partitiile pentru luna curenta si urmatoarele `months_ahead` luni, pe tabelele partitionate."""
+    if connection.dialect.name != "postgresql":
+        return []
+    months_ahead = MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(datetime.utcnow())
+    last = add_months(current, months_ahead)
+    tables = [table for table in PARTITIONED_TABLES if is_partitioned(connection, table)]
+    missing = [
+        table
+        for table in tables
+        if {partition_name(table, add_months(current, step)) for step in range(months_ahead + 1)}
+        - {name for name, _ in list_partitions(connection, table)}
+    ]
+    if not missing:
+        return []
+    # Doi workeri care creeaza aceeasi luna: al doilea asteapta si gaseste partitia
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
+    created = []
+    for table in missing:
+        created.extend(create_partitions(connection, table, current, last))
+    return created
+
+
+def detach_partitions(connection, before_month):
+    """Scoate din orders / order_status_history lunile mai vechi decat `before_month`."""
+    detached = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(connection, table):
+            continue
+        for name, month in list_partitions(connection, table):
+            if month < before_month:
+                connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                detached.append(name)
+    return detached
+
+
+class PartitionMaintenance:
+    """Ruleaza ensure_partitions() cel mult o data la CHECK_INTERVAL secunde per proces."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+
+    def maybe_run(self, engine):
+        if engine.dialect.name != "postgresql" or time.monotonic() < self._next_check:
+            return []
+        with self._lock:
+            if time.monotonic() < self._next_check:
+                return []
+            try:
+                with engine.begin() as connection:
+                    created = ensure_partitions(connection)
+            except Exception:
+                # Requestul merge mai departe; luna curenta are deja partitie (creata din timp)
+                logger.exception("order_partitions: crearea partitiilor a esuat")
+                self._next_check = time.monotonic() + RETRY_INTERVAL
+                return []
+            self._next_check = time.monotonic() + CHECK_INTERVAL
+            return created
+
+
+partition_maintenance = PartitionMaintenance()
+
+
+# ===== conversie tabele existente =====
+
+def _fill_created_at(connection, table):
+    # Cheia de partitionare nu poate fi NULL
+    if table == "orders":
+        sql = "UPDATE orders SET created_at = COALESCE(date_ordered, :now) WHERE created_at IS NULL"
+    else:
+        sql = (
+            "UPDATE order_status_history h SET created_at = "
+            "COALESCE((SELECT o.created_at FROM orders o WHERE o.id = h.order_id), :now) "
+            "WHERE h.created_at IS NULL"
+        )
+    return connection.execute(text(sql), {"now": datetime.utcnow()}).rowcount
+
+
+def _foreign_keys(connection, where, table):
+    return connection.execute(
+        text(
+            "SELECT conrelid::regclass::text AS owner, conname, confrelid::regclass::text AS target, "
+            f"pg_get_constraintdef(oid) AS definition FROM pg_constraint WHERE contype = 'f' AND {where} = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).all()
+
+
+def _convert(connection, table, months_ahead):
+    staging = f"{table}_partitioned"
+    _fill_created_at(connection, table)
+    first = connection.execute(text(f"SELECT min(created_at) FROM {table}")).scalar() or datetime.utcnow()
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}).scalar()
+    outgoing = _foreign_keys(connection, "conrelid", table)
+    incoming = _foreign_keys(connection, "confrelid", table)
+
+    connection.execute(text(f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"))
+    connection.execute(text(f"ALTER TABLE {staging} ALTER COLUMN created_at SET NOT NULL"))
+    create_partitions(connection, table, first, add_months(month_start(datetime.utcnow()), months_ahead), parent=staging)
+    copied = connection.execute(text(f"INSERT INTO {staging} SELECT * FROM {table}")).rowcount
+    expected = connection.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+    if copied != expected:
+        raise RuntimeError(f"{table}: copiate {copied} din {expected} randuri")
+
+    for fk in incoming:
+        connection.execute(text(f'ALTER TABLE {fk.owner} DROP CONSTRAINT "{fk.conname}"'))
+    if sequence:
+        # Secventa id-urilor trece la tabela noua (altfel DROP TABLE o sterge)
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {staging}.id"))
+    connection.execute(text(f"DROP TABLE {table}"))
+    connection.execute(text(f"ALTER TABLE {staging} RENAME TO {table}"))
+    # Cheia primara trebuie sa contina cheia de partitionare
+    connection.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)"))
+    for name, column in INDEXES[table]:
+        connection.execute(text(f"CREATE INDEX {name} ON {table} ({column})"))
+    for fk in outgoing:
+        if fk.target not in PARTITIONED_TABLES:
+            connection.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT "{fk.conname}" {fk.definition}'))
+    connection.execute(text(f"ANALYZE {table}"))
+    return copied
+
+
+def partition_tables(connection, months_ahead=None):
+    """
+    Converteste orders si order_status_history in tabele partitionate lunar (Postgres).
+    Ruleaza in tranzactia conexiunii, cu tabelele blocate pe durata copierii.
+    Intoarce {tabela: randuri copiate}; tabelele deja partitionate sunt sarite.
+    """
+    months_ahead = MONTHS_AHEAD if months_ahead is None else months_ahead
+    pending = [table for table in PARTITIONED_TABLES if not is_partitioned(connection, table)]
+    if not pending:
+        return {}
+    connection.execute(text("LOCK TABLE orders, order_status_history, order_items IN ACCESS EXCLUSIVE MODE"))
+    return {table: _convert(connection, table, months_ahead) for table in pending}
@@ -0,0 +1,174 @@
+"""
+Workflow-ul comenzilor: tabela de tranzitii + update-uri conditionale in SQL.
+
+pending -> paid -> processing -> shipped
+pending / paid / processing -> cancelled (cu restock)
+
+Tranzitiile sunt aplicate cu `UPDATE ... WHERE status IN (<surse permise>)`, deci
+doua request-uri concurente nu pot muta aceeasi comanda pe o tranzitie invalida.
+Functiile de aici nu fac commit; apelantul decide tranzactia.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+
+from models import db, Order, OrderItem, OrderStatusHistory, OrderStatusHistoryArchive, Product
+import cache_bus
+import stock_shards
+
+
+ORDER_STATUSES = ("pending", "paid", "processing", "shipped", "cancelled")
+
+ORDER_TRANSITIONS = {
+    "pending": ("paid", "cancelled"),
+    "paid": ("processing", "cancelled"),
+    "processing": ("shipped", "cancelled"),
+    "shipped": (),
+    "cancelled": (),
+}
+
+# Clientul isi poate anula singur comanda doar cat timp e pending
+CLIENT_CANCELLABLE = ("pending",)
+
+
+def allowed_sources(target):
+    """Statusurile din care se poate ajunge in `target`."""
+    return tuple(src for src, targets in ORDER_TRANSITIONS.items() if target in targets)
+
+
+def restock_orders(order_ids):
+    """
+    Pune inapoi pe stoc produsele din comenzile date, intr-un singur UPDATE ... FROM
+    (produsele cu stoc distribuit primesc cantitatea intr-unul din randurile lor).
+    """
+    if not order_ids:
+        return
+    returned = (
+        select(OrderItem.product_id, func.sum(OrderItem.quantity).label("qty"))
+        .where(OrderItem.order_id.in_(order_ids))
+        .group_by(OrderItem.product_id)
+        .subquery()
+    )
+    db.session.execute(
+        update(Product)
+        .values(stock=func.coalesce(Product.stock, 0) + returned.c.qty)
+        .where(Product.id == returned.c.product_id, Product.stock_shards == 0)
+        .execution_options(synchronize_session=False)
+    )
+    sharded = db.session.execute(
+        select(returned.c.product_id, returned.c.qty, Product.stock_shards)
+        .join(Product, Product.id == returned.c.product_id)
+        .where(Product.stock_shards > 0)
+        .order_by(returned.c.product_id)
+    ).all()
+    for row in sharded:
+        stock_shards.give(row.product_id, row.stock_shards, row.qty)
+    # Stocul se schimba abia la commit-ul apelantului
+    cache_bus.invalidate_after_commit("products")
+
+
+def transition_orders(order_ids, target, note, sources=None, user_id=None):
+    """
+    Muta comenzile `order_ids` in `target` daca statusul curent permite tranzitia.
+
+    Intoarce setul de id-uri actualizate. `sources` restrange statusurile de plecare
+    (ex. anularea facuta de client), iar `user_id` limiteaza la comenzile unui user.
+    """
+    if target not in ORDER_TRANSITIONS:
+        raise ValueError(f"Status invalid: {target}")
+    if sources is None:
+        sources = allowed_sources(target)
+    if not order_ids or not sources:
+        return set()
+
+    stmt = (
+        update(Order)
+        .where(Order.id.in_(order_ids), Order.status.in_(sources))
+        .values(status=target)
+        .returning(Order.id)
+        .execution_options(synchronize_session=False)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Order.user_id == user_id)
+    updated = set(db.session.execute(stmt).scalars())
+
+    if updated and target == "cancelled":
+        restock_orders(updated)
+    if updated:
+        db.session.execute(
+            insert(OrderStatusHistory),
+            [{"order_id": oid, "status": target, "note": note} for oid in sorted(updated)],
+        )
+    return updated
+
+
+def classify_results(order_ids, target, updated):
+    """Rezultat per id pentru raspunsurile API (updated / unchanged / not_found / invalid_transition)."""
+    missing = [oid for oid in order_ids if oid not in updated]
+    current = {}
+    if missing:
+        current = dict(
+            db.session.execute(select(Order.id, Order.status).where(Order.id.in_(missing))).all()
+        )
+    results = []
+    for oid in order_ids:
+        if oid in updated:
+            result = "updated"
+        elif oid not in current:
+            result = "not_found"
+        elif current[oid] == target:
+            result = "unchanged"
+        else:
+            result = "invalid_transition"
+        results.append({"id": oid, "result": result})
+    return results
+
+
+def delete_orders(order_ids):
+    """Sterge comenzile (cu item-uri si istoric); cele neanulate se pun inapoi pe stoc."""
+    if not order_ids:
+        return set()
+    existing = dict(
+        db.session.execute(select(Order.id, Order.status).where(Order.id.in_(order_ids))).all()
+    )
+    restock_orders([oid for oid, status in existing.items() if status != "cancelled"])
+    ids = list(existing)
+    if ids:
+        db.session.execute(delete(OrderStatusHistory).where(OrderStatusHistory.order_id.in_(ids)))
+        db.session.execute(delete(OrderItem).where(OrderItem.order_id.in_(ids)))
+        db.session.execute(
+            delete(Order).where(Order.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+    return set(ids)
+
+
+def compact_status_history(older_than_days=90, archive=True):
+    """
+    Compacteaza istoricul: pentru randurile mai vechi de `older_than_days` se pastreaza
+    doar ultimul rand al fiecarei comenzi; restul sunt mutate in arhiva (sau sterse).
+    Intoarce numarul de randuri scoase din order_status_history.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    latest_ids = select(func.max(OrderStatusHistory.id)).group_by(OrderStatusHistory.order_id)
+    stale = (
+        OrderStatusHistory.created_at < cutoff,
+        OrderStatusHistory.id.not_in(latest_ids),
+    )
+
+    if archive:
+        db.session.execute(
+            insert(OrderStatusHistoryArchive).from_select(
+                ["id", "order_id", "status", "note", "created_at"],
+                select(
+                    OrderStatusHistory.id,
+                    OrderStatusHistory.order_id,
+                    OrderStatusHistory.status,
+                    OrderStatusHistory.note,
+                    OrderStatusHistory.created_at,
+                ).where(*stale),
+            )
+        )
+    result = db.session.execute(
+        delete(OrderStatusHistory).where(*stale).execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
@@ -0,0 +1,74 @@
+"""
+Cache scurt (TTL) pentru pret / stoc / titlu pe produs, folosit de /api/cart/quote.
+
+Un quote pentru tot cosul = cel mult un `SELECT ... WHERE id IN (...)` pentru produsele
+care nu sunt in cache. Cache-ul e per worker; scrierile din acelasi proces (checkout,
+editare / stergere produs) invalideaza intrarile, iar TTL-ul (CART_QUOTE_TTL, secunde)
+limiteaza cat de vechi pot fi datele venite din alte procese.
+Checkout-ul nu foloseste cache-ul: pretul si stocul final sunt citite mereu din DB.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import select
+
+from models import db, Product
+
+
+class ProductCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, ids):
+        """{id: {"title", "price", "stock"}} pentru id-urile existente; lipsesc cele inexistente."""
+        now = time.monotonic()
+        found = {}
+        missing = []
+        with self._lock:
+            for pid in ids:
+                entry = self._entries.get(pid)
+                if entry and entry[0] > now:
+                    found[pid] = entry[1]
+                else:
+                    missing.append(pid)
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            rows = db.session.execute(
+                select(Product.id, Product.title, Product.artist, Product.price, Product.stock_total).where(
+                    Product.id.in_(missing), Product.deleted_at.is_(None)
+                )
+            ).all()
+            expires = time.monotonic() + self.ttl
+            fresh = {
+                row.id: {
+                    "title": f"{row.title} - {row.artist}",
+                    "price": row.price,
+                    "stock": row.stock_total,
+                }
+                for row in rows
+            }
+            if self.ttl > 0:
+                with self._lock:
+                    for pid, data in fresh.items():
+                        self._entries[pid] = (expires, data)
+            found.update(fresh)
+        return found
+
+    def invalidate(self, ids=None):
+        """Scoate produsele date din cache (sau tot cache-ul, fara argumente)."""
+        with self._lock:
+            if ids is None:
+                self._entries.clear()
+                return
+            for pid in ids:
+                self._entries.pop(pid, None)
+
+
+product_cache = ProductCache(ttl=float(os.getenv("CART_QUOTE_TTL", "10")))
@@ -0,0 +1,273 @@
+"""
+Rate limiting cu token bucket pentru endpoint-urile scumpe sau expuse (login, checkout, Qobuz...).
+
+Fiecare regula (endpoint -> N cereri la S secunde, per IP sau per user) e un bucket cu N
+jetoane, reumplut cu N/S jetoane pe secunda: o cerere consuma un jeton, iar fara jeton
+primeste 429 cu Retry-After (secundele pana la urmatorul jeton). Se permit rafale de pana
+la N cereri, apoi ritmul mediu N/S.
+
+Bucket-urile stau in memoria workerului (implicit; limita efectiva e N x numarul de
+workeri) sau, cu RATE_LIMIT_STORE=postgres, intr-o tabela UNLOGGED comuna tuturor
+workerilor: un singur INSERT ... ON CONFLICT DO UPDATE per cerere limitata. Daca Postgres
+nu raspunde, cererea trece prin bucket-ul local (nu blocam site-ul din cauza limitatorului).
+
+Regulile implicite sunt in DEFAULT_RULES; RATE_LIMITS="endpoint=N/S[/ip|user],..." le
+suprascrie (N=0 scoate regula). Contoarele (cereri permise / respinse per endpoint, per
+worker) sunt la GET /api/dashboard/rate-limits.
+"""
+import logging
+import math
+import os
+import threading
+import time
+
+from flask import g, jsonify, make_response, render_template, request
+from flask_login import current_user
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+MAX_MEMORY_KEYS = 100000
+CLEANUP_INTERVAL = 600
+STORE_RETRY_INTERVAL = 30
+
+
+class Rule:
+    """`limit` cereri la `period` secunde; scope "ip" sau "user" (anonimii cad pe IP)."""
+
+    def __init__(self, limit, period, scope="ip", methods=None):
+        self.limit = limit
+        self.period = period
+        self.scope = scope
+        self.methods = methods
+        self.rate = limit / period
+
+    def describe(self):
+        methods = f" {','.join(self.methods)}" if self.methods else ""
+        return f"{self.limit}/{self.period:g}s per {self.scope}{methods}"
+
+
+# Formularele (login, register, contact) au GET ieftin: se limiteaza doar POST-ul
+DEFAULT_RULES = {
+    "checkout.api_checkout": Rule(10, 60, "user"),
+    "auth.login": Rule(10, 60, "ip", ("POST",)),
+    "auth.register": Rule(5, 600, "ip", ("POST",)),
+    "public.contact": Rule(5, 600, "ip", ("POST",)),
+    "public.newsletter_subscribe": Rule(5, 600, "ip"),
+    "qobuz.qobuz_search": Rule(30, 60, "user"),
+    "qobuz.qobuz_preview": Rule(60, 60, "ip"),
+    "qobuz.qobuz_previews": Rule(20, 60, "ip"),
+    "qobuz.qobuz_album": Rule(30, 60, "ip"),
+}
+
+
+def parse_rules(value, defaults=DEFAULT_RULES):
+    """DEFAULT_RULES + suprascrierile din "endpoint=N/S[/ip|user],..."."""
+    rules = dict(defaults)
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        endpoint, _, spec = item.partition("=")
+        endpoint = endpoint.strip()
+        parts = spec.strip().split("/")
+        try:
+            limit = int(parts[0])
+            # "endpoint=0" scoate regula (perioada nu mai conteaza)
+            if limit <= 0:
+                rules.pop(endpoint, None)
+                continue
+            period = float(parts[1])
+        except (IndexError, ValueError):
+            raise ValueError(f"RATE_LIMITS: regula invalida {item.strip()!r} (format endpoint=N/S[/ip|user])")
+        scope = parts[2] if len(parts) > 2 else getattr(rules.get(endpoint), "scope", "ip")
+        if scope not in ("ip", "user") or period <= 0:
+            raise ValueError(f"RATE_LIMITS: regula invalida {item.strip()!r}")
+        methods = getattr(rules.get(endpoint), "methods", None)
+        rules[endpoint] = Rule(limit, period, scope, methods)
+    return rules
+
+
+class MemoryStore:
+    """Bucket-uri in memoria procesului: {cheie: (jetoane, ultima actualizare)}."""
+
+    name = "memory"
+
+    def __init__(self, max_keys=MAX_MEMORY_KEYS):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self.max_keys = max_keys
+
+    def take(self, key, rule):
+        """(permis, jetoane ramase, secunde pana la urmatorul jeton)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (rule.limit, now))
+            tokens = min(rule.limit, tokens + (now - updated) * rule.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if key not in self._buckets and len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            self._buckets[key] = (tokens, now)
+        return allowed, tokens, 0.0 if allowed else (1 - tokens) / rule.rate
+
+    def _prune(self, now):
+        # Bucket-urile neatinse de mult sunt oricum pline: se pot uita
+        idle = sorted(self._buckets.items(), key=lambda item: item[1][1])
+        for key, _ in idle[: len(idle) // 2]:
+            del self._buckets[key]
+
+
+class PostgresStore:
+    """Bucket-uri comune tuturor workerilor, in tabela rate_limit_buckets (Postgres)."""
+
+    name = "postgres"
+
+    TAKE = text(
+        "INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at) "
+        "VALUES (:key, :limit - 1, extract(epoch FROM now())) "
+        "ON CONFLICT (key) DO UPDATE SET "
+        "  tokens = LEAST(:limit, b.tokens + (extract(epoch FROM now()) - b.updated_at) * :rate) - 1, "
+        "  updated_at = extract(epoch FROM now()) "
+        "WHERE LEAST(:limit, b.tokens + (extract(epoch FROM now()) - b.updated_at) * :rate) >= 1 "
+        "RETURNING tokens"
+    )
+    PEEK = text(
+        "SELECT LEAST(:limit, tokens + (extract(epoch FROM now()) - updated_at) * :rate) "
+        "FROM rate_limit_buckets WHERE key = :key"
+    )
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._ready = False
+        self._next_cleanup = 0.0
+
+    def _prepare(self, connection):
+        # UNLOGGED: fara WAL (contoarele pot fi pierdute la un crash, nu conteaza)
+        connection.execute(
+            text(
+                "CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets ("
+                "key TEXT PRIMARY KEY, tokens DOUBLE PRECISION NOT NULL, updated_at DOUBLE PRECISION NOT NULL)"
+            )
+        )
+        self._ready = True
+
+    def take(self, key, rule):
+        params = {"key": key, "limit": rule.limit, "rate": rule.rate}
+        try:
+            with self.engine.begin() as connection:
+                if not self._ready:
+                    self._prepare(connection)
+                remaining = connection.execute(self.TAKE, params).scalar()
+                if remaining is None:
+                    tokens = connection.execute(self.PEEK, params).scalar() or 0.0
+                if time.monotonic() >= self._next_cleanup:
+                    self._next_cleanup = time.monotonic() + CLEANUP_INTERVAL
+                    connection.execute(
+                        text("DELETE FROM rate_limit_buckets WHERE updated_at < extract(epoch FROM now()) - 86400")
+                    )
+        except Exception:
+            # La urmatoarea incercare tabela se (re)creeaza, daca lipseste
+            self._ready = False
+            raise
+        if remaining is not None:
+            return True, remaining, 0.0
+        return False, tokens, (1 - tokens) / rule.rate
+
+
+class RateLimiter:
+    def __init__(self):
+        self.rules = {}
+        self.enabled = False
+        self.fallback = MemoryStore()
+        self.store = self.fallback
+        self.trust_forwarded = False
+        self._lock = threading.Lock()
+        self._store_down_until = 0.0
+        self.allowed = {}
+        self.rejected = {}
+        self.store_errors = 0
+
+    def init_app(self, app, engine):
+        self.rules = parse_rules(os.getenv("RATE_LIMITS"))
+        self.enabled = os.getenv("RATE_LIMITS_ENABLED", "1").lower() not in {"0", "false", "no"}
+        self.trust_forwarded = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "").lower() in {"1", "true", "yes"}
+        if os.getenv("RATE_LIMIT_STORE", "memory") == "postgres":
+            if engine.dialect.name == "postgresql":
+                self.store = PostgresStore(engine)
+            else:
+                logger.warning("RATE_LIMIT_STORE=postgres cere Postgres; se folosesc bucket-uri in memorie")
+        app.before_request(self.check)
+        app.after_request(self.add_headers)
+
+    def _client(self, rule):
+        if rule.scope == "user" and current_user.is_authenticated:
+            return f"user:{current_user.id}"
+        # In spatele unui proxy (nginx) IP-ul real e primul din X-Forwarded-For
+        if self.trust_forwarded and request.access_route:
+            return f"ip:{request.access_route[0]}"
+        return f"ip:{request.remote_addr}"
+
+    def _take(self, key, rule):
+        if self.store is self.fallback or time.monotonic() < self._store_down_until:
+            return self.fallback.take(key, rule)
+        try:
+            return self.store.take(key, rule)
+        except Exception:
+            with self._lock:
+                self.store_errors += 1
+            self._store_down_until = time.monotonic() + STORE_RETRY_INTERVAL
+            logger.exception("rate_limit: store-ul %s a esuat; bucket-uri locale %ss", self.store.name, STORE_RETRY_INTERVAL)
+            return self.fallback.take(key, rule)
+
+    def _count(self, counters, endpoint):
+        with self._lock:
+            counters[endpoint] = counters.get(endpoint, 0) + 1
+
+    def check(self):
+        """before_request: None daca cererea trece, altfel raspunsul 429."""
+        rule = self.rules.get(request.endpoint)
+        if not self.enabled or rule is None or (rule.methods and request.method not in rule.methods):
+            return None
+        allowed, tokens, retry_after = self._take(f"{request.endpoint}:{self._client(rule)}", rule)
+        g.rate_limit = (rule, max(int(tokens), 0))
+        if allowed:
+            self._count(self.allowed, request.endpoint)
+            return None
+        self._count(self.rejected, request.endpoint)
+        seconds = max(math.ceil(retry_after), 1)
+        if request.path.startswith("/api/") or request.is_json:
+            response = jsonify({"error": "Prea multe cereri. Incearca din nou mai tarziu.", "retry_after": seconds})
+        else:
+            response = make_response(render_template("429.html", retry_after=seconds))
+        response.status_code = 429
+        response.headers["Retry-After"] = str(seconds)
+        return response
+
+    def add_headers(self, response):
+        limited = g.get("rate_limit")
+        if limited:
+            rule, remaining = limited
+            response.headers["X-RateLimit-Limit"] = str(rule.limit)
+            response.headers["X-RateLimit-Remaining"] = str(remaining)
+        return response
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "store": self.store.name,
+                "store_errors": self.store_errors,
+                "rules": {endpoint: rule.describe() for endpoint, rule in sorted(self.rules.items())},
+                "allowed": dict(self.allowed),
+                "rejected": dict(self.rejected),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.allowed = {}
+            self.rejected = {}
+            self.store_errors = 0
+
+
+rate_limiter = RateLimiter()
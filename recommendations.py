@@ -0,0 +1,183 @@
+"""
+Recomandari "cumparate impreuna" pentru pagina de produs.
+
+Sursa e tabela product_copurchases (perechi produs -> produs + numar de comenzi comune),
+reconstruita offline de scripts/build_recommendations.py si incrementata la fiecare
+checkout (record_order). Daca un produs are prea putine perechi, lista se completeaza
+cu produse de la acelasi artist si apoi din aceeasi categorie.
+
+Id-urile recomandate se tin intr-un dict per worker (lookup O(1) la afisare), cu TTL
+(RECOMMENDATIONS_TTL secunde); checkout-ul invalideaza produsele din comanda.
+Produsele in sine (pret, stoc) sunt citite mereu din DB, intr-un singur SELECT.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import delete, func, literal, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import aliased
+
+from models import db, OrderItem, Product, ProductCoPurchase
+
+RECOMMENDATIONS_LIMIT = 4
+# Cate perechi se pastreaza per produs la rebuild (restul nu ajung niciodata in top)
+STORED_PER_PRODUCT = 20
+# Produse inlocuite per tranzactie la rebuild (checkout-ul asteapta cel mult un lot)
+REBUILD_BATCH_SIZE = 500
+
+RANKED_PAIRS = text(
+    "SELECT product_id, related_id, orders_count FROM ("
+    "  SELECT a.product_id, b.product_id AS related_id, count(DISTINCT a.order_id) AS orders_count,"
+    "         row_number() OVER (PARTITION BY a.product_id"
+    "                            ORDER BY count(DISTINCT a.order_id) DESC, b.product_id) AS rank"
+    "  FROM order_items a"
+    "  JOIN order_items b ON b.order_id = a.order_id AND b.product_id <> a.product_id"
+    "  JOIN orders o ON o.id = a.order_id"
+    "  WHERE o.status <> 'cancelled'"
+    "  GROUP BY a.product_id, b.product_id"
+    ") ranked WHERE rank <= :top"
+)
+
+
+def _available():
+    return (Product.stock_total > 0, Product.deleted_at.is_(None))
+
+
+def _related_ids(product, limit):
+    """Co-purchase, apoi acelasi artist, apoi aceeasi categorie; fara produsul curent si fara cele epuizate."""
+    ids = list(
+        db.session.execute(
+            select(ProductCoPurchase.related_id)
+            .join(Product, Product.id == ProductCoPurchase.related_id)
+            .where(ProductCoPurchase.product_id == product.id, *_available())
+            .order_by(ProductCoPurchase.orders_count.desc(), ProductCoPurchase.related_id)
+            .limit(limit)
+        ).scalars()
+    )
+    fallbacks = (Product.artist == product.artist, Product.category_id == product.category_id)
+    for condition in fallbacks:
+        if len(ids) >= limit:
+            break
+        ids += db.session.execute(
+            select(Product.id)
+            .where(
+                condition,
+                Product.id != product.id,
+                Product.id.not_in(ids),
+                *_available(),
+            )
+            .order_by(Product.id.desc())
+            .limit(limit - len(ids))
+        ).scalars()
+    return tuple(ids)
+
+
+class RecommendationIndex:
+    def __init__(self, ttl, limit=RECOMMENDATIONS_LIMIT):
+        self.ttl = ttl
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def ids_for(self, product):
+        now = time.monotonic()
+        entry = self._entries.get(product.id)
+        if entry and entry[0] > now:
+            return entry[1]
+        ids = _related_ids(product, self.limit)
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[product.id] = (now + self.ttl, ids)
+        return ids
+
+    def products_for(self, product):
+        """Produsele recomandate, in ordinea din index (un singur SELECT ... IN)."""
+        ids = self.ids_for(product)
+        if not ids:
+            return []
+        by_id = {p.id: p for p in Product.query.filter(Product.id.in_(ids), Product.deleted_at.is_(None))}
+        return [by_id[pid] for pid in ids if pid in by_id]
+
+    def invalidate(self, ids=None):
+        with self._lock:
+            if ids is None:
+                self._entries.clear()
+                return
+            for pid in ids:
+                self._entries.pop(pid, None)
+
+
+recommendation_index = RecommendationIndex(ttl=float(os.getenv("RECOMMENDATIONS_TTL", "600")))
+
+
+def record_order(order_id):
+    """
+    Incrementeaza perechile pentru produsele din comanda (INSERT ... SELECT ... ON CONFLICT).
+    Nu face commit; ruleaza in tranzactia checkout-ului.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        # Fara upsert generic; perechile noi apar la urmatorul rebuild
+        return
+    a = aliased(OrderItem)
+    b = aliased(OrderItem)
+    pairs = (
+        select(a.product_id, b.product_id, literal(1))
+        .join(b, (b.order_id == a.order_id) & (b.product_id != a.product_id))
+        .where(a.order_id == order_id)
+        .distinct()
+    )
+    stmt = insert(ProductCoPurchase).from_select(["product_id", "related_id", "orders_count"], pairs)
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ProductCoPurchase.product_id, ProductCoPurchase.related_id],
+            set_={"orders_count": ProductCoPurchase.orders_count + 1},
+        )
+    )
+
+
+def rebuild(stored_per_product=STORED_PER_PRODUCT, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Reconstruieste tot indexul din order_items (comenzile anulate nu conteaza), pastrand
+    top `stored_per_product` perechi per produs; intoarce numarul de perechi.
+
+    Clasamentul se calculeaza intr-un singur SELECT (doar citire, nu blocheaza checkout-ul;
+    cel mult `stored_per_product` randuri per produs), apoi randurile se inlocuiesc pe loturi
+    de `batch_size` produse, fiecare cu commit propriu: record_order asteapta cel mult un lot,
+    nu tot rebuild-ul. Incrementarile facute intre SELECT si lotul produsului se pierd pana la
+    urmatorul rebuild. Face commit singur.
+    """
+    ranked = db.session.execute(RANKED_PAIRS, {"top": stored_per_product}).all()
+    existing = set(db.session.execute(select(ProductCoPurchase.product_id).distinct()).scalars())
+    db.session.commit()
+
+    pairs = {}
+    for product_id, related_id, orders_count in ranked:
+        pairs.setdefault(product_id, []).append(
+            {"product_id": product_id, "related_id": related_id, "orders_count": orders_count}
+        )
+    # Produsele care nu mai au perechi (ex: comenzi anulate) raman doar cu stergerea
+    product_ids = sorted(existing | set(pairs))
+    for start in range(0, len(product_ids), batch_size):
+        batch = product_ids[start:start + batch_size]
+        try:
+            db.session.execute(delete(ProductCoPurchase).where(ProductCoPurchase.product_id.in_(batch)))
+            rows = [row for product_id in batch for row in pairs.get(product_id, ())]
+            if rows:
+                db.session.execute(ProductCoPurchase.__table__.insert(), rows)
+            db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
+    return len(ranked)
+
+
+def index_stats():
+    return db.session.execute(
+        select(func.count(), func.count(func.distinct(ProductCoPurchase.product_id)))
+    ).one()
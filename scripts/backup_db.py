@@ -1,86 +1,159 @@
 import argparse
+import gzip
 import os
 import shutil
 import subprocess
+import time
 from datetime import datetime
-from urllib.parse import urlparse
+
+from db_tools import (
+    CHUNK_SIZE,
+    SnapshotSession,
+    pg_command,
+    prune_backups,
+    resolve_connection,
+    use_docker,
+    write_manifest,
+)
+
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3, "none": 0}
+PLAIN_EXTENSIONS = {"none": ".sql", "gzip": ".sql.gz", "zstd": ".sql.zst"}
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Backup Postgres to SQL via docker compose.")
     parser.add_argument(
         "--output",
-        help="Output SQL file path (default: backups/garden_records_YYYYMMDD-HHMMSS.sql)",
+        help="Output path (default: backups/garden_records_YYYYMMDD-HHMMSS.sql[.gz|.zst] sau .dir)",
     )
     parser.add_argument("--db", default="garden_records", help="Database name")
     parser.add_argument("--user", default="postgres", help="Database user")
     parser.add_argument("--host", default="db", help="Database host (direct mode)")
     parser.add_argument("--port", default="5432", help="Database port (direct mode)")
+    parser.add_argument(
+        "--format",
+        choices=["plain", "directory"],
+        default="plain",
+        help="plain = SQL (pg_dump -F p), directory = pg_dump -F d (dump/restore paralel)",
+    )
+    parser.add_argument("--jobs", type=int, default=4, help="Job-uri paralele pentru --format directory")
+    parser.add_argument(
+        "--compress",
+        choices=["none", "gzip", "zstd"],
+        default="gzip",
+        help="Compresie (plain: streaming; directory: per tabel, zstd necesita Postgres 16+)",
+    )
+    parser.add_argument("--level", type=int, help="Nivel compresie (default gzip 6, zstd 3)")
+    parser.add_argument("--keep", type=int, default=0, help="Pastreaza doar ultimele N backup-uri (0 = toate)")
+    parser.add_argument(
+        "--max-age-days",
+        type=int,
+        default=0,
+        help="Sterge backup-urile mai vechi de N zile (0 = dezactivat)",
+    )
     return parser.parse_args()
 
 
+def open_compressed(path, compress, level):
+    if compress == "gzip":
+        return gzip.open(path, "wb", compresslevel=level)
+    if compress == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("zstd: instaleaza binarul `zstd` sau pachetul Python `zstandard`.")
+        return zstandard.ZstdCompressor(level=level, threads=-1).stream_writer(open(path, "wb"))
+    return open(path, "wb")
+
+
+def dump_plain(cmd, env, out_path, compress, level):
+    """pg_dump -F p cu compresie in streaming (fara fisier intermediar necomprimat)."""
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, env=env)
+    zstd_bin = shutil.which("zstd") if compress == "zstd" else None
+    if zstd_bin:
+        compressor = subprocess.Popen(
+            [zstd_bin, "-q", "-f", "-T0", f"-{level}", "-o", out_path],
+            stdin=proc.stdout,
+        )
+        proc.stdout.close()
+        compressor.wait()
+        return proc.wait() == 0 and compressor.returncode == 0
+
+    with open_compressed(out_path, compress, level) as out_file:
+        for chunk in iter(lambda: proc.stdout.read(CHUNK_SIZE), b""):
+            out_file.write(chunk)
+    return proc.wait() == 0
+
+
+def dump_directory(args, env, docker, out_path, compress, level, snapshot):
+    """pg_dump -F d -j N; in modul docker dump-ul se face in container si se copiaza cu `docker compose cp`."""
+    if compress == "none":
+        zarg = "0"
+    elif compress == "zstd":
+        zarg = f"zstd:{level}"
+    else:
+        zarg = str(level)
+
+    target = f"/tmp/{os.path.basename(out_path)}" if docker else out_path
+    cmd = pg_command("pg_dump", args, docker) + [
+        "-F", "d", "-j", str(args.jobs), "-Z", zarg, f"--snapshot={snapshot}", "-f", target,
+    ]
+    if subprocess.run(cmd, check=False, env=env).returncode != 0:
+        return False
+    if docker:
+        copied = subprocess.run(["docker", "compose", "cp", f"db:{target}", out_path], check=False)
+        subprocess.run(["docker", "compose", "exec", "-T", "db", "rm", "-rf", target], check=False)
+        return copied.returncode == 0
+    return True
+
+
 def main():
     args = parse_args()
+    level = args.level if args.level is not None else DEFAULT_LEVELS[args.compress]
     if args.output:
         out_path = args.output
     else:
         stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         backups_dir = os.path.join(os.path.dirname(__file__), "..", "backups")
         os.makedirs(backups_dir, exist_ok=True)
-        out_path = os.path.join(backups_dir, f"garden_records_{stamp}.sql")
-
-    use_docker = shutil.which("docker") or shutil.which("docker.exe")
-    env = os.environ.copy()
-    if not use_docker:
-        db_url = env.get("DATABASE_URL")
-        if db_url:
-            parsed = urlparse(db_url)
-            if parsed.scheme.startswith("postgres"):
-                if args.db == "garden_records" and parsed.path:
-                    args.db = parsed.path.lstrip("/")
-                if args.user == "postgres" and parsed.username:
-                    args.user = parsed.username
-                if args.host == "db" and parsed.hostname:
-                    args.host = parsed.hostname
-                if args.port == "5432" and parsed.port:
-                    args.port = str(parsed.port)
-                if parsed.password:
-                    env["PGPASSWORD"] = parsed.password
-    if use_docker:
-        cmd = [
-            "docker",
-            "compose",
-            "exec",
-            "-T",
-            "db",
-            "pg_dump",
-            "-U",
-            args.user,
-            "-d",
-            args.db,
-            "-F",
-            "p",
-        ]
-    else:
-        cmd = [
-            "pg_dump",
-            "-h",
-            args.host,
-            "-p",
-            str(args.port),
-            "-U",
-            args.user,
-            "-d",
-            args.db,
-            "-F",
-            "p",
-        ]
-
-    print(f"Backup to {out_path}")
-    with open(out_path, "wb") as out_file:
-        proc = subprocess.run(cmd, stdout=out_file, check=False, env=env)
-    if proc.returncode != 0:
-        raise SystemExit("Backup failed.")
+        ext = ".dir" if args.format == "directory" else PLAIN_EXTENSIONS[args.compress]
+        out_path = os.path.join(backups_dir, f"garden_records_{stamp}{ext}")
+
+    docker = use_docker()
+    env = resolve_connection(args, docker)
+
+    print(f"Backup to {out_path} ({args.format}, {args.compress})")
+    started = time.perf_counter()
+    # Dump-ul si numaratoarea de randuri (pentru validarea la restore) folosesc acelasi snapshot
+    with SnapshotSession(args, env, docker) as session:
+        if args.format == "directory":
+            ok = dump_directory(args, env, docker, out_path, args.compress, level, session.snapshot)
+        else:
+            cmd = pg_command("pg_dump", args, docker) + ["-F", "p", f"--snapshot={session.snapshot}"]
+            ok = dump_plain(cmd, env, out_path, args.compress, level)
+        if not ok:
+            raise SystemExit("Backup failed.")
+        counts = session.row_counts()
+    duration = time.perf_counter() - started
+
+    manifest = write_manifest(
+        out_path,
+        {
+            "database": args.db,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "format": args.format,
+            "compression": args.compress,
+            "level": level,
+            "jobs": args.jobs if args.format == "directory" else 1,
+            "duration_seconds": round(duration, 3),
+            "row_counts": counts,
+        },
+    )
+    print(f"Dump: {duration:.1f}s, {manifest['total_bytes'] / 1024 / 1024:.1f} MB, {len(manifest['files'])} fisier(e)")
+
+    removed = prune_backups(os.path.dirname(os.path.abspath(out_path)), args.keep, args.max_age_days)
+    for name in removed:
+        print(f"Retentie: sters {name}")
     print("Done.")
 
 
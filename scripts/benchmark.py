@@ -0,0 +1,774 @@
+"""
+Benchmark-uri pentru optimizarile din aplicatie.
+
+Implicit ruleaza pe o baza SQLite temporara (nu atinge DATABASE_URL din env);
+cu --database-url se poate rula pe un Postgres de test.
+
+    python scripts/benchmark.py bulk-status --orders 500
+    python scripts/benchmark.py export --orders 1000000
+    python scripts/benchmark.py recommendations --lines 1000000
+    python scripts/benchmark.py catalog --products 20000
+    python scripts/benchmark.py cache-bus --workers 4 --rounds 20
+    python scripts/benchmark.py --database-url postgresql://... partitions --orders 2000000
+    python scripts/benchmark.py --database-url postgresql://... stock-contention --buyers 50
+    python scripts/benchmark.py --database-url postgresql://... rate-limit --requests 2000
+    python scripts/benchmark.py compression --products 2000 --mbps 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def log(message):
+    print(f"[bench] {message}", flush=True)
+
+
+def load_app(database_url):
+    if not database_url:
+        tmp_dir = tempfile.mkdtemp(prefix="garden_bench_")
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    # Benchmark-urile trimit sute de cereri din acelasi IP / user (rate-limit il porneste singur)
+    os.environ.setdefault("RATE_LIMITS_ENABLED", "0")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import app as app_module
+
+    log(f"DB: {database_url}")
+    return app_module.app
+
+
+def rss_mb():
+    """RSS curent (Linux); pe alte sisteme, peak RSS din resource."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def login(client, username, password):
+    resp = client.post("/login", data={"username": username, "password": password})
+    if resp.status_code != 302:
+        raise SystemExit(f"Login failed for {username}")
+
+
+def seed_orders(db, count, chunk_size=50000):
+    from decimal import Decimal
+
+    from sqlalchemy import insert
+    from models import Order, User
+
+    client_user = User.query.filter_by(role="client").first()
+    ids = []
+    for start in range(0, count, chunk_size):
+        rows = [
+            {
+                "user_id": client_user.id,
+                "status": "pending",
+                "total_price": Decimal("49.99"),
+                "shipping_address": "Bench street 1",
+                "shipping_name": "Bench",
+                "shipping_phone": "0700000000",
+            }
+            for _ in range(min(chunk_size, count - start))
+        ]
+        ids.extend(db.session.execute(insert(Order).returning(Order.id), rows).scalars().all())
+        db.session.commit()
+    return ids
+
+
+def bench_bulk_status(args):
+    app = load_app(args.database_url)
+    from models import db
+
+    with app.app_context():
+        ids = seed_orders(db, args.orders)
+    log(f"Comenzi create: {len(ids)}")
+
+    client = app.test_client()
+    login(client, "angajat", "angajat123")
+
+    start = time.perf_counter()
+    for oid in ids:
+        client.post(f"/api/orders/{oid}/status", json={"status": "paid"})
+    per_id = time.perf_counter() - start
+    log(f"Per-id ({len(ids)} requests): {per_id * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    resp = client.post("/api/orders/status", json={"ids": ids, "status": "processing"})
+    batch = time.perf_counter() - start
+    log(f"Batch (1 request, updated={resp.get_json().get('updated')}): {batch * 1000:.1f} ms")
+    log(f"Speedup: {per_id / batch:.1f}x")
+
+
+def bench_export(args):
+    import gc
+
+    app = load_app(args.database_url)
+    from models import db, Order
+
+    with app.app_context():
+        seeded = len(seed_orders(db, args.orders))
+    log(f"Comenzi create: {seeded}")
+    gc.collect()
+
+    client = app.test_client()
+    login(client, "angajat", "angajat123")
+
+    baseline = peak = rss_mb()
+    start = time.perf_counter()
+    resp = client.get(f"/dashboard/process-orders/export.{args.format}", buffered=False)
+    size = chunks = 0
+    for chunk in resp.response:
+        size += len(chunk)
+        chunks += 1
+        peak = max(peak, rss_mb())
+    resp.close()
+    elapsed = time.perf_counter() - start
+    log(
+        f"Streaming {args.format}: {size / 1024 / 1024:.1f} MB in {chunks} chunks, {elapsed:.1f}s, "
+        f"RSS {baseline:.0f} -> peak {peak:.0f} MB (+{peak - baseline:.0f} MB)"
+    )
+
+    if args.compare_all:
+        # Varianta naiva: .all() + CSV construit in memorie
+        import csv
+        import io
+
+        with app.app_context():
+            start = time.perf_counter()
+            orders = Order.query.all()
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for order in orders:
+                writer.writerow([order.id, order.user_id, order.status, order.total_price, order.created_at])
+            peak_all = rss_mb()
+            elapsed = time.perf_counter() - start
+        log(f".all(): {elapsed:.1f}s, RSS peak {peak_all:.0f} MB (+{peak_all - baseline:.0f} MB)")
+
+
+def seed_order_lines(db, lines, products, per_order=3, chunk_size=50000):
+    """
+    `lines` linii de comanda, cate `per_order` produse distincte per comanda. Produsele sunt
+    grupate in "clustere" de cate 10, ca perechile cumparate impreuna sa nu fie uniforme.
+    """
+    import random
+    from decimal import Decimal
+
+    from sqlalchemy import insert
+    from models import Category, OrderItem, Product
+
+    category = Category.query.first()
+    product_ids = db.session.execute(
+        insert(Product).returning(Product.id),
+        [
+            {
+                "title": f"Bench {i}",
+                "artist": f"Artist {i % 200}",
+                "price": Decimal("19.99"),
+                "stock": 1000,
+                "category_id": category.id,
+            }
+            for i in range(products)
+        ],
+    ).scalars().all()
+    db.session.commit()
+
+    rng = random.Random(42)
+    order_ids = seed_orders(db, lines // per_order, chunk_size)
+    rows = []
+    for order_id in order_ids:
+        cluster = rng.randrange(0, len(product_ids), 10)
+        pool = product_ids[cluster:cluster + 10] if rng.random() < 0.8 else product_ids
+        for product_id in rng.sample(pool, min(per_order, len(pool))):
+            rows.append({"order_id": order_id, "product_id": product_id, "quantity": 1, "price": Decimal("19.99")})
+        if len(rows) >= chunk_size:
+            db.session.execute(insert(OrderItem), rows)
+            db.session.commit()
+            rows = []
+    if rows:
+        db.session.execute(insert(OrderItem), rows)
+        db.session.commit()
+    return len(order_ids) * per_order
+
+
+def bench_recommendations(args):
+    import threading
+
+    app = load_app(args.database_url)
+    from sqlalchemy import select, update
+    from models import db, Product, ProductCoPurchase
+    from recommendations import index_stats, rebuild, recommendation_index
+
+    with app.app_context():
+        start = time.perf_counter()
+        lines = seed_order_lines(db, args.lines, args.products)
+        log(f"Linii de comanda create: {lines} ({time.perf_counter() - start:.1f}s)")
+
+        rebuild(args.top)
+        # Al doilea rebuild, cu index existent, cu un "checkout" care incrementeaza o pereche la 20 ms
+        stop = threading.Event()
+        waits = []
+        product_id = db.session.execute(select(ProductCoPurchase.product_id).limit(1)).scalar()
+        engine = db.engine
+
+        def checkout_writes():
+            while not stop.is_set():
+                started = time.perf_counter()
+                with engine.begin() as connection:
+                    connection.execute(
+                        update(ProductCoPurchase)
+                        .where(ProductCoPurchase.product_id == product_id)
+                        .values(orders_count=ProductCoPurchase.orders_count + 1)
+                    )
+                waits.append(time.perf_counter() - started)
+                time.sleep(0.02)
+
+        writer = threading.Thread(target=checkout_writes)
+        writer.start()
+        start = time.perf_counter()
+        rebuild(args.top)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        writer.join()
+        pairs, products = index_stats()
+        log(f"Rebuild: {pairs} perechi pentru {products} produse in {elapsed:.1f}s")
+        log(f"Scrieri concurente in product_copurchases: {len(waits)}, cea mai lunga {max(waits) * 1000:.0f} ms")
+
+        sample = Product.query.filter(Product.title.like("Bench %")).limit(200).all()
+        start = time.perf_counter()
+        for product in sample:
+            recommendation_index.ids_for(product)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for product in sample:
+            recommendation_index.ids_for(product)
+        warm = time.perf_counter() - start
+        log(
+            f"Lookup {len(sample)} produse: rece {cold / len(sample) * 1000:.2f} ms/produs, "
+            f"din index {warm / len(sample) * 1e6:.1f} us/produs"
+        )
+
+
+def seed_catalog(db, products):
+    """Produse cu preturi si categorii variate (pentru filtrele / sortarile din catalog)."""
+    import random
+    from decimal import Decimal
+
+    from sqlalchemy import insert
+    from models import Category, Product
+
+    rng = random.Random(7)
+    category_ids = [category.id for category in Category.query.all()]
+    db.session.execute(
+        insert(Product),
+        [
+            {
+                "title": f"Bench {rng.randrange(products):06d}",
+                "artist": f"Artist {i % 500}",
+                "price": Decimal(rng.randrange(500, 60000)) / 100,
+                "stock": 10,
+                "category_id": category_ids[i % len(category_ids)],
+                "image_url": f"https://cdn.example.com/cover/{i}.jpg",
+            }
+            for i in range(products)
+        ],
+    )
+    db.session.commit()
+
+
+def bench_catalog(args):
+    import itertools
+
+    app = load_app(args.database_url)
+    from catalog_snapshot import catalog_snapshot
+    from models import db, Product
+
+    if not catalog_snapshot.enabled:
+        raise SystemExit("Snapshot-ul e dezactivat (lipseste NumPy sau CATALOG_SNAPSHOT_TTL=0).")
+    with app.app_context():
+        start = time.perf_counter()
+        seed_catalog(db, args.products)
+        log(f"Produse create: {args.products} ({time.perf_counter() - start:.1f}s)")
+
+    # Trafic anonim tipic: categorie x interval de pret x sortare x primele pagini
+    urls = [
+        f"/catalog?category={category}&sort={sort}{price}&page={page}"
+        for category, price, sort, page in itertools.product(
+            ["", "CD", "Vinyl", "Merch"],
+            ["", "&min_price=50&max_price=99.99", "&min_price=200"],
+            ["", "price_asc", "price_desc", "name_asc"],
+            [1, 2, 5],
+        )
+    ]
+
+    client = app.test_client()
+    for url in urls:
+        client.get(url)  # incalzeste cache-ul de fatete si snapshot-ul
+    with app.app_context():
+        start = time.perf_counter()
+        catalog_snapshot.invalidate()
+        catalog_snapshot.columns()
+        log(f"Snapshot: {args.products} produse incarcate in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        product = Product.query.order_by(Product.id).first()
+        start = time.perf_counter()
+        catalog_snapshot.invalidate([product.id])
+        catalog_snapshot.columns()
+        log(f"Snapshot: reincarcare incrementala (1 produs modificat) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for label, enabled in (("DB", False), ("snapshot", True)):
+        catalog_snapshot.enabled = enabled
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for url in urls:
+                resp = client.get(url)
+                if resp.status_code != 200:
+                    raise SystemExit(f"{url}: HTTP {resp.status_code}")
+        elapsed = time.perf_counter() - start
+        count = args.rounds * len(urls)
+        log(f"/catalog {label}: {count} request-uri, {count / elapsed:.0f} req/s, {elapsed / count * 1000:.2f} ms/request")
+    catalog_snapshot.enabled = True
+
+
+def _bus_worker(database_url, product_id, ready, seen):
+    """Proces separat (ca un worker gunicorn): tine pretul in product_cache si raporteaza schimbarile."""
+    os.environ["DATABASE_URL"] = database_url
+    # TTL mare: doar magistrala poate face cache-ul sa vada pretul nou
+    os.environ["CART_QUOTE_TTL"] = "3600"
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import cache_bus
+    from app import app
+    from product_cache import product_cache
+
+    with app.test_request_context():
+        cache_bus.start()
+        price = product_cache.get_many([product_id])[product_id]["price"]
+        ready.put(os.getpid())
+        while True:
+            current = product_cache.get_many([product_id])[product_id]["price"]
+            if current != price:
+                seen.put((os.getpid(), time.time(), str(current)))
+                price = current
+            time.sleep(0.001)
+
+
+def bench_cache_bus(args):
+    import multiprocessing
+    import random
+    import statistics
+    from decimal import Decimal
+
+    app = load_app(args.database_url)
+    import cache_bus
+    from models import db, Category, Product
+
+    database_url = os.environ["DATABASE_URL"]
+    with app.app_context():
+        product = Product(title="Bus", artist="Bench", price=Decimal("10.00"), stock=1, category_id=Category.query.first().id)
+        db.session.add(product)
+        db.session.commit()
+        product_id = product.id
+
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    seen = context.Queue()
+    workers = [
+        context.Process(target=_bus_worker, args=(database_url, product_id, ready, seen), daemon=True)
+        for _ in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        ready.get(timeout=60)
+    log(f"{args.workers} procese pornite, fiecare cu pretul produsului {product_id} in cache")
+
+    rng = random.Random(3)
+    delays = []
+    with app.app_context():
+        for round_number in range(1, args.rounds + 1):
+            price = Decimal("10.00") + round_number
+            Product.query.filter_by(id=product_id).update({"price": price})
+            db.session.commit()
+            started = time.time()
+            cache_bus.invalidate(("products", [product_id]))
+            round_delays = []
+            for _ in workers:
+                pid, when, value = seen.get(timeout=30)
+                if Decimal(value) != price:
+                    raise SystemExit(f"Procesul {pid} a vazut {value}, asteptat {price}")
+                round_delays.append(when - started)
+            delays.extend(round_delays)
+            # Pauza aleatoare, ca modificarile sa nu cada mereu in acelasi punct al ciclului de polling
+            time.sleep(rng.uniform(0.05, 0.6))
+    for worker in workers:
+        worker.terminate()
+
+    delays.sort()
+    log(
+        f"Convergenta ({len(delays)} observatii, {args.rounds} runde x {args.workers} procese): "
+        f"mediana {statistics.median(delays) * 1000:.1f} ms, p95 {delays[int(len(delays) * 0.95) - 1] * 1000:.1f} ms, "
+        f"max {delays[-1] * 1000:.1f} ms (fara magistrala: pana la CART_QUOTE_TTL)"
+    )
+
+
+def bench_partitions(args):
+    from sqlalchemy import text
+
+    app = load_app(args.database_url)
+    from models import db, User
+    from order_partitions import list_partitions, partition_tables
+
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            raise SystemExit("Partitionarea cere Postgres: ruleaza cu --database-url postgresql://...")
+        client_id = User.query.filter_by(role="client").first().id
+        # Comenzi (cu cate un rand de istoric) distribuite uniform pe ultimele --months luni
+        db.session.execute(
+            text(
+                "INSERT INTO orders (user_id, status, total_price, shipping_address, created_at) "
+                "SELECT :user_id, 'paid', 49.99, 'Bench street 1', "
+                "timezone('utc', now()) - random() * :days * interval '1 day' FROM generate_series(1, :count)"
+            ),
+            {"user_id": client_id, "days": args.months * 30, "count": args.orders},
+        )
+        db.session.execute(
+            text(
+                "INSERT INTO order_status_history (order_id, status, created_at) "
+                "SELECT id, status, created_at FROM orders"
+            )
+        )
+        db.session.commit()
+        db.session.execute(text("ANALYZE orders"))
+        db.session.execute(text("ANALYZE order_status_history"))
+        db.session.commit()
+    log(f"Comenzi create: {args.orders} pe {args.months} luni")
+
+    client = app.test_client()
+    login(client, "admin", "admin123")
+    urls = ["/api/dashboard/stats", "/api/dashboard/orders-by-date?days=30"]
+
+    def measure(label):
+        for url in urls:
+            client.get(url)
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                resp = client.get(url)
+                if resp.status_code != 200:
+                    raise SystemExit(f"{url}: HTTP {resp.status_code}")
+            log(f"{label} {url}: {(time.perf_counter() - start) / args.rounds * 1000:.1f} ms/request")
+
+    measure("Tabela simpla")
+    with app.app_context():
+        with db.engine.connect() as connection:
+            start = time.perf_counter()
+            with connection.begin():
+                copied = partition_tables(connection)
+            partitions = len(list_partitions(connection, "orders"))
+    log(f"Conversie: {copied} in {time.perf_counter() - start:.1f}s, {partitions} partitii / tabela")
+    measure("Partitionat")
+
+
+def _buyer(app, username, product_id, rounds, barrier, results):
+    client = app.test_client()
+    login(client, username, "bench123")
+    payload = {
+        "cart": [{"id": product_id, "quantity": 1}],
+        "shippingaddress": "Bench street 1",
+        "shippingname": "Bench",
+        "shippingphone": "0700000000",
+    }
+    barrier.wait()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        status = client.post("/api/checkout", json=payload).status_code
+        results.append((status, time.perf_counter() - start))
+
+
+def bench_stock_contention(args):
+    import statistics
+    import threading
+    from decimal import Decimal
+
+    # O conexiune per cumparator: asteptarea masurata e pe randul de stoc, nu pe pool
+    os.environ.setdefault("DB_POOL_SIZE", str(args.buyers + 5))
+    app = load_app(args.database_url)
+    import stock_shards
+    from models import db, Category, Product, User
+
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            raise SystemExit("Contentia pe randuri cere Postgres: ruleaza cu --database-url postgresql://...")
+        usernames = [f"buyer{index}" for index in range(args.buyers)]
+        existing = {name for (name,) in db.session.query(User.username).filter(User.username.in_(usernames))}
+        for name in usernames:
+            if name not in existing:
+                user = User(username=name, email=f"{name}@bench.local", role="client")
+                user.set_password("bench123")
+                db.session.add(user)
+        product = Product(
+            title="Hot release", artist="Bench", price=Decimal("99.00"), stock=args.buyers * args.rounds * 2,
+            category_id=Category.query.first().id,
+        )
+        db.session.add(product)
+        db.session.commit()
+        product_id = product.id
+
+    def sample_lock_waits(stop, samples):
+        # Cate conexiuni asteapta dupa un lock (rand de stoc / products), esantionat la 5 ms
+        from sqlalchemy import text
+
+        with app.app_context(), db.engine.connect() as connection:
+            query = text(
+                "SELECT count(*) FROM pg_stat_activity "
+                "WHERE wait_event_type = 'Lock' AND datname = current_database()"
+            )
+            while not stop.is_set():
+                samples.append(connection.execute(query).scalar())
+                connection.commit()
+                time.sleep(0.005)
+
+    def run(label, rounds):
+        barrier = threading.Barrier(args.buyers + 1)
+        results = []
+        stop = threading.Event()
+        samples = []
+        sampler = threading.Thread(target=sample_lock_waits, args=(stop, samples))
+        threads = [
+            threading.Thread(target=_buyer, args=(app, name, product_id, rounds, barrier, results))
+            for name in usernames
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        sampler.start()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        sampler.join()
+        ok = sorted(latency for status, latency in results if status == 201)
+        if ok:
+            log(
+                f"{label}: {len(ok)}/{len(results)} comenzi in {elapsed:.2f}s ({len(ok) / elapsed:.0f} comenzi/s), "
+                f"latenta mediana {statistics.median(ok) * 1000:.0f} ms, p95 {ok[int(len(ok) * 0.95) - 1] * 1000:.0f} ms, "
+                f"conexiuni blocate pe lock: medie {statistics.mean(samples or [0]):.1f}, max {max(samples or [0])}"
+            )
+        return len(ok)
+
+    def stock():
+        with app.app_context():
+            return db.session.get(Product, product_id).stock_total
+
+    before = stock()
+    sold = run(f"Stoc normal ({args.buyers} cumparatori x {args.rounds})", args.rounds)
+    if stock() != before - sold:
+        raise SystemExit(f"Stoc gresit: {stock()} != {before} - {sold}")
+
+    with app.app_context():
+        stock_shards.enable(db.session.get(Product, product_id), args.shards)
+        db.session.commit()
+    before = stock()
+    sold = run(f"Stoc distribuit ({args.shards} randuri)", args.rounds)
+    if stock() != before - sold:
+        raise SystemExit(f"Stoc gresit: {stock()} != {before} - {sold}")
+
+    # Fara vanzare peste stoc: mai putine bucati decat cumparatori, fiecare incearca o data
+    with app.app_context():
+        stock_shards.set_total(db.session.get(Product, product_id), args.buyers // 2)
+        db.session.commit()
+    sold = run(f"Ultimele {args.buyers // 2} bucati", 1)
+    log(f"Vandute {sold} din {args.buyers // 2}, stoc ramas {stock()}")
+    if sold != args.buyers // 2 or stock() != 0:
+        raise SystemExit("Stocul distribuit a vandut gresit ultimele bucati")
+
+
+def bench_rate_limit(args):
+    import statistics
+    import threading
+
+    app = load_app(args.database_url)
+    import rate_limit
+    from models import db
+
+    limiter = rate_limit.rate_limiter
+    endpoint = "qobuz.qobuz_previews"
+    # Fara ids endpoint-ul raspunde imediat 400: se masoara doar costul limitatorului
+    url = "/api/qobuz/previews"
+    client = app.test_client()
+
+    def measure(label, enabled, store=None):
+        limiter.enabled = enabled
+        limiter.store = store or limiter.fallback
+        limiter.rules = {endpoint: rate_limit.Rule(10 ** 9, 60)}
+        latencies = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            client.get(url)
+            latencies.append(time.perf_counter() - start)
+        log(f"{label}: {statistics.mean(latencies) * 1000:.3f} ms/cerere (mediana {statistics.median(latencies) * 1000:.3f} ms)")
+        return statistics.mean(latencies)
+
+    base = measure("Fara limitator", False)
+    memory = measure("Bucket-uri in memorie", True)
+    log(f"Cost limitator in memorie: {(memory - base) * 1000:+.3f} ms/cerere")
+    with app.app_context():
+        if db.engine.dialect.name == "postgresql":
+            shared = measure("Bucket-uri in Postgres (UNLOGGED)", True, rate_limit.PostgresStore(db.engine))
+            log(f"Cost limitator Postgres: {(shared - base) * 1000:+.3f} ms/cerere")
+
+    # Rafala din acelasi IP pe regula implicita: peste limita se raspunde 429 fara sa se atinga endpoint-ul
+    limiter.store = limiter.fallback
+    limiter.fallback._buckets.clear()
+    limiter.rules = {endpoint: rate_limit.DEFAULT_RULES[endpoint]}
+    limiter.reset()
+    results = []
+
+    def flood():
+        local = app.test_client()
+        for _ in range(args.requests // args.clients):
+            start = time.perf_counter()
+            status = local.get(url).status_code
+            results.append((status, time.perf_counter() - start))
+
+    threads = [threading.Thread(target=flood) for _ in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    rejected = [latency for status, latency in results if status == 429]
+    log(
+        f"Rafala {args.clients} clienti x {args.requests // args.clients} ({limiter.rules[endpoint].describe()}): "
+        f"{len(results) - len(rejected)} permise, {len(rejected)} respinse cu 429 in {elapsed:.2f}s, "
+        f"429 in {statistics.mean(rejected or [0]) * 1000:.3f} ms/cerere"
+    )
+
+
+def bench_compression(args):
+    import statistics
+
+    app = load_app(args.database_url)
+    import compression
+    from models import db
+
+    with app.app_context():
+        seed_catalog(db, args.products)
+    log(f"Produse create: {args.products}; Brotli {'instalat' if compression.brotli else 'lipsa (doar gzip)'}")
+
+    urls = ["/catalog", "/catalog?category=Vinyl&sort=price_asc&page=2", "/static/styles/main.css", "/static/scripts/main.js"]
+    def fresh_variant(url):
+        path = os.path.join(ROOT, "static", url[len("/static/"):])
+        return os.path.exists(path + ".gz") and os.path.getmtime(path + ".gz") >= os.path.getmtime(path)
+
+    precompressed = [url for url in urls if url.startswith("/static/") and fresh_variant(url)]
+    if precompressed:
+        log(f"Variante precomprimate: {', '.join(precompressed)} (restul comprimate la cerere)")
+    encodings = ["identity", "gzip"] + (["br"] if compression.brotli else [])
+    client = app.test_client()
+    for url in urls:
+        client.get(url)  # incalzeste snapshot-ul, fatetele si cache-ul de template-uri
+
+    for url in urls:
+        line = []
+        for encoding in encodings:
+            latencies = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                resp = client.get(url, headers={"Accept-Encoding": encoding})
+                size = len(resp.get_data())
+                latencies.append(time.perf_counter() - start)
+                if resp.status_code != 200:
+                    raise SystemExit(f"{url}: HTTP {resp.status_code}")
+            server = statistics.median(latencies) * 1000
+            # Timpul de transfer la --mbps, ca estimare a latentei vazute de client
+            wire = size * 8 / (args.mbps * 1000)
+            line.append(f"{encoding} {size} B, {server:.2f} ms server + {wire:.1f} ms transfer")
+        log(f"{url}: " + " | ".join(line))
+
+
+COMMANDS = {
+    "bulk-status": bench_bulk_status,
+    "export": bench_export,
+    "recommendations": bench_recommendations,
+    "catalog": bench_catalog,
+    "cache-bus": bench_cache_bus,
+    "partitions": bench_partitions,
+    "stock-contention": bench_stock_contention,
+    "rate-limit": bench_rate_limit,
+    "compression": bench_compression,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark-uri pentru Garden of Records.")
+    parser.add_argument(
+        "--database-url",
+        help="DB folosita pentru benchmark (default: SQLite temporar).",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bulk = sub.add_parser("bulk-status", help="Update status: per-id vs batch.")
+    bulk.add_argument("--orders", type=int, default=500, help="Numar de comenzi.")
+
+    export = sub.add_parser("export", help="Export streaming comenzi (CSV/JSONL) cu peak RSS.")
+    export.add_argument("--orders", type=int, default=1000000, help="Numar de comenzi.")
+    export.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    export.add_argument(
+        "--compare-all",
+        action="store_true",
+        help="Masoara si varianta .all() (incarca toate comenzile in memorie).",
+    )
+
+    recs = sub.add_parser("recommendations", help="Rebuild index 'cumparate impreuna' + lookup.")
+    recs.add_argument("--lines", type=int, default=1000000, help="Numar de linii de comanda.")
+    recs.add_argument("--products", type=int, default=5000, help="Numar de produse.")
+    recs.add_argument("--top", type=int, default=20, help="Perechi pastrate per produs.")
+
+    catalog = sub.add_parser("catalog", help="/catalog: filtrare pe DB vs snapshot NumPy in memorie.")
+    catalog.add_argument("--products", type=int, default=20000, help="Numar de produse.")
+    catalog.add_argument("--rounds", type=int, default=3, help="De cate ori se repeta setul de URL-uri.")
+
+    bus = sub.add_parser("cache-bus", help="Convergenta invalidarii cache-urilor intre procese.")
+    bus.add_argument("--workers", type=int, default=4, help="Numar de procese care tin cache-ul.")
+    bus.add_argument("--rounds", type=int, default=20, help="Numar de modificari de pret.")
+
+    parts = sub.add_parser("partitions", help="Rapoarte pe orders: tabela simpla vs partitii lunare (Postgres).")
+    parts.add_argument("--orders", type=int, default=2000000, help="Numar de comenzi.")
+    parts.add_argument("--months", type=int, default=36, help="Pe cate luni in urma sunt distribuite.")
+    parts.add_argument("--rounds", type=int, default=20, help="Request-uri masurate per endpoint.")
+
+    contention = sub.add_parser("stock-contention", help="Cumparatori simultani ai aceluiasi produs: stoc normal vs distribuit (Postgres).")
+    contention.add_argument("--buyers", type=int, default=50, help="Cumparatori simultani.")
+    contention.add_argument("--rounds", type=int, default=10, help="Comenzi per cumparator.")
+    contention.add_argument("--shards", type=int, default=8, help="Randuri de stoc in modul distribuit.")
+
+    limits = sub.add_parser("rate-limit", help="Costul limitatorului de cereri (memorie / Postgres) si o rafala din acelasi IP.")
+    limits.add_argument("--requests", type=int, default=2000, help="Cereri masurate per varianta.")
+    limits.add_argument("--clients", type=int, default=8, help="Clienti simultani in rafala.")
+
+    compress = sub.add_parser("compression", help="Octeti transferati si latenta pe /catalog si static: fara compresie / gzip / brotli.")
+    compress.add_argument("--products", type=int, default=2000, help="Numar de produse.")
+    compress.add_argument("--rounds", type=int, default=50, help="Request-uri masurate per URL si codare.")
+    compress.add_argument("--mbps", type=float, default=10, help="Latimea de banda pentru estimarea transferului (Mbit/s).")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
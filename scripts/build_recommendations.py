@@ -0,0 +1,46 @@
+"""
+Reconstruieste indexul de recomandari (product_copurchases) din order_items.
+
+    python scripts/build_recommendations.py
+    python scripts/build_recommendations.py --top 30
+
+Ruleaza periodic (ex: noaptea); intre rebuild-uri checkout-ul incrementeaza perechile
+pentru produsele din fiecare comanda noua. Clasamentul se calculeaza dintr-un singur SELECT,
+apoi perechile se inlocuiesc pe loturi de produse, fiecare cu commit propriu (checkout-ul
+nu asteapta dupa tot rebuild-ul).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cache_bus
+from app import app, db
+from recommendations import STORED_PER_PRODUCT, index_stats, rebuild
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Reconstruieste indexul 'cumparate impreuna'.")
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=STORED_PER_PRODUCT,
+        help=f"Perechi pastrate per produs (default {STORED_PER_PRODUCT}).",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with app.app_context():
+        started = time.perf_counter()
+        rebuild(args.top)
+        cache_bus.invalidate("recommendations")
+        pairs, products = index_stats()
+    print(f"[recommendations] {pairs} perechi pentru {products} produse in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
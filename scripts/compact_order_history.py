@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import app, db
+from order_workflow import compact_status_history
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compacteaza order_status_history (pastreaza ultimul status per comanda)."
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=90,
+        help="Compacteaza doar randurile mai vechi de N zile (default 90).",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Sterge randurile fara sa le copieze in order_status_history_archive.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with app.app_context():
+        try:
+            removed = compact_status_history(args.days, archive=not args.no_archive)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    target = "sterse" if args.no_archive else "arhivate"
+    print(f"[compact] Randuri {target}: {removed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Helpers comune pentru backup_db.py / restore_db.py:
+conexiune (docker compose sau direct), snapshot + row counts, manifest + checksum, retentie.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+BACKUP_NAME_RE = re.compile(r"^garden_records_(\d{8}-\d{6})")
+CHUNK_SIZE = 1024 * 1024
+
+TABLES_SQL = (
+    "SELECT table_name FROM information_schema.tables "
+    "WHERE table_schema = '{schema}' AND table_type = 'BASE TABLE' ORDER BY table_name;"
+)
+
+
+def use_docker():
+    return bool(shutil.which("docker") or shutil.which("docker.exe"))
+
+
+def resolve_connection(args, docker):
+    """Completeaza args din DATABASE_URL (doar in modul direct) si intoarce env-ul pentru subprocess."""
+    env = os.environ.copy()
+    if docker:
+        return env
+    db_url = env.get("DATABASE_URL")
+    if db_url:
+        parsed = urlparse(db_url)
+        if parsed.scheme.startswith("postgres"):
+            if args.db == "garden_records" and parsed.path:
+                args.db = parsed.path.lstrip("/")
+            if args.user == "postgres" and parsed.username:
+                args.user = parsed.username
+            if args.host == "db" and parsed.hostname:
+                args.host = parsed.hostname
+            if args.port == "5432" and parsed.port:
+                args.port = str(parsed.port)
+            if parsed.password:
+                env["PGPASSWORD"] = parsed.password
+    return env
+
+
+def pg_command(tool, args, docker, db=None):
+    """Comanda de baza pentru un tool Postgres (pg_dump/pg_restore/psql)."""
+    db = db or args.db
+    if docker:
+        return ["docker", "compose", "exec", "-T", "db", tool, "-U", args.user, "-d", db]
+    return [tool, "-h", args.host, "-p", str(args.port), "-U", args.user, "-d", db]
+
+
+class PsqlSession:
+    """Un proces psql tinut deschis; interogarile se trimit pe stdin, rezultatele vin cu -At."""
+
+    SENTINEL = "__done__"
+
+    def __init__(self, args, env, docker, db=None):
+        cmd = pg_command("psql", args, docker, db=db) + ["-At", "-q", "-v", "ON_ERROR_STOP=1"]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env)
+
+    def query(self, sql):
+        self.proc.stdin.write(f"{sql}\nSELECT '{self.SENTINEL}';\n")
+        self.proc.stdin.flush()
+        lines = []
+        for line in self.proc.stdout:
+            line = line.rstrip("\n")
+            if line == self.SENTINEL:
+                return lines
+            lines.append(line)
+        raise SystemExit("psql session closed unexpectedly.")
+
+    def row_counts(self, schema="public"):
+        """count(*) exact pentru fiecare tabel din schema, intr-o singura interogare."""
+        tables = self.query(TABLES_SQL.format(schema=schema))
+        if not tables:
+            return {}
+        sql = " UNION ALL ".join(
+            f"SELECT '{name}', count(*) FROM \"{schema}\".\"{name}\"" for name in tables
+        )
+        counts = {}
+        for line in self.query(sql + ";"):
+            name, _, value = line.partition("|")
+            counts[name] = int(value)
+        return counts
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotSession(PsqlSession):
+    """
+    Tine deschisa o tranzactie REPEATABLE READ si exporta snapshot-ul, ca pg_dump --snapshot
+    si numaratoarea de randuri sa vada exact aceleasi date.
+    """
+
+    def __init__(self, args, env, docker, db=None):
+        super().__init__(args, env, docker, db=db)
+        self.query("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY;")
+        self.snapshot = self.query("SELECT pg_export_snapshot();")[0]
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.write("COMMIT;\n")
+        super().close()
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backup_files(path):
+    """Fisierele dintr-un backup (un singur fisier sau un director -F d), relative la parinte."""
+    if os.path.isdir(path):
+        base = os.path.dirname(os.path.abspath(path))
+        files = []
+        for root, _, names in os.walk(path):
+            for name in sorted(names):
+                files.append(os.path.relpath(os.path.join(root, name), base))
+        return sorted(files)
+    return [os.path.basename(path)]
+
+
+def manifest_path(path):
+    return os.path.abspath(path).rstrip(os.sep) + ".manifest.json"
+
+
+def checksum_path(path):
+    return os.path.abspath(path).rstrip(os.sep) + ".sha256"
+
+
+def write_manifest(path, metadata):
+    """Scrie <backup>.manifest.json si <backup>.sha256 (format compatibil sha256sum)."""
+    base = os.path.dirname(os.path.abspath(path))
+    files = []
+    for rel in backup_files(path):
+        full = os.path.join(base, rel)
+        files.append({"path": rel.replace(os.sep, "/"), "bytes": os.path.getsize(full), "sha256": sha256_file(full)})
+
+    manifest = dict(metadata)
+    manifest["files"] = files
+    manifest["total_bytes"] = sum(f["bytes"] for f in files)
+    with open(manifest_path(path), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    with open(checksum_path(path), "w", encoding="utf-8") as handle:
+        for f in files:
+            handle.write(f"{f['sha256']}  {f['path']}\n")
+    return manifest
+
+
+def load_manifest(path):
+    mpath = manifest_path(path)
+    if not os.path.exists(mpath):
+        return None
+    with open(mpath, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def verify_manifest(path, manifest):
+    """Intoarce lista de fisiere lipsa sau cu checksum gresit."""
+    base = os.path.dirname(os.path.abspath(path))
+    bad = []
+    for f in manifest.get("files", []):
+        full = os.path.join(base, f["path"])
+        if not os.path.exists(full) or sha256_file(full) != f["sha256"]:
+            bad.append(f["path"])
+    return bad
+
+
+def prune_backups(backups_dir, keep=0, max_age_days=0):
+    """
+    Retentie: pastreaza ultimele `keep` backup-uri si/sau pe cele mai noi de `max_age_days`.
+    Un backup = toate intrarile cu acelasi prefix garden_records_<stamp> (date + manifest + sha256).
+    """
+    if not keep and not max_age_days:
+        return []
+    groups = {}
+    for name in os.listdir(backups_dir):
+        match = BACKUP_NAME_RE.match(name)
+        if match:
+            groups.setdefault(match.group(1), []).append(name)
+
+    stamps = sorted(groups, reverse=True)
+    cutoff = datetime.now() - timedelta(days=max_age_days) if max_age_days else None
+    removed = []
+    for index, stamp in enumerate(stamps):
+        too_many = keep and index >= keep
+        too_old = cutoff and datetime.strptime(stamp, "%Y%m%d-%H%M%S") < cutoff
+        if not (too_many or too_old):
+            continue
+        for name in groups[stamp]:
+            full = os.path.join(backups_dir, name)
+            if os.path.isdir(full):
+                shutil.rmtree(full)
+            else:
+                os.remove(full)
+            removed.append(name)
+    return removed
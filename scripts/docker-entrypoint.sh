@@ -0,0 +1,6 @@
+#!/bin/sh
+# Variantele .gz / .br ale fisierelor statice se (re)genereaza la pornire: bind mount-ul
+# din docker-compose (.:/app) ascunde fisierele generate la build. Cele la zi sunt sarite.
+set -e
+python scripts/precompress_static.py
+exec "$@"
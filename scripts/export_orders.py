@@ -0,0 +1,280 @@
+"""
+Export incremental pentru analytics: orders, order_items si order_status_history
+noi sau modificate de la ultimul export (watermark pe id), fara pg_dump complet.
+
+    python scripts/export_orders.py                  # parquet in exports/<stamp>/
+    python scripts/export_orders.py --format csv
+    python scripts/export_orders.py --full           # ignora watermark-ul
+
+O comanda e "modificata" daca are randuri noi in order_status_history (orice schimbare
+de status trece prin istoric). Randurile se citesc cu server-side cursor (yield_per)
+si se scriu pe bucati, deci memoria nu depinde de numarul de randuri.
+
+Id-urile vin din secvente inainte de commit: o tranzactie inca deschisa poate tine id-ul
+100 cand exportul vede deja 101, iar watermark-ul ar sari peste 100 pentru totdeauna.
+De aceea id-urile lipsa din ultimele --gap-window pozitii sub watermark se tin minte in
+state ("gaps") si se recitesc la exporturile urmatoare, pana apar sau expira (GAP_TTL;
+golurile lasate de rollback nu se umplu niciodata). Un rand ramas necomis mai mult de
+GAP_TTL, sau cu id mai mic decat watermark - gap-window, tot s-ar pierde.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func, or_, select
+
+from app import app, db
+from models import Order, OrderItem, OrderStatusHistory
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_OUTPUT = os.path.join(ROOT, "exports")
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+TABLES = (Order, OrderItem, OrderStatusHistory)
+GAP_TTL = timedelta(hours=24)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export incremental orders / order_items / istoric status.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Director pentru exporturi (default exports/)")
+    parser.add_argument(
+        "--state",
+        help="Fisierul cu watermark-ul (default <output>/orders_watermark.json)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["parquet", "arrow", "csv"],
+        default="parquet",
+        help="parquet / arrow (Arrow IPC) necesita pyarrow; fara pyarrow se foloseste csv",
+    )
+    parser.add_argument("--batch-size", type=int, default=10000, help="Randuri per fetch / batch scris")
+    parser.add_argument("--full", action="store_true", help="Exporta tot, ignorand watermark-ul")
+    parser.add_argument(
+        "--gap-window",
+        type=int,
+        default=10000,
+        help="Cate id-uri sub watermark se verifica pentru goluri (tranzactii necomise la export)",
+    )
+    return parser.parse_args()
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_state(path, state):
+    """Scriere atomica: watermark-ul se muta doar dupa ce toate fisierele sunt complete."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(state, handle, indent=2)
+    os.replace(tmp_path, path)
+
+
+def arrow_schema(pa, model):
+    """Schema Arrow din coloanele modelului (explicita, ca primul batch cu NULL-uri sa nu schimbe tipurile)."""
+    fields = []
+    for column in model.__table__.columns:
+        python_type = column.type.python_type
+        if python_type is int:
+            arrow_type = pa.int64()
+        elif python_type is float:
+            arrow_type = pa.float64()
+        elif python_type is Decimal:
+            arrow_type = pa.decimal128(column.type.precision, column.type.scale)
+        elif python_type is datetime:
+            arrow_type = pa.timestamp("us")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+class CsvWriter:
+    def __init__(self, path, model):
+        self.handle = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.handle)
+        self.writer.writerow([column.name for column in model.__table__.columns])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.handle.close()
+
+
+class ArrowWriter:
+    """Parquet sau Arrow IPC, cate un record batch per partitie citita din cursor."""
+
+    def __init__(self, path, model, fmt):
+        import pyarrow as pa
+
+        self.pa = pa
+        self.schema = arrow_schema(pa, model)
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        arrays = [
+            self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)
+        ]
+        self.writer.write(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def resolve_format(fmt):
+    if fmt == "csv":
+        return fmt
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print(f"[export] pyarrow nu e instalat, {fmt} -> csv")
+        return "csv"
+    return fmt
+
+
+def export_query(conn, stmt, path, model, fmt, batch_size, tracked=None):
+    """
+    Streaming din cursor in fisier. Intoarce (randuri scrise, id-urile vazute pentru care
+    tracked(id) e adevarat); coloana id e prima in toate tabelele exportate.
+    """
+    writer = CsvWriter(path, model) if fmt == "csv" else ArrowWriter(path, model, fmt)
+    count = 0
+    seen = set()
+    try:
+        result = conn.execute(stmt.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            writer.write(partition)
+            count += len(partition)
+            if tracked is not None:
+                seen.update(row[0] for row in partition if tracked(row[0]))
+    finally:
+        writer.close()
+    return count, seen
+
+
+def pending_gaps(state, name):
+    """{id: prima data cand lipsea} pentru golurile inca neexportate ale tabelei."""
+    return {int(gap_id): first_seen for gap_id, first_seen in state.get("gaps", {}).get(name, [])}
+
+
+def next_gaps(old_gaps, seen, low, high, window, now):
+    """
+    Golurile de urmarit la exportul urmator: cele vechi inca lipsa (neexpirate) si id-urile
+    lipsa din (max(low, high - window), high].
+    """
+    gaps = {
+        gap_id: first_seen
+        for gap_id, first_seen in old_gaps.items()
+        if gap_id not in seen and now - datetime.fromisoformat(first_seen) < GAP_TTL
+    }
+    stamp = now.isoformat(timespec="seconds")
+    for gap_id in range(max(low, high - window) + 1, high + 1):
+        if gap_id not in seen:
+            gaps.setdefault(gap_id, stamp)
+    return sorted([gap_id, first_seen] for gap_id, first_seen in gaps.items())
+
+
+def _pending(column, low, high, gaps):
+    # Randuri noi (low, high], plus golurile ramase de la exporturile trecute
+    new_rows = (column > low) & (column <= high)
+    return or_(new_rows, column.in_(sorted(gaps))) if gaps else new_rows
+
+
+def build_queries(state, high):
+    """SELECT-urile pentru intervalul (watermark, high] si golurile din state; high = max(id) acum."""
+    low_orders = state.get("orders", 0)
+    low_items = state.get("order_items", 0)
+    low_history = state.get("order_status_history", 0)
+
+    new_history = _pending(
+        OrderStatusHistory.id, low_history, high["order_status_history"], pending_gaps(state, "order_status_history")
+    )
+    changed_orders = select(OrderStatusHistory.order_id).where(new_history)
+    orders = (
+        select(*Order.__table__.columns)
+        .where(
+            Order.id <= high["orders"],
+            or_(_pending(Order.id, low_orders, high["orders"], pending_gaps(state, "orders")),
+                Order.id.in_(changed_orders)),
+        )
+        .order_by(Order.id)
+    )
+    items = (
+        select(*OrderItem.__table__.columns)
+        .where(_pending(OrderItem.id, low_items, high["order_items"], pending_gaps(state, "order_items")))
+        .order_by(OrderItem.id)
+    )
+    history = select(*OrderStatusHistory.__table__.columns).where(new_history).order_by(OrderStatusHistory.id)
+    return {"orders": orders, "order_items": items, "order_status_history": history}
+
+
+def main():
+    args = parse_args()
+    fmt = resolve_format(args.format)
+    state_path = args.state or os.path.join(args.output, "orders_watermark.json")
+    state = {} if args.full else load_state(state_path)
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    run_dir = os.path.join(args.output, stamp)
+    os.makedirs(run_dir, exist_ok=True)
+
+    with app.app_context():
+        engine = db.engine
+        options = {}
+        if engine.dialect.name == "postgresql":
+            # Cele trei tabele citite din acelasi snapshot
+            options = {"isolation_level": "REPEATABLE READ"}
+        with engine.connect().execution_options(**options) as conn:
+            high = {
+                model.__tablename__: conn.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+                for model in TABLES
+            }
+            queries = build_queries(state, high)
+            models = {model.__tablename__: model for model in TABLES}
+
+            started = time.perf_counter()
+            now = datetime.now()
+            files = {}
+            gaps = {}
+            for name, stmt in queries.items():
+                path = os.path.join(run_dir, name + EXTENSIONS[fmt])
+                old_gaps = pending_gaps(state, name)
+                window_start = high[name] - args.gap_window
+
+                def tracked(row_id, old_gaps=old_gaps, window_start=window_start):
+                    # Doar id-urile care pot acoperi un gol: memoria ramane cat fereastra
+                    return row_id > window_start or row_id in old_gaps
+
+                count, seen = export_query(conn, stmt, path, models[name], fmt, args.batch_size, tracked)
+                gaps[name] = next_gaps(old_gaps, seen, state.get(name, 0), high[name], args.gap_window, now)
+                files[name] = {"path": os.path.relpath(path, args.output), "rows": count}
+                print(f"[export] {name}: {count} randuri -> {path} (goluri urmarite: {len(gaps[name])})")
+            conn.rollback()
+
+    new_state = dict(high)
+    new_state["gaps"] = gaps
+    new_state["exported_at"] = datetime.now().isoformat(timespec="seconds")
+    new_state["format"] = fmt
+    new_state["files"] = files
+    save_state(state_path, new_state)
+    print(f"[export] {time.perf_counter() - started:.1f}s, watermark: {high}")
+
+
+if __name__ == "__main__":
+    main()
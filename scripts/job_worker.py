@@ -0,0 +1,121 @@
+"""
+Workerul pentru joburile de fundal (vezi jobs.py) si comenzi de administrare a cozii.
+
+    python scripts/job_worker.py run --concurrency 4
+    python scripts/job_worker.py run --once
+    python scripts/job_worker.py enqueue recommendations.rebuild --payload '{"top": 30}'
+    python scripts/job_worker.py enqueue orders.compact_history --delay 3600
+    python scripts/job_worker.py enqueue products.refresh --payload '{"max_albums": 5}' --confirm
+    python scripts/job_worker.py list --status failed
+    python scripts/job_worker.py retry --all
+    python scripts/job_worker.py purge --days 7
+
+`run` ramane pornit (proces separat langa gunicorn, SIGTERM opreste dupa joburile in curs);
+JOBS_SCHEDULE="recommendations.rebuild=86400,stock.rebalance=60" adauga joburile periodice.
+`--once` ruleaza ce e scadent si iese (ex: din cron sau la deploy).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import app, db
+from models import Job
+import jobs
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Joburi de fundal (tabela jobs).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Ruleaza joburile din coada.")
+    run.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("JOBS_CONCURRENCY", "2")),
+        help="Joburi rulate in paralel (thread-uri; default JOBS_CONCURRENCY sau 2).",
+    )
+    run.add_argument("--kinds", default="", help="Doar aceste tipuri, separate prin virgula.")
+    run.add_argument("--poll", type=float, default=jobs.POLL_INTERVAL, help="Secunde intre verificari cand coada e goala.")
+    run.add_argument("--once", action="store_true", help="Iese cand nu mai sunt joburi scadente.")
+
+    enqueue = sub.add_parser("enqueue", help="Pune un job in coada.")
+    enqueue.add_argument("kind", choices=jobs.task_names())
+    enqueue.add_argument("--payload", default="{}", help="Argumentele jobului, JSON.")
+    enqueue.add_argument("--delay", type=float, default=0, help="Ruleaza peste N secunde.")
+    enqueue.add_argument("--confirm", action="store_true", help="Necesar pentru products.refresh.")
+
+    listing = sub.add_parser("list", help="Ultimele joburi.")
+    listing.add_argument("--status", choices=jobs.STATUSES)
+    listing.add_argument("--limit", type=int, default=20)
+
+    retry = sub.add_parser("retry", help="Repune in coada joburile failed.")
+    target = retry.add_mutually_exclusive_group(required=True)
+    target.add_argument("ids", nargs="*", type=int, default=[])
+    target.add_argument("--all", action="store_true", help="Toate joburile failed.")
+
+    purge = sub.add_parser("purge", help="Sterge joburile terminate mai vechi de N zile.")
+    purge.add_argument("--days", type=int, default=jobs.KEEP_DAYS, help=f"Default {jobs.KEEP_DAYS}.")
+    return parser.parse_args()
+
+
+def run(args):
+    logging.basicConfig(level=logging.INFO, format="[jobs] %(asctime)s %(threadName)s %(message)s")
+    schedule = jobs.parse_schedule(os.environ["JOBS_SCHEDULE"]) if "JOBS_SCHEDULE" in os.environ else None
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()]
+    worker = jobs.Worker(app, args.concurrency, kinds, args.poll, schedule)
+    print(
+        f"[jobs] Worker {worker.name}: {worker.concurrency} thread-uri, "
+        f"tipuri {', '.join(kinds) or 'toate'}, periodice {schedule or '-'}",
+        flush=True,
+    )
+    started = time.perf_counter()
+    processed, failed = worker.run(once=args.once)
+    print(f"[jobs] Oprit: {processed} joburi ({failed} cu eroare) in {time.perf_counter() - started:.1f}s")
+
+
+def show(args):
+    query = Job.query.order_by(Job.id.desc())
+    if args.status:
+        query = query.filter(Job.status == args.status)
+    for job in query.limit(args.limit):
+        when = job.finished_at or job.run_at
+        line = f"{job.id:>6} {job.kind:<26} {job.status:<8} {job.attempts}/{job.max_attempts} {when:%Y-%m-%d %H:%M:%S}"
+        if job.status == "failed" or (job.status == "queued" and job.last_error):
+            line += f"  {job.last_error}"
+        elif job.result:
+            line += f"  {job.result}"
+        print(line)
+
+
+def main():
+    args = parse_args()
+    with app.app_context():
+        if args.command == "run":
+            run(args)
+            return
+        if args.command == "list":
+            show(args)
+            return
+        try:
+            if args.command == "enqueue":
+                job = jobs.enqueue(args.kind, json.loads(args.payload), delay=args.delay, confirmed=args.confirm)
+                db.session.flush()
+                message = f"Job {job.id} ({job.kind}) pus in coada"
+            elif args.command == "retry":
+                message = f"Joburi repuse in coada: {jobs.retry(None if args.all else args.ids)}"
+            else:
+                message = f"Joburi sterse: {jobs.purge(args.days)}"
+            db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
+    print(f"[jobs] {message}")
+
+
+if __name__ == "__main__":
+    main()
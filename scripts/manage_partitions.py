@@ -0,0 +1,92 @@
+"""
+Intretinerea partitiilor lunare din orders / order_status_history (Postgres).
+
+    python scripts/manage_partitions.py list
+    python scripts/manage_partitions.py ensure --months-ahead 6
+    python scripts/manage_partitions.py detach --before 2024-01 --dry-run
+
+`ensure` creeaza partitiile lunilor urmatoare (aplicatia o face si singura, la cateva ore;
+din cron e plasa de siguranta). `detach` scoate lunile vechi din tabelele partitionate:
+partitiile raman tabele separate (ex: orders_p2023_12), de arhivat cu pg_dump si sters cu
+DROP TABLE. order_items nu e partitionata: liniile comenzilor scoase raman in tabela.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import app, db
+from order_partitions import (
+    MONTHS_AHEAD,
+    PARTITIONED_TABLES,
+    detach_partitions,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+)
+
+
+def parse_month(value):
+    try:
+        return datetime.strptime(value, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError("Luna trebuie sa fie de forma YYYY-MM.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Partitii lunare pentru orders si order_status_history.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="Partitiile atasate si numarul de randuri.")
+
+    ensure = sub.add_parser("ensure", help="Creeaza partitiile lipsa pentru lunile urmatoare.")
+    ensure.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD, help=f"Default {MONTHS_AHEAD}.")
+
+    detach = sub.add_parser("detach", help="Scoate partitiile mai vechi decat o luna.")
+    detach.add_argument("--before", type=parse_month, required=True, help="Prima luna pastrata (YYYY-MM).")
+    detach.add_argument("--dry-run", action="store_true", help="Afiseaza partitiile, fara commit.")
+    return parser.parse_args()
+
+
+def show(connection):
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(connection, table):
+            print(f"[partitions] {table}: nepartitionata (vezi scripts/migrate_partitions.py)")
+            continue
+        for name, _ in list_partitions(connection, table):
+            rows = connection.exec_driver_sql(f"SELECT count(*) FROM {name}").scalar()
+            print(f"[partitions] {name}: {rows} randuri")
+
+
+def main():
+    args = parse_args()
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            print("[partitions] Partitionarea e disponibila doar pe Postgres.")
+            return
+        with db.engine.connect() as connection:
+            if args.command == "list":
+                show(connection)
+                return
+            transaction = connection.begin()
+            try:
+                if args.command == "ensure":
+                    names = ensure_partitions(connection, args.months_ahead)
+                    action = "create"
+                else:
+                    names = detach_partitions(connection, args.before)
+                    action = "scoase (dry-run)" if args.dry_run else "scoase"
+                if args.command == "detach" and args.dry_run:
+                    transaction.rollback()
+                else:
+                    transaction.commit()
+            except BaseException:
+                transaction.rollback()
+                raise
+    print(f"[partitions] Partitii {action}: {', '.join(names) if names else 'niciuna'}")
+
+
+if __name__ == "__main__":
+    main()
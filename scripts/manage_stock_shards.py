@@ -0,0 +1,94 @@
+"""
+Stoc distribuit pentru produsele foarte cerute (vezi stock_shards.py).
+
+    python scripts/manage_stock_shards.py enable --product 42 --shards 8
+    python scripts/manage_stock_shards.py disable --product 42
+    python scripts/manage_stock_shards.py rebalance
+    python scripts/manage_stock_shards.py rebalance --every 30
+
+`rebalance` reimparte egal stocul fiecarui produs marcat si scrie suma in products.stock
+(cate o tranzactie scurta per produs); cu --every ruleaza in bucla (proces separat langa
+gunicorn) in loc de cron.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import app, db
+from models import Product
+import cache_bus
+import stock_shards
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stoc distribuit pe mai multe randuri (produse foarte cerute).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enable = sub.add_parser("enable", help="Imparte stocul produsului pe mai multe randuri.")
+    enable.add_argument("--product", type=int, required=True, help="Id produs.")
+    enable.add_argument(
+        "--shards",
+        type=int,
+        default=stock_shards.DEFAULT_SHARDS,
+        help=f"Numar de randuri (default {stock_shards.DEFAULT_SHARDS}).",
+    )
+
+    disable = sub.add_parser("disable", help="Aduna stocul inapoi in products.stock.")
+    disable.add_argument("--product", type=int, required=True, help="Id produs.")
+
+    rebalance = sub.add_parser("rebalance", help="Reimparte egal stocul produselor marcate.")
+    rebalance.add_argument("--every", type=float, default=0, help="Repeta la N secunde (0 = o singura data).")
+    return parser.parse_args()
+
+
+def toggle(args):
+    product = db.session.get(Product, args.product)
+    if product is None:
+        raise SystemExit(f"[stock-shards] Produsul {args.product} nu exista.")
+    try:
+        if args.command == "enable":
+            if args.shards < 1:
+                raise SystemExit("[stock-shards] --shards trebuie sa fie >= 1.")
+            stock_shards.enable(product, args.shards)
+        else:
+            stock_shards.disable(product)
+        db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        raise
+    cache_bus.invalidate(("products", [product.id]))
+    print(f"[stock-shards] Produsul {product.id}: {product.stock_shards} randuri, stoc {product.stock_total}")
+
+
+def rebalance_all():
+    totals = {}
+    for product_id in stock_shards.sharded_product_ids():
+        try:
+            totals[product_id] = stock_shards.rebalance(product_id)
+            db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
+    return totals
+
+
+def main():
+    args = parse_args()
+    with app.app_context():
+        if args.command in ("enable", "disable"):
+            toggle(args)
+            return
+        while True:
+            totals = rebalance_all()
+            summary = ", ".join(f"{pid}={total}" for pid, total in totals.items()) or "niciun produs marcat"
+            print(f"[stock-shards] Rebalansat: {summary}", flush=True)
+            if args.every <= 0:
+                break
+            time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Migrare categorii: products.category (text) -> products.category_id (FK indexat, NOT NULL).
+
+    python scripts/migrate_categories.py --dry-run
+    python scripts/migrate_categories.py
+    python scripts/migrate_categories.py --keep-column   # pastreaza coloana veche (nullable)
+
+Pasi: categoriile lipsa sunt create din valorile distincte, category_id se completeaza
+dupa nume (case-insensitive) intr-un singur UPDATE ... FROM, apoi se adauga indexul si
+NOT NULL si se sterge coloana text. Idempotent: fara coloana `category` sare direct la index.
+Pe Postgres totul ruleaza intr-o singura tranzactie; pe SQLite NOT NULL nu se poate adauga
+pe o coloana existenta (ramane verificat doar de aplicatie).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import inspect, text
+
+from app import app, db
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Normalizeaza products.category in products.category_id.")
+    parser.add_argument("--dry-run", action="store_true", help="Afiseaza ce s-ar schimba, fara commit.")
+    parser.add_argument(
+        "--keep-column",
+        action="store_true",
+        help="Nu sterge products.category, doar o face nullable (pentru rollback; doar Postgres).",
+    )
+    return parser.parse_args()
+
+
+def product_columns():
+    return {column["name"] for column in inspect(db.session.connection()).get_columns("products")}
+
+
+def create_missing_categories():
+    result = db.session.execute(
+        text(
+            "INSERT INTO categories (name) "
+            "SELECT DISTINCT trim(p.category) FROM products p "
+            "WHERE p.category IS NOT NULL AND trim(p.category) <> '' "
+            "AND NOT EXISTS (SELECT 1 FROM categories c WHERE lower(c.name) = lower(trim(p.category)))"
+        )
+    )
+    return result.rowcount or 0
+
+
+def backfill_category_ids():
+    result = db.session.execute(
+        text(
+            "UPDATE products SET category_id = c.id FROM categories c "
+            "WHERE lower(c.name) = lower(trim(products.category)) "
+            "AND products.category_id IS DISTINCT FROM c.id"
+        )
+    )
+    return result.rowcount or 0
+
+
+def finalize_schema(dialect, keep_column, has_text_column):
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_products_category_id ON products (category_id)"))
+    if dialect == "postgresql":
+        db.session.execute(text("ALTER TABLE products ALTER COLUMN category_id SET NOT NULL"))
+    if not has_text_column:
+        return
+    if keep_column:
+        if dialect == "postgresql":
+            db.session.execute(text("ALTER TABLE products ALTER COLUMN category DROP NOT NULL"))
+    else:
+        db.session.execute(text("ALTER TABLE products DROP COLUMN category"))
+
+
+def main():
+    args = parse_args()
+    created = updated = 0
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        if args.keep_column and dialect != "postgresql":
+            # Pe SQLite NOT NULL nu se poate scoate; coloana pastrata ar bloca INSERT-urile noi
+            raise SystemExit("[migrate-categories] --keep-column e suportat doar pe Postgres.")
+        try:
+            has_text_column = "category" in product_columns()
+            if has_text_column:
+                created = create_missing_categories()
+                updated = backfill_category_ids()
+            orphans = db.session.execute(text("SELECT count(*) FROM products WHERE category_id IS NULL")).scalar()
+            if orphans:
+                raise SystemExit(f"[migrate-categories] {orphans} produse fara categorie; migrarea a fost anulata.")
+            finalize_schema(dialect, args.keep_column, has_text_column)
+            if args.dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
+    prefix = "[migrate-categories] (dry-run)" if args.dry_run else "[migrate-categories]"
+    print(f"{prefix} Categorii create: {created}")
+    print(f"{prefix} Produse actualizate: {updated}")
+    if has_text_column:
+        action = "pastrata (nullable)" if args.keep_column else "stearsa"
+        print(f"{prefix} Coloana products.category: {action}")
+    else:
+        print(f"{prefix} Coloana products.category nu mai exista; doar index / NOT NULL.")
+
+
+if __name__ == "__main__":
+    main()
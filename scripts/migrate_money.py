@@ -0,0 +1,103 @@
+"""
+Migrare bani: products.price, order_items.price si orders.total_price din float in
+NUMERIC(10,2), plus backfill orders.total_price = SUM(price * quantity) din order_items.
+
+    python scripts/migrate_money.py --dry-run
+    python scripts/migrate_money.py
+
+Idempotent: coloanele deja NUMERIC sunt sarite, iar backfill-ul atinge doar comenzile
+al caror total difera. Pe Postgres totul ruleaza intr-o singura tranzactie
+(ALTER COLUMN TYPE rescrie tabela si o blocheaza pe durata migrarii).
+Pe SQLite tipul coloanei nu se poate schimba; valorile sunt doar rotunjite la 2 zecimale.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func, select, text, update
+
+from app import app, db
+from models import Order, OrderItem
+
+MONEY_COLUMNS = (
+    ("products", "price"),
+    ("order_items", "price"),
+    ("orders", "total_price"),
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Migreaza coloanele de bani la NUMERIC(10,2) + backfill totaluri.")
+    parser.add_argument("--dry-run", action="store_true", help="Afiseaza ce s-ar schimba, fara commit.")
+    parser.add_argument("--skip-backfill", action="store_true", help="Doar tipurile coloanelor, fara recalcularea totalurilor.")
+    return parser.parse_args()
+
+
+def column_type(table, column):
+    return db.session.execute(
+        text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"
+        ),
+        {"table": table, "column": column},
+    ).scalar()
+
+
+def migrate_columns():
+    """Intoarce lista de coloane convertite / rotunjite."""
+    changed = []
+    dialect = db.engine.dialect.name
+    for table, column in MONEY_COLUMNS:
+        if dialect == "postgresql":
+            if column_type(table, column) == "numeric":
+                continue
+            db.session.execute(
+                text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE NUMERIC(10, 2) "
+                    f"USING round({column}::numeric, 2)"
+                )
+            )
+        else:
+            db.session.execute(text(f"UPDATE {table} SET {column} = round({column}, 2) WHERE {column} IS NOT NULL"))
+        changed.append(f"{table}.{column}")
+    return changed
+
+
+def backfill_totals():
+    """orders.total_price = SUM(price * quantity), doar pentru comenzile cu linii si total diferit."""
+    totals = (
+        select(OrderItem.order_id, func.sum(OrderItem.price * OrderItem.quantity).label("total"))
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+    result = db.session.execute(
+        update(Order)
+        .values(total_price=totals.c.total)
+        .where(Order.id == totals.c.order_id, Order.total_price.is_distinct_from(totals.c.total))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+def main():
+    args = parse_args()
+    with app.app_context():
+        try:
+            changed = migrate_columns()
+            updated = 0 if args.skip_backfill else backfill_totals()
+            if args.dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    prefix = "[migrate-money] (dry-run)" if args.dry_run else "[migrate-money]"
+    print(f"{prefix} Coloane: {', '.join(changed) or 'deja NUMERIC'}")
+    print(f"{prefix} Totaluri recalculate: {updated}")
+
+
+if __name__ == "__main__":
+    main()
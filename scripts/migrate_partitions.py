@@ -0,0 +1,67 @@
+"""
+Migrare partitionare: orders si order_status_history devin tabele partitionate lunar
+(RANGE pe created_at), cu partitii de la prima comanda pana la luna curenta + N luni.
+
+    python scripts/migrate_partitions.py --dry-run
+    python scripts/migrate_partitions.py
+
+Doar Postgres. Datele se copiaza intr-o singura tranzactie, cu tabelele blocate (checkout-ul
+asteapta pana la commit), apoi tabelele vechi se sterg; created_at NULL se completeaza din
+date_ordered (comenzi) sau din comanda (istoric). Idempotent: tabelele deja partitionate
+sunt sarite. Detalii si intretinere: order_partitions.py, scripts/manage_partitions.py.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import app, db
+from order_partitions import MONTHS_AHEAD, list_partitions, partition_tables
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Partitioneaza lunar orders si order_status_history (Postgres).")
+    parser.add_argument("--dry-run", action="store_true", help="Ruleaza conversia si face rollback.")
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=MONTHS_AHEAD,
+        help=f"Partitii create in avans dupa luna curenta (default {MONTHS_AHEAD}).",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    prefix = "[migrate-partitions] (dry-run)" if args.dry_run else "[migrate-partitions]"
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            print(f"{prefix} Partitionarea e disponibila doar pe Postgres; nimic de facut.")
+            return
+        start = time.perf_counter()
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        try:
+            copied = partition_tables(connection, args.months_ahead)
+            partitions = {table: len(list_partitions(connection, table)) for table in copied}
+            if args.dry_run:
+                transaction.rollback()
+            else:
+                transaction.commit()
+        except BaseException:
+            transaction.rollback()
+            raise
+        finally:
+            connection.close()
+    if not copied:
+        print(f"{prefix} Tabelele sunt deja partitionate.")
+        return
+    for table, rows in copied.items():
+        print(f"{prefix} {table}: {rows} randuri in {partitions[table]} partitii.")
+    print(f"{prefix} Durata: {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Migrare soft-delete: adauga products.deleted_at (nullable) pe bazele de date existente.
+
+    python scripts/migrate_soft_delete.py --dry-run
+    python scripts/migrate_soft_delete.py
+
+Produsele care apar in comenzi nu se mai sterg fizic (stergerea din inventar le completeaza
+deleted_at), ca order_items sa pastreze legatura cu produsul. Idempotent: daca coloana
+exista deja nu face nimic. ADD COLUMN nullable fara default nu rescrie tabela.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import inspect, text
+
+from app import app, db
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Adauga products.deleted_at pentru soft-delete.")
+    parser.add_argument("--dry-run", action="store_true", help="Afiseaza ce s-ar schimba, fara commit.")
+    return parser.parse_args()
+
+
+def product_columns():
+    return {column["name"] for column in inspect(db.session.connection()).get_columns("products")}
+
+
+def main():
+    args = parse_args()
+    prefix = "[migrate-soft-delete] (dry-run)" if args.dry_run else "[migrate-soft-delete]"
+    with app.app_context():
+        try:
+            if "deleted_at" in product_columns():
+                print(f"{prefix} Coloana products.deleted_at exista deja.")
+                return
+            column_type = "TIMESTAMP" if db.engine.dialect.name == "postgresql" else "DATETIME"
+            db.session.execute(text(f"ALTER TABLE products ADD COLUMN deleted_at {column_type}"))
+            if args.dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
+    print(f"{prefix} Coloana products.deleted_at adaugata.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Migrare stoc distribuit: adauga products.stock_shards (INTEGER NOT NULL DEFAULT 0) pe bazele
+de date existente; tabela product_stock_shards o creeaza aplicatia la pornire (create_all).
+
+    python scripts/migrate_stock_shards.py --dry-run
+    python scripts/migrate_stock_shards.py
+
+Idempotent: daca coloana exista deja nu face nimic. Pe Postgres 11+ ADD COLUMN cu default
+constant nu rescrie tabela. Produsele se marcheaza apoi din editarea produsului (dashboard)
+sau cu scripts/manage_stock_shards.py.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import inspect, text
+
+from app import app, db
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Adauga products.stock_shards pentru stocul distribuit.")
+    parser.add_argument("--dry-run", action="store_true", help="Afiseaza ce s-ar schimba, fara commit.")
+    return parser.parse_args()
+
+
+def product_columns():
+    return {column["name"] for column in inspect(db.session.connection()).get_columns("products")}
+
+
+def main():
+    args = parse_args()
+    prefix = "[migrate-stock-shards] (dry-run)" if args.dry_run else "[migrate-stock-shards]"
+    with app.app_context():
+        try:
+            if "stock_shards" in product_columns():
+                print(f"{prefix} Coloana products.stock_shards exista deja.")
+                return
+            db.session.execute(text("ALTER TABLE products ADD COLUMN stock_shards INTEGER NOT NULL DEFAULT 0"))
+            if args.dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
+    print(f"{prefix} Coloana products.stock_shards adaugata.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Genereaza variantele precomprimate (.gz si, cu pachetul Brotli, .br) ale fisierelor statice text.
+
+    python scripts/precompress_static.py
+    python scripts/precompress_static.py --min-size 1024 --clean
+
+Aplicatia le serveste in locul fisierului original cand clientul accepta codarea (vezi
+compression.py), fara compresie la fiecare request. Se comprima cu nivelul maxim (gzip 9,
+brotli 11), o singura data; .br se scrie doar daca iese mai mic decat .gz. Variantele mai
+vechi decat originalul sunt ignorate la servire, deci scriptul trebuie rulat din nou dupa
+modificarea CSS/JS. In Docker ruleaza la pornirea containerului (scripts/docker-entrypoint.sh):
+bind mount-ul din docker-compose ascunde fisierele generate la build. Fisierele deja la zi
+sunt sarite (--force le regenereaza).
+"""
+import argparse
+import gzip
+import mimetypes
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from compression import STATIC_VARIANTS, brotli, compressible
+
+STATIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "static"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Variante .gz / .br pentru fisierele din static/.")
+    parser.add_argument("--min-size", type=int, default=500, help="Fisierele mai mici raman necomprimate.")
+    parser.add_argument("--clean", action="store_true", help="Doar sterge variantele existente.")
+    parser.add_argument("--force", action="store_true", help="Regenereaza si variantele deja la zi.")
+    return parser.parse_args()
+
+
+def static_files():
+    for folder, _, files in os.walk(STATIC_DIR):
+        for name in sorted(files):
+            if not name.endswith(tuple(STATIC_VARIANTS.values())):
+                yield os.path.join(folder, name)
+
+
+def write_variant(path, data):
+    # Scriere atomica: un worker nu vede niciodata un fisier pe jumatate scris
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp_path, path)
+
+
+def remove_variant(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def up_to_date(path):
+    # .gz e scris mereu; .br poate lipsi intentionat (nu era mai mic)
+    gz_path = path + STATIC_VARIANTS["gzip"]
+    return os.path.exists(gz_path) and os.path.getmtime(gz_path) >= os.path.getmtime(path)
+
+
+def main():
+    args = parse_args()
+    total_before = total_after = skipped = 0
+    for path in static_files():
+        if args.clean:
+            for suffix in STATIC_VARIANTS.values():
+                remove_variant(path + suffix)
+            continue
+        if not compressible(mimetypes.guess_type(path)[0]) or os.path.getsize(path) < args.min_size:
+            continue
+        if not args.force and up_to_date(path):
+            skipped += 1
+            continue
+        with open(path, "rb") as handle:
+            data = handle.read()
+        variants = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed = brotli.compress(data, quality=11)
+            if len(compressed) < len(variants["gzip"]):
+                variants["br"] = compressed
+        if "br" not in variants:
+            # Un .br vechi, mai mare, ar fi preferat de clientii cu brotli
+            remove_variant(path + STATIC_VARIANTS["br"])
+        for encoding, compressed in variants.items():
+            write_variant(path + STATIC_VARIANTS[encoding], compressed)
+        best = min(len(compressed) for compressed in variants.values())
+        total_before += len(data)
+        total_after += best
+        sizes = ", ".join(f"{encoding} {len(compressed)}" for encoding, compressed in variants.items())
+        print(f"[precompress] {os.path.relpath(path, STATIC_DIR)}: {len(data)} -> {sizes} octeti")
+    if args.clean:
+        print("[precompress] Variantele precomprimate au fost sterse.")
+    elif total_before:
+        print(f"[precompress] Total: {total_before} -> {total_after} octeti")
+    if skipped:
+        print(f"[precompress] {skipped} fisiere deja la zi")
+    if brotli is None and not args.clean:
+        print("[precompress] Pachetul Brotli lipseste: doar variante .gz.")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ import random
 import re
 import time
 from datetime import datetime
+from decimal import Decimal
 
 import requests
+from sqlalchemy import text
 
+import cache_bus
 from app import app, db
+from image_pipeline import prewarm
 from models import Category, Product, Order, OrderItem
 
 
@@ -163,7 +167,7 @@ def pick_price(category):
         cents = random.randint(3999, 9999)
     else:
         cents = random.randint(9999, 39999)
-    return cents / 100.0
+    return Decimal(cents).scaleb(-2)
 
 
 def generate_product_id(used_ids):
@@ -197,28 +201,53 @@ def build_description(album):
     return "\n".join(parts)
 
 
-def refresh_products(max_albums_per_artist, wipe_orders):
-    def log(message):
-        print(f"[refresh] {message}", flush=True)
+def product_keys(album_id, title, artist):
+    """Cheile dupa care un album importat se potriveste cu un produs existent."""
+    keys = []
+    if album_id:
+        keys.append(f"album:{album_id}")
+    keys.append(f"title:{(title or '').casefold()}|{(artist or '').casefold()}")
+    return keys
 
-    ensure_categories()
 
-    if wipe_orders:
-        log("Sterg order_items si orders...")
-        db.session.query(OrderItem).delete()
-        db.session.query(Order).delete()
-        db.session.commit()
+def existing_products():
+    """{cheie: produs} pentru toate produsele, inclusiv cele arhivate (soft-delete)."""
+    index = {}
+    for product in Product.query:
+        album_id = None
+        if (product.audio_url or "").startswith("qobuz:"):
+            album_id = product.audio_url.partition("|")[2] or None
+        for key in product_keys(album_id, product.title, product.artist):
+            index.setdefault(key, product)
+    return index
+
 
-    log("Sterg produsele existente...")
-    db.session.query(Product).delete()
+def wipe_orders():
+    db.session.query(OrderItem).delete()
+    db.session.query(Order).delete()
     db.session.commit()
 
+
+def refresh_products(max_albums_per_artist):
+    """
+    Importa albumele artistilor din ARTISTS (upsert). Un album deja in catalog (dupa id-ul
+    Qobuz din audio_url, altfel titlu + artist) isi primeste titlul, coperta, descrierea si
+    preview-ul noi; pretul si stocul raman. Produsele arhivate raman arhivate, iar cele
+    care nu mai apar in API nu se sterg (cosurile, comenzile si perechile lor raman valide).
+    Intoarce (create, actualizate).
+    """
+    def log(message):
+        print(f"[refresh] {message}", flush=True)
+
+    ensure_categories()
+
     cd_category = Category.query.filter_by(name="CD").first()
     vinyl_category = Category.query.filter_by(name="Vinyl").first()
 
-    created = 0
+    index = existing_products()
+    used_ids = {product_id for (product_id,) in db.session.query(Product.id)}
+    created = updated = 0
     seen_album_ids = set()
-    used_ids = set()
     for artist in ARTISTS:
         log(f"Artist: {artist}")
         artist_created = 0
@@ -232,52 +261,66 @@ def refresh_products(max_albums_per_artist, wipe_orders):
             tracks = ((album_details.get("tracks") or {}).get("items") or [])
             preview_track_id = pick_preview_track(tracks)
 
-            category = pick_category()
-            price = pick_price(category)
-            stock = random.randint(6, 40)
+            title = album.get("title") or album_details.get("title") or "Album"
+            artist_name = (
+                (album.get("artist") or {}).get("name")
+                or (album_details.get("artist") or {}).get("name")
+                or artist
+            )
             image = album.get("image") or {}
-            image_url = image.get("large") or image.get("small") or image.get("thumbnail")
-            description = build_description(album_details or album)
-            product_id = generate_product_id(used_ids)
+            fields = {
+                "title": title,
+                "artist": artist_name,
+                "image_url": image.get("large") or image.get("small") or image.get("thumbnail"),
+                "description": build_description(album_details or album),
+                "audio_url": f"qobuz:{preview_track_id}|{album_id}" if preview_track_id else None,
+            }
+
+            keys = product_keys(album_id, title, artist_name)
+            product = next((index[key] for key in keys if key in index), None)
+            if product is not None:
+                if product.deleted_at is None:
+                    for name, value in fields.items():
+                        # Un preview / o coperta lipsa din API nu sterge valoarea existenta
+                        if value or name not in ("image_url", "audio_url"):
+                            setattr(product, name, value)
+                    updated += 1
+                continue
 
+            category = pick_category()
             product = Product(
-                id=product_id,
-                title=album.get("title") or album_details.get("title") or "Album",
-                artist=(album.get("artist") or {}).get("name")
-                or (album_details.get("artist") or {}).get("name")
-                or artist,
-                price=price,
-                stock=stock,
-                category=category,
+                id=generate_product_id(used_ids),
+                price=pick_price(category),
+                stock=random.randint(6, 40),
                 category_id=cd_category.id if category == "CD" else vinyl_category.id,
-                image_url=image_url,
-                description=description,
-                audio_url=f"qobuz:{preview_track_id}|{album_id}"
-                if preview_track_id
-                else None,
+                **fields,
             )
             db.session.add(product)
+            for key in keys:
+                index[key] = product
             created += 1
             artist_created += 1
             if created % 10 == 0:
                 log(f"Produse create: {created}")
         db.session.commit()
         if artist_created:
-            log(f"Total pentru {artist}: {artist_created}")
+            log(f"Total nou pentru {artist}: {artist_created}")
 
     if db.engine.dialect.name == "postgresql":
         try:
             db.session.execute(
-                "SELECT setval(pg_get_serial_sequence('products','id'), "
-                "(SELECT MAX(id) FROM products));"
+                text(
+                    "SELECT setval(pg_get_serial_sequence('products','id'), "
+                    "(SELECT MAX(id) FROM products));"
+                )
             )
             db.session.commit()
             log("Secventa products.id actualizata.")
         except Exception:
             db.session.rollback()
 
-    log(f"Import complet. Total produse: {created}")
-    return created
+    log(f"Import complet. Produse noi: {created}, actualizate: {updated}")
+    return created, updated
 
 
 def parse_args():
@@ -287,7 +330,7 @@ def parse_args():
     parser.add_argument(
         "--confirm",
         action="store_true",
-        help="Confirma ca vrei sa stergi produsele existente.",
+        help="Confirma importul (produsele existente sunt actualizate).",
     )
     parser.add_argument(
         "--max-albums",
@@ -298,7 +341,12 @@ def parse_args():
     parser.add_argument(
         "--wipe-orders",
         action="store_true",
-        help="Sterge si comenzile + item-urile (daca exista).",
+        help="Sterge intai comenzile + item-urile (doar din CLI, niciodata din job).",
+    )
+    parser.add_argument(
+        "--skip-images",
+        action="store_true",
+        help="Nu pre-genera variantele redimensionate ale copertilor.",
     )
     return parser.parse_args()
 
@@ -307,12 +355,22 @@ def main():
     args = parse_args()
     if not args.confirm:
         raise SystemExit(
-            "Ruleaza din nou cu --confirm ca sa stergi produsele existente."
+            "Ruleaza din nou cu --confirm ca sa importi produsele."
         )
     max_albums = args.max_albums if args.max_albums and args.max_albums > 0 else None
     with app.app_context():
-        created = refresh_products(max_albums, args.wipe_orders)
-    print(f"Import complet. Produse create: {created}")
+        if args.wipe_orders:
+            print("[refresh] Sterg order_items si orders...", flush=True)
+            wipe_orders()
+        created, updated = refresh_products(max_albums)
+        # Workerii site-ului pornit isi golesc cache-urile (produse, catalog, categorii)
+        cache_bus.invalidate("products", "catalog", "facets", "categories", "recommendations")
+        if not args.skip_images:
+            # Coperti descarcate + redimensionate acum, nu la prima vizita in catalog
+            started = time.perf_counter()
+            ok, failed = prewarm(url for (url,) in db.session.query(Product.image_url))
+            print(f"[refresh] Imagini pregatite: {ok} (erori: {failed}) in {time.perf_counter() - started:.1f}s")
+    print(f"Import complet. Produse create: {created}, actualizate: {updated}")
 
 
 if __name__ == "__main__":
@@ -1,106 +1,251 @@
 import argparse
+import gzip
 import os
 import shutil
 import subprocess
-from urllib.parse import urlparse
+import time
+from datetime import datetime
+
+from db_tools import (
+    CHUNK_SIZE,
+    PsqlSession,
+    load_manifest,
+    pg_command,
+    resolve_connection,
+    use_docker,
+    verify_manifest,
+)
+
+STAGING_SCHEMA = "restore_staging"
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Restore Postgres from SQL via docker compose.")
-    parser.add_argument("backup_file", help="Path to .sql file")
+    parser.add_argument(
+        "backup_file",
+        help="Path to .sql / .sql.gz / .sql.zst, .dump (pg_dump -F c) or .dir (pg_dump -F d)",
+    )
     parser.add_argument("--db", default="garden_records", help="Database name")
     parser.add_argument("--user", default="postgres", help="Database user")
     parser.add_argument("--host", default="db", help="Database host (direct mode)")
     parser.add_argument("--port", default="5432", help="Database port (direct mode)")
+    parser.add_argument("--jobs", type=int, default=4, help="Job-uri paralele pg_restore (.dir / .dump)")
+    parser.add_argument(
+        "--skip-verify",
+        action="store_true",
+        help="Nu verifica checksum-urile din manifest inainte de restore",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["replace", "staging"],
+        default="replace",
+        help="replace = DROP SCHEMA public + restore; staging = restore in DB temporar, validare, swap atomic de schema",
+    )
+    parser.add_argument(
+        "--drop-old",
+        action="store_true",
+        help="Doar --mode staging: sterge schema veche (public_old_<stamp>) dupa cutover",
+    )
+    parser.add_argument("--lock-timeout", default="5s", help="Doar --mode staging: lock_timeout pentru cutover")
     return parser.parse_args()
 
 
+def is_archive(path):
+    """Backup-uri care se restaureaza cu pg_restore (directory sau custom format)."""
+    return os.path.isdir(path) or path.endswith(".dump")
+
+
+def detect_compression(path):
+    """Dupa magic bytes, nu dupa extensie (backup-urile cu --output pot avea orice nume)."""
+    with open(path, "rb") as handle:
+        magic = handle.read(4)
+    if magic[:2] == b"\x1f\x8b":
+        return "gzip"
+    if magic == b"\x28\xb5\x2f\xfd":
+        return "zstd"
+    return "none"
+
+
+def open_sql(path, compress):
+    if compress == "gzip":
+        return gzip.open(path, "rb")
+    if compress == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("zstd: instaleaza binarul `zstd` sau pachetul Python `zstandard`.")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    return open(path, "rb")
+
+
+def restore_sql(cmd, env, path):
+    """psql cu decompresie in streaming."""
+    compress = detect_compression(path)
+    zstd_bin = shutil.which("zstd") if compress == "zstd" else None
+    if zstd_bin:
+        reader = subprocess.Popen([zstd_bin, "-dcq", path], stdout=subprocess.PIPE)
+        proc = subprocess.run(cmd, stdin=reader.stdout, check=False, env=env)
+        reader.stdout.close()
+        return reader.wait() == 0 and proc.returncode == 0
+
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, env=env)
+    with open_sql(path, compress) as in_file:
+        for chunk in iter(lambda: in_file.read(CHUNK_SIZE), b""):
+            proc.stdin.write(chunk)
+    proc.stdin.close()
+    return proc.wait() == 0
+
+
+def restore_archive(args, env, docker, path, db=None):
+    """pg_restore -j N; in modul docker arhiva se copiaza intai in container."""
+    source = path
+    if docker:
+        source = f"/tmp/{os.path.basename(os.path.abspath(path))}"
+        if subprocess.run(["docker", "compose", "cp", path, f"db:{source}"], check=False).returncode != 0:
+            return False
+    cmd = pg_command("pg_restore", args, docker, db=db) + ["-j", str(args.jobs), "--no-owner", source]
+    ok = subprocess.run(cmd, check=False, env=env).returncode == 0
+    if docker:
+        subprocess.run(["docker", "compose", "exec", "-T", "db", "rm", "-rf", source], check=False)
+    return ok
+
+
+def run_psql(args, env, docker, sql, db=None):
+    cmd = pg_command("psql", args, docker, db=db) + ["-q", "-v", "ON_ERROR_STOP=1", "-c", sql]
+    return subprocess.run(cmd, check=False, env=env).returncode == 0
+
+
+def restore_into(args, env, docker, db):
+    if is_archive(args.backup_file):
+        return restore_archive(args, env, docker, args.backup_file, db=db)
+    return restore_sql(pg_command("psql", args, docker, db=db), env, args.backup_file)
+
+
+def check_counts(expected, actual, where):
+    """Compara row count-urile cu cele din manifest; iese la prima diferenta."""
+    if expected is None:
+        print(f"[{where}] Manifestul nu are row_counts, validarea e sarita.")
+        return
+    diff = {
+        name: (expected.get(name), actual.get(name))
+        for name in set(expected) | set(actual)
+        if expected.get(name) != actual.get(name)
+    }
+    if diff:
+        details = ", ".join(f"{name}: asteptat {exp}, gasit {got}" for name, (exp, got) in sorted(diff.items()))
+        raise SystemExit(f"[{where}] Row counts diferite: {details}")
+    print(f"[{where}] Row counts OK ({len(actual)} tabele, {sum(actual.values())} randuri)")
+
+
+def copy_schema(args, env, docker, source_db, schema):
+    """pg_dump -n <schema> din DB-ul temporar direct in psql pe DB-ul live (fara fisier intermediar)."""
+    dump = subprocess.Popen(
+        pg_command("pg_dump", args, docker, db=source_db) + ["-n", schema, "--no-owner"],
+        stdout=subprocess.PIPE,
+        env=env,
+    )
+    load = subprocess.run(
+        pg_command("psql", args, docker) + ["-q", "-v", "ON_ERROR_STOP=1"],
+        stdin=dump.stdout,
+        stdout=subprocess.DEVNULL,
+        check=False,
+        env=env,
+    )
+    dump.stdout.close()
+    return dump.wait() == 0 and load.returncode == 0
+
+
+def restore_staging(args, env, docker, manifest):
+    """
+    Restore online: site-ul ramane pe schema public pana la cutover.
+
+    1. restore in DB-ul temporar <db>_restore_<stamp> + validare row counts
+    2. schema redenumita acolo in restore_staging si copiata in DB-ul live
+    3. cutover: public -> public_old_<stamp>, restore_staging -> public, intr-o tranzactie
+    """
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    scratch_db = f"{args.db}_restore_{stamp}"
+    old_schema = f"public_old_{stamp}"
+    expected = manifest.get("row_counts") if manifest else None
+
+    print(f"Creare DB temporar {scratch_db}...")
+    if not run_psql(args, env, docker, f'CREATE DATABASE "{scratch_db}"', db="postgres"):
+        raise SystemExit("Nu s-a putut crea DB-ul temporar.")
+    try:
+        started = time.perf_counter()
+        print(f"Restoring from {args.backup_file} in {scratch_db}")
+        if not restore_into(args, env, docker, scratch_db):
+            raise SystemExit("Restore failed.")
+        print(f"Restore: {time.perf_counter() - started:.1f}s")
+        with PsqlSession(args, env, docker, db=scratch_db) as session:
+            check_counts(expected, session.row_counts(), scratch_db)
+
+        if not run_psql(args, env, docker, f"ALTER SCHEMA public RENAME TO {STAGING_SCHEMA}", db=scratch_db):
+            raise SystemExit("Redenumirea schemei in DB-ul temporar a esuat.")
+        if not run_psql(args, env, docker, f"DROP SCHEMA IF EXISTS {STAGING_SCHEMA} CASCADE"):
+            raise SystemExit("Nu s-a putut curata schema de staging din DB-ul live.")
+        print(f"Copiere schema {STAGING_SCHEMA} in {args.db}...")
+        started = time.perf_counter()
+        if not copy_schema(args, env, docker, scratch_db, STAGING_SCHEMA):
+            run_psql(args, env, docker, f"DROP SCHEMA IF EXISTS {STAGING_SCHEMA} CASCADE")
+            raise SystemExit("Copierea schemei de staging a esuat.")
+        print(f"Copiere: {time.perf_counter() - started:.1f}s")
+        with PsqlSession(args, env, docker) as session:
+            check_counts(expected, session.row_counts(STAGING_SCHEMA), f"{args.db}.{STAGING_SCHEMA}")
+
+        # Singurul moment in care site-ul e afectat: doua ALTER SCHEMA in aceeasi tranzactie
+        cutover = (
+            f"SET lock_timeout = '{args.lock_timeout}'; "
+            "BEGIN; "
+            f"ALTER SCHEMA public RENAME TO {old_schema}; "
+            f"ALTER SCHEMA {STAGING_SCHEMA} RENAME TO public; "
+            "GRANT USAGE ON SCHEMA public TO PUBLIC; "
+            "COMMIT;"
+        )
+        started = time.perf_counter()
+        if not run_psql(args, env, docker, cutover):
+            raise SystemExit(f"Cutover esuat; schema public e neschimbata, datele noi raman in {STAGING_SCHEMA}.")
+        print(f"Cutover: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        if args.drop_old:
+            run_psql(args, env, docker, f"DROP SCHEMA {old_schema} CASCADE")
+            print(f"Schema veche {old_schema} stearsa.")
+        else:
+            print(f"Schema veche pastrata ca {old_schema} (DROP SCHEMA {old_schema} CASCADE dupa verificare).")
+    finally:
+        run_psql(args, env, docker, f'DROP DATABASE IF EXISTS "{scratch_db}"', db="postgres")
+
+
 def main():
     args = parse_args()
     if not os.path.exists(args.backup_file):
         raise SystemExit(f"Backup file not found: {args.backup_file}")
 
-    use_docker = shutil.which("docker") or shutil.which("docker.exe")
-    env = os.environ.copy()
-    if not use_docker:
-        db_url = env.get("DATABASE_URL")
-        if db_url:
-            parsed = urlparse(db_url)
-            if parsed.scheme.startswith("postgres"):
-                if args.db == "garden_records" and parsed.path:
-                    args.db = parsed.path.lstrip("/")
-                if args.user == "postgres" and parsed.username:
-                    args.user = parsed.username
-                if args.host == "db" and parsed.hostname:
-                    args.host = parsed.hostname
-                if args.port == "5432" and parsed.port:
-                    args.port = str(parsed.port)
-                if parsed.password:
-                    env["PGPASSWORD"] = parsed.password
-    if use_docker:
-        drop_cmd = [
-            "docker",
-            "compose",
-            "exec",
-            "-T",
-            "db",
-            "psql",
-            "-U",
-            args.user,
-            "-d",
-            args.db,
-            "-c",
-            "DROP SCHEMA public CASCADE; CREATE SCHEMA public;",
-        ]
-    else:
-        drop_cmd = [
-            "psql",
-            "-h",
-            args.host,
-            "-p",
-            str(args.port),
-            "-U",
-            args.user,
-            "-d",
-            args.db,
-            "-c",
-            "DROP SCHEMA public CASCADE; CREATE SCHEMA public;",
-        ]
+    manifest = load_manifest(args.backup_file)
+    if manifest and not args.skip_verify:
+        print("Verificare checksum...")
+        bad = verify_manifest(args.backup_file, manifest)
+        if bad:
+            raise SystemExit(f"Checksum invalid / fisiere lipsa: {', '.join(bad)}")
+
+    docker = use_docker()
+    env = resolve_connection(args, docker)
+
+    if args.mode == "staging":
+        restore_staging(args, env, docker, manifest)
+        print("Done.")
+        return
+
+    drop_cmd = pg_command("psql", args, docker) + ["-c", "DROP SCHEMA public CASCADE; CREATE SCHEMA public;"]
     print("Reset schema...")
     if subprocess.run(drop_cmd, check=False, env=env).returncode != 0:
         raise SystemExit("Schema reset failed.")
 
-    if use_docker:
-        restore_cmd = [
-            "docker",
-            "compose",
-            "exec",
-            "-T",
-            "db",
-            "psql",
-            "-U",
-            args.user,
-            "-d",
-            args.db,
-        ]
-    else:
-        restore_cmd = [
-            "psql",
-            "-h",
-            args.host,
-            "-p",
-            str(args.port),
-            "-U",
-            args.user,
-            "-d",
-            args.db,
-        ]
-
     print(f"Restoring from {args.backup_file}")
-    with open(args.backup_file, "rb") as in_file:
-        proc = subprocess.run(restore_cmd, stdin=in_file, check=False, env=env)
-    if proc.returncode != 0:
+    started = time.perf_counter()
+    if not restore_into(args, env, docker, args.db):
         raise SystemExit("Restore failed.")
+    print(f"Restore: {time.perf_counter() - started:.1f}s")
     print("Done.")
 
 
@@ -21,9 +21,11 @@
     }
   }
 
-  // Salvează cart-ul în localStorage
-  function setCart(cart) {
+  // Salvează cart-ul în localStorage (și trimite diferențele la server, dacă userul e logat)
+  function setCart(cart, { sync = true } = {}) {
+    const before = sync ? getCart() : null;
     localStorage.setItem("cart", JSON.stringify(cart || []));
+    if (sync) queueCartChanges(before, cart || []);
   }
 
   // Asigură un număr valid (ex. price, quantity)
@@ -40,6 +42,124 @@
     return node;
   }
 
+  /* -----------------------------
+     Sync coș cu serverul
+     ----------------------------- */
+  // Se trimit doar liniile schimbate (PATCH /api/cart, cantitate absolută, 0 = șterge)
+  const CART_SYNC_DELAY = 400;
+  const pendingCartChanges = new Map();
+  let cartSyncTimer = null;
+  let cartMergePromise = null;
+
+  function currentUserId() {
+    return (document.body && document.body.dataset.userId) || "";
+  }
+
+  function quantityMap(cart) {
+    const map = new Map();
+    cart.forEach((item) => {
+      const id = toNumber(item.id, 0);
+      if (id) map.set(id, Math.max(0, toNumber(item.quantity, 1)));
+    });
+    return map;
+  }
+
+  function queueCartChanges(before, after) {
+    if (!currentUserId()) {
+      // modificat ca anonim: la următorul login coșul trebuie combinat cu cel de pe server
+      localStorage.removeItem("cartUser");
+      return;
+    }
+    const prev = quantityMap(before || []);
+    const next = quantityMap(after);
+    next.forEach((qty, id) => {
+      if (prev.get(id) !== qty) pendingCartChanges.set(id, qty);
+    });
+    prev.forEach((_, id) => {
+      if (!next.has(id)) pendingCartChanges.set(id, 0);
+    });
+    if (pendingCartChanges.size && !cartSyncTimer) {
+      cartSyncTimer = setTimeout(flushCartSync, CART_SYNC_DELAY);
+    }
+  }
+
+  async function flushCartSync() {
+    if (cartSyncTimer) {
+      clearTimeout(cartSyncTimer);
+      cartSyncTimer = null;
+    }
+    if (cartMergePromise) await cartMergePromise;
+    if (!pendingCartChanges.size || !currentUserId()) return true;
+
+    const items = Array.from(pendingCartChanges, ([id, quantity]) => ({ id, quantity }));
+    pendingCartChanges.clear();
+    try {
+      const res = await fetch("/api/cart", {
+        method: "PATCH",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ items }),
+        keepalive: true,
+      });
+      if (res.ok) return true;
+    } catch {
+      // eroare de rețea: tratată la fel ca un răspuns 4xx / 5xx
+    }
+    // liniile nesalvate revin în coadă (checkout-ul nu pleacă până nu ajung pe server)
+    items.forEach(({ id, quantity }) => {
+      if (!pendingCartChanges.has(id)) pendingCartChanges.set(id, quantity);
+    });
+    return false;
+  }
+
+  // Coșul salvat pe server (modificat eventual de pe alt dispozitiv) înlocuiește copia locală
+  function refreshCartFromServer() {
+    return fetch("/api/cart", { headers: { Accept: "application/json" } })
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => {
+        if (!data || !Array.isArray(data.cart)) return null;
+        // modificările locale încă netrimise au prioritate
+        if (pendingCartChanges.size) return getCart();
+        setCart(data.cart, { sync: false });
+        updateCartCount();
+        updateMobileCartBadge();
+        window.dispatchEvent(new CustomEvent("cart:synced"));
+        return data.cart;
+      })
+      .catch(() => null);
+  }
+
+  // După login (sau alt user pe același browser): combină coșul local cu cel salvat;
+  // altfel, la fiecare pagină, reîncarcă coșul de pe server
+  function mergeCartOnLogin() {
+    const userId = currentUserId();
+    if (!userId) return;
+    if (localStorage.getItem("cartUser") === userId) {
+      cartMergePromise = refreshCartFromServer().finally(() => {
+        cartMergePromise = null;
+      });
+      return;
+    }
+
+    cartMergePromise = fetch("/api/cart/merge", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ cart: getCart().map((i) => ({ id: i.id, quantity: i.quantity })) }),
+    })
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => {
+        if (!data || !Array.isArray(data.cart)) return;
+        setCart(data.cart, { sync: false });
+        localStorage.setItem("cartUser", userId);
+        updateCartCount();
+        updateMobileCartBadge();
+        window.dispatchEvent(new CustomEvent("cart:synced"));
+      })
+      .catch(() => {})
+      .finally(() => {
+        cartMergePromise = null;
+      });
+  }
+
   /* -----------------------------
      Cart core
      ----------------------------- */
@@ -133,7 +253,13 @@
 
     const nextQty = Math.max(0, toNumber(cart[idx].quantity, 1) + toNumber(delta, 0));
     if (nextQty === 0) cart.splice(idx, 1);
-    else cart[idx].quantity = nextQty;
+    else {
+      cart[idx].quantity = nextQty;
+      // stocul vine din ultimul quote; statusul se recalculează local, fără request nou
+      if (cart[idx].quote_status && cart[idx].quote_status !== "not_found" && cart[idx].stock !== undefined) {
+        cart[idx].quote_status = nextQty <= toNumber(cart[idx].stock, 0) ? "ok" : "insufficient_stock";
+      }
+    }
 
     setCart(cart);
     displayCart();
@@ -198,6 +324,11 @@
       const info = el("div", "cart-item-info");
       info.appendChild(el("h4", "", item.name || "Produs"));
       info.appendChild(el("p", "", item.type || ""));
+      if (item.quote_status === "insufficient_stock") {
+        info.appendChild(el("p", "cart-item-warning", `Stoc disponibil: ${toNumber(item.stock, 0)}`));
+      } else if (item.quote_status === "not_found") {
+        info.appendChild(el("p", "cart-item-warning", "Produsul nu mai este disponibil"));
+      }
 
       // Qty controls
       const qtyControl = el("div", "qty-control");
@@ -232,10 +363,11 @@
 
     cartTotal.textContent = total.toFixed(2);
 
-    // activează checkout dacă există
+    // activează checkout dacă există (și dacă ultimul quote nu a găsit probleme)
     const checkoutBtnEl = document.querySelector(".checkout-btn");
     if (checkoutBtnEl) {
-      const isDisabled = cart.length === 0;
+      const hasIssues = cart.some((item) => item.quote_status && item.quote_status !== "ok");
+      const isDisabled = cart.length === 0 || hasIssues;
       checkoutBtnEl.disabled = isDisabled;
       checkoutBtnEl.setAttribute("aria-disabled", isDisabled ? "true" : "false");
     }
@@ -252,6 +384,38 @@
     });
   }
 
+  // Preț / stoc autoritative de la server (un singur request pentru tot coșul)
+  async function refreshCartQuote() {
+    const cart = getCart();
+    if (!cart.length) return;
+    try {
+      const res = await fetch("/api/cart/quote", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ cart: cart.map((i) => ({ id: i.id, quantity: i.quantity })) }),
+      });
+      if (!res.ok) return;
+      const quote = await res.json();
+      const byId = new Map((quote.items || []).map((q) => [toNumber(q.id, 0), q]));
+
+      // Cart-ul poate fi modificat între timp; actualizăm doar item-urile existente
+      const current = getCart();
+      current.forEach((item) => {
+        const q = byId.get(toNumber(item.id, 0));
+        if (!q) return;
+        item.quote_status = q.status;
+        if (q.status === "not_found") return;
+        item.price = q.price;
+        item.stock = q.stock;
+        if (q.name) item.name = q.name;
+      });
+      setCart(current, { sync: false });
+      displayCart();
+    } catch {
+      // fără rețea: rămân prețurile din localStorage, checkout-ul validează oricum
+    }
+  }
+
   /* -----------------------------
      Fly-to-cart animation
      ----------------------------- */
@@ -350,6 +514,7 @@
         e.preventDefault();
         lastFocus = document.activeElement;
         displayCart();
+        refreshCartQuote();
         cartModal.style.display = "block";
         cartModal.setAttribute("aria-hidden", "false");
         if (closeModal) closeModal.focus();
@@ -501,6 +666,7 @@
      Boot
      ----------------------------- */
   document.addEventListener("DOMContentLoaded", () => {
+    mergeCartOnLogin();
     initUI();
     initDashboardSidebar();
     initAddToCartButtons();
@@ -510,7 +676,13 @@
   /* ---------------------------------------------------------
      Export global (pentru checkout.html / alte pagini)
      --------------------------------------------------------- */
+  window.addEventListener("pagehide", () => {
+    flushCartSync();
+  });
+
   window.displayCart = displayCart;
+  window.flushCartSync = flushCartSync;
+  window.refreshCartFromServer = refreshCartFromServer;
   window.addToCart = addToCart;
   window.updateCartCount = updateCartCount;
   window.updateMobileCartBadge = updateMobileCartBadge;
@@ -0,0 +1,170 @@
+"""
+Stoc distribuit (sharded) pentru produsele foarte cerute.
+
+La un produs marcat (products.stock_shards = N > 0) stocul sta in N randuri din
+product_stock_shards, iar checkout-ul scade cantitatea dintr-un singur rand, ales aleator,
+cu un UPDATE atomic (pe Postgres cu FOR UPDATE SKIP LOCKED): cumparatorii simultani ai
+aceluiasi produs blocheaza randuri diferite in loc sa astepte toti dupa randul din products.
+Daca niciun rand liber nu mai are cantitatea ceruta, se blocheaza toate randurile produsului,
+cantitatea se ia din total si restul se reimparte egal (rebalansare la nevoie).
+
+Stocul exact e Product.stock_total (suma randurilor); products.stock primeste suma la
+rebalansarea periodica (scripts/manage_stock_shards.py rebalance). Ordinea blocarilor e
+aceeasi peste tot (randul din products, apoi randurile de stoc in ordinea shard), ca sa nu
+apara deadlock-uri. Functiile de aici nu fac commit; apelantul decide tranzactia.
+"""
+import os
+import random
+
+from sqlalchemy import delete, insert, select, update
+
+from models import db, Product, StockShard
+
+DEFAULT_SHARDS = int(os.getenv("STOCK_SHARDS", "8"))
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id):
+        super().__init__(f"Stoc insuficient pentru produsul {product_id}")
+        self.product_id = product_id
+
+
+def split(total, shards):
+    """`total` impartit cat mai egal in `shards` parti (primele primesc restul)."""
+    base, extra = divmod(max(total, 0), shards)
+    return [base + (1 if index < extra else 0) for index in range(shards)]
+
+
+def _lock_product(product_id):
+    # Doar blocarea randului: modificarile nesalvate din obiect (ex: formularul de editare) raman
+    db.session.execute(select(Product.id).where(Product.id == product_id).with_for_update(key_share=True))
+
+
+def _lock_shards(product_id):
+    return db.session.execute(
+        select(StockShard.shard, StockShard.stock)
+        .where(StockShard.product_id == product_id)
+        .order_by(StockShard.shard)
+        .with_for_update()
+    ).all()
+
+
+def _write(product_id, amounts):
+    db.session.execute(
+        update(StockShard),
+        [{"product_id": product_id, "shard": shard, "stock": stock} for shard, stock in enumerate(amounts)],
+    )
+
+
+def enable(product, shards=None):
+    """Marcheaza produsul: product.stock se imparte in `shards` randuri."""
+    _lock_product(product.id)
+    if product.stock_shards:
+        return
+    shards = shards or DEFAULT_SHARDS
+    db.session.execute(
+        insert(StockShard),
+        [
+            {"product_id": product.id, "shard": shard, "stock": stock}
+            for shard, stock in enumerate(split(product.stock or 0, shards))
+        ],
+    )
+    product.stock_shards = shards
+
+
+def disable(product):
+    """Aduna randurile inapoi in products.stock si sterge marcajul."""
+    _lock_product(product.id)
+    if not product.stock_shards:
+        return
+    total = sum(stock for _, stock in _lock_shards(product.id))
+    db.session.execute(delete(StockShard).where(StockShard.product_id == product.id))
+    product.stock = total
+    product.stock_shards = 0
+
+
+def set_total(product, total):
+    """Stocul nou al unui produs marcat (editare din dashboard), reimpartit egal."""
+    _lock_product(product.id)
+    rows = _lock_shards(product.id)
+    _write(product.id, split(total, len(rows)))
+    product.stock = total
+
+
+def _decrement(product_id, shard, quantity):
+    # `shard`: numarul randului sau o subinterogare care il alege
+    stmt = (
+        update(StockShard)
+        .values(stock=StockShard.stock - quantity)
+        .where(StockShard.product_id == product_id, StockShard.shard == shard, StockShard.stock >= quantity)
+        .returning(StockShard.shard)
+        .execution_options(synchronize_session=False)
+    )
+    if db.engine.dialect.name != "postgresql":
+        return db.session.execute(stmt).first() is not None
+    # Un rand blocat, dar recitit dupa commit-ul altui cumparator si ramas sub cantitate, ar
+    # ramane blocat pana la commit (deadlock cu pasul 3); rollback-ul savepoint-ului il elibereaza
+    savepoint = db.session.begin_nested()
+    taken = db.session.execute(stmt).first() is not None
+    if taken:
+        savepoint.commit()
+    else:
+        savepoint.rollback()
+    return taken
+
+
+def take(product_id, shard_count, quantity):
+    """Scade `quantity` din stocul produsului marcat; False daca totalul nu ajunge."""
+    start = random.randrange(shard_count)
+    # 1) primul rand liber cu destula cantitate, pornind de la unul aleator (cele blocate de
+    #    alti cumparatori sunt sarite, nu asteptate)
+    free = (
+        select(StockShard.shard)
+        .where(StockShard.product_id == product_id, StockShard.stock >= quantity)
+        .order_by((StockShard.shard + shard_count - start) % shard_count)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    if _decrement(product_id, free, quantity):
+        return True
+    # 2) toate sunt ocupate: se asteapta dupa un singur rand; fara alt rand blocat intre timp,
+    #    asteptarea nu poate forma un ciclu cu pasul 3
+    if _decrement(product_id, start, quantity):
+        return True
+
+    # 3) niciun rand nu ajunge singur: se ia din total si se rebalanseaza
+    rows = _lock_shards(product_id)
+    total = sum(stock for _, stock in rows)
+    if total < quantity:
+        return False
+    _write(product_id, split(total - quantity, len(rows)))
+    return True
+
+
+def give(product_id, shard_count, quantity):
+    """Pune `quantity` inapoi pe stoc (anulare comanda), intr-un rand aleator."""
+    db.session.execute(
+        update(StockShard)
+        .values(stock=StockShard.stock + quantity)
+        .where(StockShard.product_id == product_id, StockShard.shard == random.randrange(shard_count))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def sharded_product_ids():
+    return db.session.execute(
+        select(Product.id).where(Product.stock_shards > 0).order_by(Product.id)
+    ).scalars().all()
+
+
+def rebalance(product_id):
+    """Reimparte egal stocul produsului si scrie suma in products.stock. Intoarce suma."""
+    _lock_product(product_id)
+    rows = _lock_shards(product_id)
+    total = sum(stock for _, stock in rows)
+    _write(product_id, split(total, len(rows)))
+    db.session.execute(
+        update(Product).where(Product.id == product_id).values(stock=total).execution_options(synchronize_session=False)
+    )
+    return total
@@ -0,0 +1,65 @@
+"""
+Teste pe un SQLite temporar: app.py creeaza schema si seed-ul (admin / angajat / client,
+categoriile si produsul demo) la import.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='garden_tests_'), 'test.db')}"
+# Testele trimit multe cereri din acelasi IP; test_rate_limit porneste limitatorul explicit
+os.environ["RATE_LIMITS_ENABLED"] = "0"
+os.environ.pop("DATABASE_REPLICA_URL", None)
+
+from app import app as flask_app  # noqa: E402
+from models import db, Category, Product, User  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    return flask_app
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield
+        db.session.rollback()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, username, password):
+    response = client.post("/login", data={"username": username, "password": password})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def customer(app):
+    return login(app.test_client(), "client", "client123")
+
+
+@pytest.fixture
+def product(ctx):
+    """Produs nou, cu stoc 10, pentru un singur test."""
+    item = Product(
+        title="Test album", artist="Test artist", price="25.00", stock=10,
+        category_id=Category.query.filter_by(name="CD").first().id,
+    )
+    db.session.add(item)
+    db.session.commit()
+    return item
+
+
+@pytest.fixture
+def client_user(ctx):
+    return User.query.filter_by(username="client").first()
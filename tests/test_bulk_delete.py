@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+import pytest
+
+from conftest import login
+from models import db, CartItem, Category, Order, OrderItem, Product, User
+
+
+@pytest.fixture
+def admin(app):
+    return login(app.test_client(), "admin", "admin123")
+
+
+def add_user(username, role="client"):
+    user = User(username=username, email=f"{username}@test.com", role=role)
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_order(user, product=None):
+    order = Order(user_id=user.id, status="pending", total_price=Decimal("25.00"))
+    db.session.add(order)
+    db.session.flush()
+    if product is not None:
+        db.session.add(OrderItem(order_id=order.id, product_id=product.id, quantity=1, price=product.price))
+    db.session.commit()
+
+
+def test_products_with_orders_are_archived(admin, product, client_user):
+    unsold = Product(
+        title="Unsold album", artist="Test artist", price="10.00", stock=3,
+        category_id=Category.query.filter_by(name="CD").first().id,
+    )
+    db.session.add(unsold)
+    db.session.commit()
+    add_order(client_user, product)
+    db.session.add(CartItem(user_id=client_user.id, product_id=product.id, quantity=1))
+    db.session.commit()
+    sold_id, unsold_id = product.id, unsold.id
+
+    response = admin.post("/api/products/delete", json={"ids": [sold_id, unsold_id, 999999, "abc"]})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data["deleted"], data["archived"]) == (1, 1)
+    assert {row["id"]: row["result"] for row in data["results"]} == {
+        "abc": "invalid", sold_id: "archived", unsold_id: "deleted", 999999: "not_found",
+    }
+
+    db.session.expire_all()
+    # Produsul vandut ramane (pentru istoricul comenzilor), dar iese din cos
+    assert db.session.get(Product, sold_id).deleted_at is not None
+    assert OrderItem.query.filter_by(product_id=sold_id).count() == 1
+    assert CartItem.query.filter_by(product_id=sold_id).count() == 0
+    assert db.session.get(Product, unsold_id) is None
+
+    # Un produs deja arhivat nu se mai gaseste
+    again = admin.post("/api/products/delete", json={"ids": [sold_id]}).get_json()
+    assert again["results"] == [{"id": sold_id, "result": "not_found"}]
+
+
+def test_users_delete_outcomes(admin, ctx):
+    acting = User.query.filter_by(username="admin").first()
+    plain = add_user("bulk_plain")
+    buyer = add_user("bulk_buyer")
+    other_admin = add_user("bulk_admin", role="admin")
+    add_order(buyer)
+    ids = [plain.id, buyer.id, other_admin.id, acting.id, 999999]
+
+    response = admin.post("/api/users/delete", json={"ids": ids})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["deleted"] == 1
+    assert [row["result"] for row in data["results"]] == [
+        "deleted", "has_orders", "forbidden", "forbidden", "not_found",
+    ]
+
+    db.session.expire_all()
+    assert db.session.get(User, ids[0]) is None
+    assert {db.session.get(User, uid).username for uid in ids[1:4]} == {"bulk_buyer", "bulk_admin", "admin"}
+
+
+def test_users_delete_is_admin_only(app, ctx):
+    plain = add_user("bulk_victim")
+    employee = login(app.test_client(), "angajat", "angajat123")
+    assert employee.post("/api/users/delete", json={"ids": [plain.id]}).status_code == 403
+    db.session.expire_all()
+    assert db.session.get(User, plain.id) is not None
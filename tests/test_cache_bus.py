@@ -0,0 +1,48 @@
+import multiprocessing
+import os
+import time
+from decimal import Decimal
+
+import cache_bus
+from models import db, Product
+from scripts.benchmark import _bus_worker
+
+POLL_INTERVAL = 0.2
+# Un ciclu de polling, plus citirea outbox-ului si a produsului in celalalt proces
+CONVERGENCE_BOUND = POLL_INTERVAL + 1.0
+
+
+def test_invalidation_reaches_other_processes(product, monkeypatch):
+    # Procesele pornite cu spawn citesc configuratia din env la import
+    monkeypatch.setenv("CACHE_BUS_POLL_INTERVAL", str(POLL_INTERVAL))
+    monkeypatch.setenv("CACHE_BUS", "1")
+    monkeypatch.setattr(cache_bus, "ENABLED", True)
+
+    context = multiprocessing.get_context("spawn")
+    ready, seen = context.Queue(), context.Queue()
+    workers = [
+        context.Process(target=_bus_worker, args=(os.environ["DATABASE_URL"], product.id, ready, seen), daemon=True)
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for _ in workers:
+            ready.get(timeout=60)
+
+        for round_number in range(1, 4):
+            price = Decimal("25.00") + round_number
+            Product.query.filter_by(id=product.id).update({"price": price})
+            db.session.commit()
+            started = time.time()
+            cache_bus.invalidate(("products", [product.id]))
+
+            for _ in workers:
+                # Fara magistrala, cache-ul lor (CART_QUOTE_TTL=3600) ar tine pretul vechi
+                pid, when, value = seen.get(timeout=10)
+                assert Decimal(value) == price
+                assert when - started < CONVERGENCE_BOUND, f"procesul {pid}: {when - started:.2f}s"
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join(5)
@@ -0,0 +1,158 @@
+from datetime import datetime
+
+import pytest
+
+from blueprints.checkout import parse_cart
+from cart_store import MAX_CART_QUANTITY, clear_cart
+from conftest import login
+from models import db, CartItem, Category, Order, Product
+from product_cache import product_cache
+
+SHIPPING = {"shippingaddress": "Str. Test 1", "shippingname": "Client", "shippingphone": "0700000000"}
+
+
+@pytest.fixture
+def empty_cart(client_user):
+    clear_cart(client_user.id)
+    db.session.commit()
+
+
+@pytest.fixture
+def cached_quotes(monkeypatch):
+    """TTL mare: o valoare veche ar ramane in cache daca nu se invalideaza."""
+    monkeypatch.setattr(product_cache, "ttl", 3600)
+    product_cache.invalidate()
+    yield
+    product_cache.invalidate()
+
+
+def quote(client, *lines):
+    response = client.post("/api/cart/quote", json={"cart": [{"id": pid, "quantity": q} for pid, q in lines]})
+    assert response.status_code == 200
+    return response.json
+
+
+def test_parse_cart_sums_duplicate_lines():
+    qty, error = parse_cart([{"id": 1, "quantity": 2}, {"product_id": "1", "quantity": 3}, {"id": 2}])
+    assert error is None
+    assert qty == {1: 5, 2: 1}
+
+
+@pytest.mark.parametrize(
+    "cart, allow_zero",
+    [
+        ("nope", False),
+        (["x"], False),
+        ([{"id": "abc"}], False),
+        ([{"id": 1, "quantity": "many"}], False),
+        ([{"id": 1, "quantity": 0}], False),
+        ([{"id": 1, "quantity": -1}], True),
+        ([{"id": 1, "quantity": MAX_CART_QUANTITY + 1}], False),
+        ([{"id": 1, "quantity": 1500}], True),
+        # Liniile duplicate se insumeaza inainte de verificare
+        ([{"id": 1, "quantity": MAX_CART_QUANTITY}, {"id": 1, "quantity": 1}], False),
+    ],
+)
+def test_parse_cart_rejects(cart, allow_zero):
+    qty, error = parse_cart(cart, allow_zero=allow_zero)
+    assert qty is None and "error" in error
+
+
+def test_parse_cart_limits():
+    assert parse_cart([{"id": 1, "quantity": MAX_CART_QUANTITY}])[0] == {1: MAX_CART_QUANTITY}
+    assert parse_cart([{"id": 1, "quantity": 0}], allow_zero=True)[0] == {1: 0}
+
+
+def test_cart_endpoints_reject_too_many(customer, product, empty_cart):
+    line = [{"id": product.id, "quantity": 1500}]
+    assert customer.patch("/api/cart", json={"items": line}).status_code == 400
+    assert customer.post("/api/cart/merge", json={"cart": line}).status_code == 400
+    assert customer.get("/api/cart").json["cart"] == []
+
+
+def test_legacy_checkout_rejects_too_many(customer, product, empty_cart):
+    orders = Order.query.count()
+    response = customer.post("/api/checkout", json={"cart": [{"id": product.id, "quantity": 1500}], **SHIPPING})
+    assert response.status_code == 400
+    assert Order.query.count() == orders
+
+
+def test_checkout_rejects_changed_cart(customer, product, empty_cart):
+    assert customer.patch("/api/cart", json={"items": [{"id": product.id, "quantity": 3}]}).status_code == 200
+    orders = Order.query.count()
+
+    # Clientul a confirmat 1 bucata, dar pe server (alt dispozitiv) sunt 3
+    response = customer.post("/api/checkout", json={"expected": [{"id": product.id, "quantity": 1}], **SHIPPING})
+    assert response.status_code == 409
+    assert [(line["id"], line["quantity"]) for line in response.json["cart"]] == [(product.id, 3)]
+    assert Order.query.count() == orders
+
+    response = customer.post("/api/checkout", json={"expected": [{"id": product.id, "quantity": 3}], **SHIPPING})
+    assert response.status_code == 201
+    order = db.session.get(Order, response.json["order_id"])
+    assert [(item.product_id, item.quantity) for item in order.items] == [(product.id, 3)]
+
+
+def test_quote_line_statuses(client, product):
+    data = quote(client, (product.id, 2), (999999, 1))
+    assert [(line["id"], line["status"]) for line in data["items"]] == [(product.id, "ok"), (999999, "not_found")]
+    assert data["items"][0]["line_total"] == 50.0
+    assert (data["total"], data["valid"]) == (50.0, False)
+
+    # Linia fara stoc suficient nu intra in total
+    data = quote(client, (product.id, 11))
+    assert (data["items"][0]["status"], data["items"][0]["stock"]) == ("insufficient_stock", 10)
+    assert (data["total"], data["valid"]) == (0.0, False)
+
+
+def test_quote_rejects_too_many(client, product):
+    response = client.post("/api/cart/quote", json={"cart": [{"id": product.id, "quantity": MAX_CART_QUANTITY + 1}]})
+    assert response.status_code == 400
+    assert response.json["product_id"] == product.id
+    lines = [{"id": product.id, "quantity": MAX_CART_QUANTITY}, {"id": product.id, "quantity": 1}]
+    assert client.post("/api/cart/quote", json={"cart": lines}).status_code == 400
+
+
+def test_quote_cache_invalidated_after_edit(app, client, product, cached_quotes):
+    assert quote(client, (product.id, 1))["items"][0]["price"] == 25.0
+    hits = product_cache.hits
+    assert quote(client, (product.id, 1))["items"][0]["price"] == 25.0
+    assert product_cache.hits == hits + 1
+
+    employee = login(app.test_client(), "angajat", "angajat123")
+    form = {"title": "Test album", "artist": "Test artist", "price": "30.00", "stock": "4", "category": "CD"}
+    assert employee.post(f"/edit_product/{product.id}", data=form).status_code == 302
+    line = quote(client, (product.id, 1))["items"][0]
+    assert (line["price"], line["stock"]) == (30.0, 4)
+
+
+def test_quote_cache_invalidated_after_checkout(customer, product, empty_cart, cached_quotes):
+    assert quote(customer, (product.id, 1))["items"][0]["stock"] == 10
+    response = customer.post("/api/checkout", json={"cart": [{"id": product.id, "quantity": 3}], **SHIPPING})
+    assert response.status_code == 201
+    assert quote(customer, (product.id, 1))["items"][0]["stock"] == 7
+
+
+def test_archived_product_is_not_checked_out(customer, product, client_user, empty_cart):
+    other = Product(
+        title="Other album", artist="Test artist", price="10.00", stock=5,
+        category_id=Category.query.filter_by(name="CD").first().id,
+    )
+    db.session.add(other)
+    db.session.commit()
+    lines = [{"id": product.id, "quantity": 1}, {"id": other.id, "quantity": 2}]
+    assert customer.patch("/api/cart", json={"items": lines}).status_code == 200
+    # Arhivat dupa ce a ajuns in cos (randul din cart_items ramane)
+    product.deleted_at = datetime.utcnow()
+    db.session.commit()
+
+    assert [line["id"] for line in customer.get("/api/cart").json["cart"]] == [other.id]
+    response = customer.post("/api/checkout", json={"expected": lines, **SHIPPING})
+    assert response.status_code == 409
+
+    response = customer.post("/api/checkout", json=SHIPPING)
+    assert response.status_code == 201
+    order = db.session.get(Order, response.json["order_id"])
+    assert [(item.product_id, item.quantity) for item in order.items] == [(other.id, 2)]
+    assert order.total_price == 20
+    assert CartItem.query.filter_by(user_id=client_user.id).count() == 0
@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from catalog_facets import MAX_PRICE, _parse_price, catalog_filters
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("12.346", Decimal("12.35")),
+        ("50", Decimal("50.00")),
+        ("", None),
+        (None, None),
+        ("abc", None),
+        ("nan", None),
+        ("NaN", None),
+        ("sNaN", None),
+        ("inf", None),
+        ("-Infinity", None),
+        ("-5", Decimal("0.00")),
+        ("1e30", MAX_PRICE),
+    ],
+)
+def test_parse_price(value, expected):
+    assert _parse_price(value) == expected
+
+
+def test_catalog_filters_ignore_non_finite_prices(ctx):
+    key, filters = catalog_filters(MultiDict({"min_price": "nan", "max_price": "inf"}))
+    assert key[-2:] == (None, None)
+    assert filters["price"] == []
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["min_price=nan", "max_price=inf", "min_price=nan&max_price=inf", "min_price=-inf&sort=price_asc", "max_price=1e30"],
+)
+def test_catalog_non_finite_prices(client, query):
+    assert client.get(f"/catalog?{query}").status_code == 200
+
+
+def test_snapshot_name_order_matches_database(product):
+    from catalog_snapshot import catalog_snapshot
+    from models import db, Product
+
+    # Titluri egale (departajate de id desc), litere mari / mici, diacritice
+    for title in ("abc", "Abc", "Zeta", "Ábc", "abc"):
+        db.session.add(Product(title=title, artist="Sort", price="10.00", stock=1, category_id=product.category_id))
+    db.session.commit()
+    catalog_snapshot.invalidate()
+
+    pagination = catalog_snapshot.paginate((None, None, None, None, None), "name_asc", 1, per_page=10000)
+    expected = [
+        pid for (pid,) in db.session.query(Product.id)
+        .filter(Product.deleted_at.is_(None))
+        .order_by(Product.title.asc(), Product.id.desc())
+    ]
+    assert [item.id for item in pagination.items] == expected
+
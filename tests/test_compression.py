@@ -0,0 +1,69 @@
+import gzip
+import os
+
+import pytest
+
+import compression
+from compression import compressor
+from scripts import precompress_static
+
+needs_brotli = pytest.mark.skipif(compression.brotli is None, reason="pachetul Brotli lipseste")
+CSS = os.path.join(precompress_static.STATIC_DIR, "styles", "main.css")
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    """Folder static gol (fara variantele precomprimate din static/), cu un CSS."""
+    (tmp_path / "styles").mkdir()
+    with open(CSS, "rb") as handle:
+        (tmp_path / "styles" / "site.css").write_bytes(handle.read())
+    monkeypatch.setattr(compressor, "static_folder", str(tmp_path))
+    monkeypatch.setattr(precompress_static, "STATIC_DIR", str(tmp_path))
+    monkeypatch.setattr("sys.argv", ["precompress_static.py"])
+    return tmp_path
+
+
+@needs_brotli
+def test_on_the_fly_brotli_beats_gzip(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(compressor, "static_folder", str(tmp_path))
+    sizes = {}
+    for encoding in ("gzip", "br"):
+        response = client.get("/static/styles/main.css", headers={"Accept-Encoding": encoding})
+        assert response.headers["Content-Encoding"] == encoding
+        sizes[encoding] = len(response.get_data())
+        response.close()
+    assert sizes["br"] < sizes["gzip"]
+
+
+@needs_brotli
+def test_precompressed_variants_are_served(client, static_dir):
+    precompress_static.main()
+    css = static_dir / "styles" / "site.css"
+    assert os.path.getsize(f"{css}.br") < os.path.getsize(f"{css}.gz")
+
+    response = client.get("/static/styles/site.css", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.get_data() == (static_dir / "styles" / "site.css.br").read_bytes()
+    response.close()
+
+    response = client.get("/static/styles/site.css", headers={"Accept-Encoding": "gzip"})
+    assert gzip.decompress(response.get_data()) == css.read_bytes()
+    response.close()
+
+
+def test_precompress_skips_larger_brotli_and_fresh_files(static_dir, monkeypatch, capsys):
+    css = static_dir / "styles" / "site.css"
+    (static_dir / "styles" / "site.css.br").write_bytes(b"stale")
+
+    class LargeBrotli:
+        @staticmethod
+        def compress(data, quality):
+            return data
+
+    monkeypatch.setattr(precompress_static, "brotli", LargeBrotli)
+    precompress_static.main()
+    assert os.path.exists(f"{css}.gz")
+    assert not os.path.exists(f"{css}.br")
+
+    precompress_static.main()
+    assert "1 fisiere deja la zi" in capsys.readouterr().out
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import image_pipeline
+from image_pipeline import build_variants, image_ext, image_format, url_digest
+from models import db, Job
+
+pytestmark = pytest.mark.skipif(not image_format(), reason="Pillow lipseste")
+
+COVER = "/static/images/cd.png"
+
+
+@pytest.fixture
+def cover(product, tmp_path, monkeypatch):
+    monkeypatch.setattr(image_pipeline, "CACHE_DIR", str(tmp_path))
+    Job.query.filter_by(kind="images.prewarm").delete()
+    product.image_url = COVER
+    db.session.commit()
+    return product
+
+
+def image_url(product, digest=None, width=400, ext=None):
+    return f"/img/{product.id}/{digest or url_digest(COVER)}/{width}.{ext or image_ext()}"
+
+
+@pytest.mark.parametrize("digest", ["not-a-digest", "0123456789ABCDEF", "0123456789abcdeg", "0123456789abcdef0"])
+def test_invalid_digest_is_404(client, cover, digest):
+    assert client.get(image_url(cover, digest=digest)).status_code == 404
+
+
+def test_invalid_width_or_format_is_404(client, cover):
+    assert client.get(image_url(cover, width=300)).status_code == 404
+    assert client.get(image_url(cover, ext="exe")).status_code == 404
+
+
+def test_variant_path_rejects_unsafe_digest():
+    with pytest.raises(ValueError):
+        image_pipeline.variant_path("../../etc/passwd", 200)
+
+
+def test_cache_miss_queues_one_job_and_redirects(client, cover, tmp_path):
+    for _ in range(2):
+        response = client.get(image_url(cover))
+        assert response.status_code == 302
+        assert response.headers["Location"] == COVER
+        assert "no-store" in response.headers["Cache-Control"]
+
+    queued = Job.query.filter_by(kind="images.prewarm", status="queued").all()
+    assert [json.loads(job.payload) for job in queued] == [{"urls": [COVER]}]
+    # Request-ul nu a generat nimic: variantele sunt treaba workerului
+    assert not any(tmp_path.iterdir())
+
+
+def test_variant_is_served_after_prewarm(client, cover):
+    assert build_variants(COVER) == len(image_pipeline.IMAGE_WIDTHS)
+
+    response = client.get(image_url(cover))
+    assert response.status_code == 200
+    assert response.mimetype == f"image/{image_format()}"
+    assert "immutable" in response.headers["Cache-Control"]
@@ -0,0 +1,106 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import jobs
+from models import db, Job
+
+calls = []
+
+
+@jobs.task("tests.echo")
+def echo(value):
+    calls.append(value)
+    return {"value": value}
+
+
+@jobs.task("tests.broken", max_attempts=2)
+def broken():
+    raise RuntimeError("CDN indisponibil")
+
+
+@pytest.fixture
+def queue(ctx):
+    Job.query.filter(Job.kind.like("tests.%")).delete(synchronize_session=False)
+    db.session.commit()
+    calls.clear()
+
+
+def run_due(kind):
+    rows = jobs.claim("test-worker", limit=10, kinds=[kind])
+    results = [jobs.execute(row, "test-worker") for row in rows]
+    db.session.expire_all()
+    return results
+
+
+def test_execute_marks_done_with_result(queue):
+    job = jobs.enqueue("tests.echo", {"value": 7})
+    db.session.commit()
+
+    assert run_due("tests.echo") == [True]
+    job = db.session.get(Job, job.id)
+    assert calls == [7]
+    assert (job.status, job.attempts, job.locked_by) == ("done", 1, None)
+    assert json.loads(job.result) == {"value": 7}
+    # Un job terminat nu mai e luat
+    assert run_due("tests.echo") == []
+
+
+def test_claimed_job_is_not_claimed_again(queue):
+    jobs.enqueue("tests.echo", {"value": 1})
+    db.session.commit()
+
+    assert len(jobs.claim("worker-a", kinds=["tests.echo"])) == 1
+    assert jobs.claim("worker-b", kinds=["tests.echo"]) == []
+
+
+def test_error_requeues_with_backoff_then_fails(queue):
+    job = jobs.enqueue("tests.broken")
+    db.session.commit()
+
+    before = datetime.utcnow()
+    assert run_due("tests.broken") == [False]
+    job = db.session.get(Job, job.id)
+    assert (job.status, job.attempts) == ("queued", 1)
+    assert job.last_error == "RuntimeError: CDN indisponibil"
+    delay = (job.run_at - before).total_seconds()
+    assert jobs.BACKOFF * 0.8 - 1 <= delay <= jobs.BACKOFF * 1.2 + 1
+    # Nu e scadent inca
+    assert run_due("tests.broken") == []
+
+    job.run_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert run_due("tests.broken") == [False]
+    job = db.session.get(Job, job.id)
+    assert (job.status, job.attempts) == ("failed", 2)
+    assert job.finished_at is not None
+
+    assert jobs.retry([job.id]) == 1
+    db.session.commit()
+    db.session.expire_all()
+    assert (job.status, job.attempts) == ("queued", 0)
+
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(jobs.random, "uniform", lambda low, high: 1.0)
+    assert jobs.backoff(1) == jobs.BACKOFF
+    assert jobs.backoff(3) == jobs.BACKOFF * 4
+    assert jobs.backoff(100) == jobs.BACKOFF_MAX
+
+
+def test_enqueue_once_reuses_pending_job(queue):
+    first = jobs.enqueue_once("tests.echo", {"value": 3})
+    db.session.commit()
+    assert jobs.enqueue_once("tests.echo", {"value": 3}).id == first.id
+    assert jobs.enqueue_once("tests.echo", {"value": 4}).id != first.id
+    db.session.rollback()
+
+
+def test_products_refresh_requires_confirmation(queue):
+    with pytest.raises(ValueError):
+        jobs.enqueue("products.refresh", {"max_albums": 1})
+    with pytest.raises(ValueError):
+        jobs.parse_schedule("products.refresh=3600")
+    assert jobs.enqueue("products.refresh", {"max_albums": 1}, confirmed=True).kind == "products.refresh"
+    db.session.rollback()
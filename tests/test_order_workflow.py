@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+import pytest
+
+from models import db, Order, OrderItem, OrderStatusHistory, Product
+from order_workflow import allowed_sources, classify_results, transition_orders
+
+
+def make_order(user, product, status="pending", quantity=2):
+    order = Order(user_id=user.id, status=status, total_price=Decimal("50.00"))
+    order.items.append(OrderItem(product_id=product.id, quantity=quantity, price=product.price))
+    db.session.add(order)
+    db.session.commit()
+    return order.id
+
+
+def statuses(order_ids):
+    return {oid: db.session.get(Order, oid).status for oid in order_ids}
+
+
+def test_allowed_sources():
+    assert set(allowed_sources("cancelled")) == {"pending", "paid", "processing"}
+    assert allowed_sources("shipped") == ("processing",)
+    assert allowed_sources("pending") == ()
+
+
+def test_transition_only_moves_valid_sources(client_user, product):
+    pending = make_order(client_user, product, "pending")
+    shipped = make_order(client_user, product, "shipped")
+    cancelled = make_order(client_user, product, "cancelled")
+
+    updated = transition_orders([pending, shipped, cancelled], "paid", "test")
+    db.session.commit()
+    db.session.expire_all()
+
+    assert updated == {pending}
+    assert statuses([pending, shipped, cancelled]) == {pending: "paid", shipped: "shipped", cancelled: "cancelled"}
+    history = OrderStatusHistory.query.filter(OrderStatusHistory.order_id.in_([pending, shipped, cancelled])).all()
+    assert [(row.order_id, row.status) for row in history] == [(pending, "paid")]
+
+    results = classify_results([pending, shipped, cancelled, 10 ** 9], "paid", updated)
+    assert [row["result"] for row in results] == ["updated", "invalid_transition", "invalid_transition", "not_found"]
+    assert classify_results([pending], "paid", set())[0]["result"] == "unchanged"
+
+
+def test_transition_rejects_skipping_steps(client_user, product):
+    pending = make_order(client_user, product, "pending")
+    assert transition_orders([pending], "shipped", "test") == set()
+    db.session.commit()
+    assert statuses([pending]) == {pending: "pending"}
+
+
+def test_unknown_target_raises(client_user, product):
+    with pytest.raises(ValueError):
+        transition_orders([make_order(client_user, product)], "lost", "test")
+
+
+def test_cancel_restocks_once(client_user, product):
+    order_id = make_order(client_user, product, "paid", quantity=3)
+    assert transition_orders([order_id], "cancelled", "test") == {order_id}
+    # A doua anulare nu mai gaseste sursa permisa: stocul nu creste de doua ori
+    assert transition_orders([order_id], "cancelled", "test") == set()
+    db.session.commit()
+    db.session.expire_all()
+    assert db.session.get(Product, product.id).stock == 13
+
+
+def test_client_sources_and_owner_filter(client_user, product):
+    paid = make_order(client_user, product, "paid")
+    pending = make_order(client_user, product, "pending")
+    assert transition_orders([paid, pending], "cancelled", "client", sources=("pending",), user_id=client_user.id) == {pending}
+    assert transition_orders([paid], "cancelled", "other", user_id=client_user.id + 1000) == set()
+    db.session.commit()
+    assert statuses([paid, pending]) == {paid: "paid", pending: "cancelled"}
@@ -0,0 +1,52 @@
+import pytest
+
+from blueprints import qobuz
+
+GOOD_URL = "https://cdn.example/preview.mp3?etsp=4102444800"
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        if isinstance(self.payload, Exception):
+            raise self.payload
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, payloads):
+        self.payloads = payloads
+
+    def get(self, url, params, timeout):
+        return FakeResponse(self.payloads[params["track_id"]])
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    payloads = {}
+    monkeypatch.setattr(qobuz, "_session", lambda: FakeSession(payloads))
+    monkeypatch.setattr(qobuz, "_preview_cache", {})
+    return payloads
+
+
+def test_previews_treat_malformed_upstream_json_as_failures(client, upstream):
+    upstream.update({
+        1: {"success": True, "data": {"url": GOOD_URL}},
+        2: ["not", "an", "object"],
+        3: "error",
+        4: None,
+        5: {"success": True, "data": ["url"]},
+        6: {"success": True, "data": {"url": 42}},
+        7: ValueError("not json"),
+        8: {"success": False},
+    })
+    response = client.get("/api/qobuz/previews?ids=1,2,3,4,5,6,7,8")
+    assert response.status_code == 200
+    assert response.get_json() == {"urls": {"1": GOOD_URL}, "failed": [2, 3, 4, 5, 6, 7, 8]}
+
+
+def test_single_preview_failure_is_502(client, upstream):
+    upstream[9] = None
+    assert client.get("/api/qobuz/preview/9").status_code == 502
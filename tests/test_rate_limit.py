@@ -0,0 +1,101 @@
+import pytest
+
+import rate_limit
+from rate_limit import MemoryStore, Rule, parse_rules, rate_limiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """Limitatorul aplicatiei, pornit doar pentru test, cu bucket-uri noi."""
+    store = MemoryStore()
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "store", store)
+    monkeypatch.setattr(rate_limiter, "fallback", store)
+    monkeypatch.setattr(rate_limiter, "rules", {
+        "auth.login": Rule(2, 60, "ip", ("POST",)),
+        "checkout.api_checkout": Rule(1, 60, "user"),
+    })
+    yield rate_limiter
+    rate_limiter.reset()
+
+
+def test_memory_store_bursts_then_refills(clock):
+    store, rule = MemoryStore(), Rule(2, 10)
+    assert store.take("k", rule)[0] and store.take("k", rule)[0]
+    allowed, _, retry_after = store.take("k", rule)
+    assert not allowed and retry_after == pytest.approx(5)
+
+    clock.now += 5
+    assert store.take("k", rule)[0]
+    # Alta cheie are bucket-ul ei
+    assert store.take("other", rule)[0]
+
+
+def test_memory_store_prunes_idle_keys(clock):
+    store, rule = MemoryStore(max_keys=4), Rule(1, 1)
+    for index in range(10):
+        clock.now += 1
+        store.take(f"k{index}", rule)
+    assert len(store._buckets) <= 4
+    assert "k9" in store._buckets
+
+
+def test_check_returns_429_with_retry_after(client, limiter):
+    form = {"username": "nobody", "password": "wrong"}
+    first = client.post("/login", data=form)
+    assert first.status_code == 200
+    assert first.headers["X-RateLimit-Limit"] == "2"
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    assert client.post("/login", data=form).status_code == 200
+
+    rejected = client.post("/login", data=form)
+    assert rejected.status_code == 429
+    assert 1 <= int(rejected.headers["Retry-After"]) <= 30
+    # Doar POST-ul e limitat
+    assert client.get("/login").status_code == 200
+    assert limiter.snapshot()["rejected"] == {"auth.login": 1}
+
+
+def test_api_429_is_json_and_per_user(customer, limiter):
+    customer.post("/api/checkout", json={"cart": {}})
+    response = customer.post("/api/checkout", json={"cart": {}})
+    assert response.status_code == 429
+    assert response.get_json()["retry_after"] == int(response.headers["Retry-After"])
+
+
+def test_store_errors_fall_back_to_memory(client, limiter, monkeypatch):
+    class BrokenStore:
+        name = "broken"
+
+        def take(self, key, rule):
+            raise ConnectionError("postgres oprit")
+
+    monkeypatch.setattr(limiter, "store", BrokenStore())
+    monkeypatch.setattr(limiter, "fallback", MemoryStore())
+    statuses = [client.post("/login", data={}).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    assert limiter.snapshot()["store_errors"] == 1
+
+
+def test_parse_rules_overrides_and_removes():
+    rules = parse_rules("auth.login=3/30,qobuz.qobuz_search=0,custom.view=5/1/user")
+    assert rules["auth.login"].describe() == "3/30s per ip POST"
+    assert "qobuz.qobuz_search" not in rules
+    assert rules["custom.view"].scope == "user"
+    with pytest.raises(ValueError):
+        parse_rules("auth.login=many")
@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from models import db, Category, Order, OrderItem, Product, ProductCoPurchase
+from recommendations import RecommendationIndex, rebuild
+
+
+def make_products(count, **fields):
+    category_id = Category.query.filter_by(name="Vinyl").first().id
+    products = [
+        Product(title=f"Rec {index}", artist=f"Rec artist {index}", price=Decimal("10.00"), stock=5,
+                category_id=category_id, **fields)
+        for index in range(count)
+    ]
+    db.session.add_all(products)
+    db.session.commit()
+    return products
+
+
+def order_with(user, *products, status="paid"):
+    order = Order(user_id=user.id, status=status, total_price=Decimal("10.00"))
+    order.items.extend(OrderItem(product_id=p.id, quantity=1, price=p.price) for p in products)
+    db.session.add(order)
+    db.session.commit()
+
+
+def pairs_for(product):
+    return {
+        row.related_id: row.orders_count
+        for row in ProductCoPurchase.query.filter_by(product_id=product.id)
+    }
+
+
+def test_rebuild_ranks_and_replaces_in_batches(client_user):
+    main, often, once, cancelled_only = make_products(4)
+    order_with(client_user, main, often, once)
+    order_with(client_user, main, often)
+    order_with(client_user, main, cancelled_only, status="cancelled")
+    # Rand vechi, fara comenzi in spate: dispare la rebuild
+    db.session.add(ProductCoPurchase(product_id=main.id, related_id=cancelled_only.id, orders_count=50))
+    db.session.add(ProductCoPurchase(product_id=cancelled_only.id, related_id=main.id, orders_count=50))
+    db.session.commit()
+
+    rebuild(stored_per_product=20, batch_size=1)
+
+    assert pairs_for(main) == {often.id: 2, once.id: 1}
+    assert pairs_for(cancelled_only) == {}
+    rebuild(stored_per_product=1, batch_size=2)
+    assert pairs_for(main) == {often.id: 2}
+
+
+def test_copurchases_skip_unavailable_products(client_user):
+    main, sold_out, archived, available = make_products(4)
+    sold_out.stock = 0
+    archived.deleted_at = db.func.now()
+    db.session.add_all(
+        ProductCoPurchase(product_id=main.id, related_id=related.id, orders_count=count)
+        for related, count in ((sold_out, 9), (archived, 8), (available, 1))
+    )
+    db.session.commit()
+
+    ids = RecommendationIndex(ttl=0, limit=4).ids_for(main)
+    assert ids[0] == available.id
+    assert sold_out.id not in ids and archived.id not in ids
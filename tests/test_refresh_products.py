@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import pytest
+
+from models import db, CartItem, Product
+from scripts import refresh_products as refresh
+
+
+def album(album_id, title, image="https://cdn.example/new.jpg"):
+    return {"id": album_id, "title": title, "artist": {"name": "Refresh artist"}, "image": {"large": image}}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    albums = [album("A1", "Kept album"), album("A2", "Archived album"), album("A3", "New album")]
+    monkeypatch.setattr(refresh, "ARTISTS", ["Refresh artist"])
+    monkeypatch.setattr(refresh, "iter_artist_albums", lambda artist, max_albums=None: iter(albums))
+    monkeypatch.setattr(refresh, "fetch_json", lambda endpoint, params: {"tracks": {"items": [{"id": 9}]}})
+
+
+def test_refresh_upserts_and_keeps_related_rows(api, product, client_user, capsys):
+    product.artist = "Refresh artist"
+    product.audio_url = "qobuz:1|A1"
+    product.image_url = "https://cdn.example/old.jpg"
+    archived = Product(
+        title="Archived album", artist="Refresh artist", price=product.price, stock=3,
+        category_id=product.category_id, deleted_at=datetime.utcnow(),
+    )
+    db.session.add(archived)
+    db.session.add(CartItem(user_id=client_user.id, product_id=product.id, quantity=2))
+    db.session.commit()
+    before = Product.query.count()
+
+    assert refresh.refresh_products(None) == (1, 1)
+
+    db.session.expire_all()
+    # Potrivit dupa id-ul albumului: titlul / coperta noi, pretul si stocul raman
+    assert (product.title, product.image_url, product.audio_url) == ("Kept album", "https://cdn.example/new.jpg", "qobuz:9|A1")
+    assert (product.price, product.stock) == (25, 10)
+    assert db.session.get(CartItem, (client_user.id, product.id)).quantity == 2
+    # Arhivatul nu e reactivat si nici dublat
+    assert archived.deleted_at is not None and archived.image_url is None
+    assert Product.query.count() == before + 1
+    assert Product.query.filter_by(title="New album").one().audio_url == "qobuz:9|A3"
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.mark.parametrize("module", ["numpy", "PIL", "jobs"])
+def test_app_import_skips_heavy_modules(module):
+    # Proces nou: in procesul testelor modulele pot fi deja importate de alte teste
+    code = f"import sys, app; print({module!r} in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    assert result.stdout.strip().endswith("False")
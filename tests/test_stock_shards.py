@@ -0,0 +1,41 @@
+import stock_shards
+from models import db, Product, StockShard
+
+
+def shard_stock(product):
+    return [row.stock for row in StockShard.query.filter_by(product_id=product.id).order_by(StockShard.shard)]
+
+
+def total(product):
+    db.session.expire_all()
+    return db.session.get(Product, product.id).stock_total
+
+
+def test_split_is_even():
+    assert stock_shards.split(10, 4) == [3, 3, 2, 2]
+    assert stock_shards.split(-5, 2) == [0, 0]
+
+
+def test_enable_take_give_disable(product):
+    stock_shards.enable(product, shards=4)
+    db.session.commit()
+    assert shard_stock(product) == [3, 3, 2, 2]
+    assert total(product) == 10
+
+    assert stock_shards.take(product.id, 4, 2)
+    assert total(product) == 8
+    # Niciun rand nu are 5: se ia din total si se rebalanseaza
+    assert stock_shards.take(product.id, 4, 5)
+    assert total(product) == 3
+    assert max(shard_stock(product)) - min(shard_stock(product)) <= 1
+    assert not stock_shards.take(product.id, 4, 4)
+    assert total(product) == 3
+
+    stock_shards.give(product.id, 4, 2)
+    assert total(product) == 5
+    assert stock_shards.rebalance(product.id) == 5
+    db.session.commit()
+
+    stock_shards.disable(product)
+    db.session.commit()
+    assert (product.stock, product.stock_shards, shard_stock(product)) == (5, 0, [])